@@ -5,13 +5,13 @@
 
 from typing import Union, Tuple, Optional, List
 
-from primitives.errors import CompilationError, AttributesError
-from primitives.litteral import Litteral
-from primitives.variable import Variable
-from primitives.label import Label
+from modules.errors import CompilationError, AttributesError
+from modules.primitives.litteral import Litteral
+from modules.primitives.variable import Variable
+from modules.primitives.label import Label
 
 from assembleurlines import AsmLine
-from processorengine import ProcessorEngine
+from modules.engine.processorengine import ProcessorEngine
 
 class AssembleurContainer:
     """Objet contenant les lignes de code assembleur
@@ -1,7 +1,7 @@
-from codeparser import CodeParser
-from compilemanager import CompilationManager
-from processor16bits import Processort16Bits
-from processor12bits import Processort12Bits
+from modules.parser.code import CodeParser
+from modules.compilemanager import CompilationManager
+from modules.engine.processor16bits import Processor16Bits
+from modules.engine.processor12bits import Processor12Bits
 
 import unittest
 
@@ -9,8 +9,8 @@ import unittest
 
 class CompilationTest(unittest.TestCase):
     def setUp(self):
-        self.engine16 = Processort16Bits()
-        self.engine12 = Processort12Bits()
+        self.engine16 = Processor16Bits()
+        self.engine12 = Processor12Bits()
 
 
     def test_affectation_16bits(self):
@@ -6,14 +6,11 @@
 
 from tkinter import *
 from tkinter import filedialog
-#from codeparser import CodeParser
-from compilemanager import CompilationManager
-#from processorengine import ProcessorEngine
-#from executeur import Executeur
 from widgets import InputCodeWidget, SimulationWidget
-#from errors import *
-from codeparser import *
-from executeur import *
+from modules.errors import ExpressionError, CompilationError, ParseError, AttributesError
+from modules.engine.registry import engineNames, engineLabel
+from modules.program import Program
+from modules.exec.executeur import Executeur
 
 
 
@@ -27,6 +24,9 @@ class InputCodeWindow:
         ("exemple 4", "example4.code")
     ]
     _runningSpeed = 0
+    _maxSpeed = False
+    FRAME_DELAY = 16      # durée d'une image en vitesse maximale, en ms
+    FRAME_IDLE = 4        # part de l'image laissée à la boucle d'événements, en ms
     BIN_DISPLAY = 0
     DEC_DISPLAY = 1
     HEX_DISPLAY = 2
@@ -71,14 +71,13 @@ class InputCodeWindow:
         self._menuOptions.add_radiobutton(label="bin", variable=self._currentDisplay, command=self.__switchDisplay, value=self.BIN_DISPLAY)
         self._menuOptions.add_radiobutton(label="dec", variable=self._currentDisplay, command=self.__switchDisplay, value=self.DEC_DISPLAY)
         self._menuOptions.add_radiobutton(label="hex", variable=self._currentDisplay, command=self.__switchDisplay, value=self.HEX_DISPLAY)
-        availableEngines = ProcessorEngine.AVAILABLE_ENGINES
+        availableEngines = engineNames()
         assert len(availableEngines) > 0
         self._menuOptions.add_separator()
         self._currentEngineId = StringVar()
-        defaultEngineName, defaultEngineId = availableEngines[0]
-        self._currentEngineId.set(defaultEngineId)
-        for engineName, engineId in availableEngines:
-            self._menuOptions.add_radiobutton(label=engineName, variable=self._currentEngineId, command=self.__switchEngine, value=engineId)
+        self._currentEngineId.set(availableEngines[0])
+        for engineId in availableEngines:
+            self._menuOptions.add_radiobutton(label=engineLabel(engineId), variable=self._currentEngineId, command=self.__switchEngine, value=engineId)
 
         #Menu Compile
         self._menu.add_command(label='Compile', command=self.__editModeCompile)
@@ -92,10 +91,13 @@ class InputCodeWindow:
         self._menu.add_cascade(label="Run", menu = self._menuRun)
         self._menu.entryconfig("Run", state="disabled")
         self._menuRun.add_command(label="Step", command=self.__step)
+        self._menuRun.add_command(label="Step back", command=self.__stepBack)
         self._menuRun.add_separator()
         self._menuRun.add_command(label="Run x1", command=self.__run_v1)
         self._menuRun.add_command(label="Run x10", command=self.__run_v10)
         self._menuRun.add_command(label="Run x100", command=self.__run_v100)
+        self._menuRun.add_command(label="Run max", command=self.__run_max)
+        self._menuRun.add_command(label="Run (processus)", command=self.__run_process)
         self._menuRun.add_separator()
         self._menuRun.add_command(label='Pause', command=self.__pause)
         self._menuRun.add_separator()
@@ -192,7 +194,7 @@ class InputCodeWindow:
             self._currentWidget = InputCodeWidget(self._panedWindow, textCode)
             self._panedWindow.add(self._currentWidget, before=self._messages, stick="nsew", height=450)
 
-    def __goSimMode(self, executeur, textCode, asm):
+    def __goSimMode(self, executeur, textCode, program):
         d = self._currentDisplay.get()
         if 0 <= d < len(self.MODES):
             mode = self.MODES[d]
@@ -200,7 +202,7 @@ class InputCodeWindow:
             mode = self.MODES[0]
         self._panedWindow.forget(self._currentWidget)
         self._currentWidget.destroy()
-        self._currentWidget = SimulationWidget(self._panedWindow, self, executeur, textCode, asm, mode)
+        self._currentWidget = SimulationWidget(self._panedWindow, self, executeur, textCode, program, mode)
         self._panedWindow.add(self._currentWidget, before=self._messages, stick="nsew", height=450, width=1300)
 
     def __editModeCompile(self):
@@ -211,12 +213,9 @@ class InputCodeWindow:
 
     def __doCompile(self, textCode):
         e = self._currentEngineId.get()
-        engine = ProcessorEngine(e)
         try :
-            structuredList = CodeParser.parse(code = textCode)
-            cm = CompilationManager(engine, structuredList)
-            asm = cm.asm
-            executeur = Executeur(engine,asm.getDecimal())
+            program = Program(textCode, e)
+            executeur = Executeur(program.engine, program.binary)
         except (ExpressionError, CompilationError, ParseError, AttributesError) as e :
             if not e.errors is None and "lineNumber" in e.errors:
                 errorMessage = "[{}] {}".format(e.errors["lineNumber"], e)
@@ -238,7 +237,7 @@ class InputCodeWindow:
             self._menuEdit.entryconfig("Compile", state="disabled")
             self._menuEdit.entryconfig("Effacer", state="disabled")
             self._menu.entryconfig("Run", state="normal")
-            self.__goSimMode(executeur, textCode, asm)
+            self.__goSimMode(executeur, textCode, program)
 
     def __run_v1(self):
         self._runningSpeed = 1000
@@ -252,24 +251,74 @@ class InputCodeWindow:
         self._runningSpeed = 10
         self.__step()
 
+    def __run_max(self):
+        if self.inEditMode():
+            self.__editModeCompile()
+        if not self.inEditMode():
+            self._maxSpeed = True
+            self._menu.entryconfig("Pause", state="normal")
+            self._menu.entryconfig("Next Step", state="disabled")
+            self.__frame()
+
+    def __frame(self):
+        """Une image de l'exécution en vitesse maximale : tranche de pas
+        limitée dans le temps, puis rafraîchissement de l'affichage
+        """
+        if not self._maxSpeed or self.inEditMode():
+            return
+        currentState = self._currentWidget.frameRun((self.FRAME_DELAY - self.FRAME_IDLE) / 1000)
+        if currentState < 0 or not self._currentWidget.executeur.breakReason is None:
+            self._maxSpeed = False
+            self._menu.entryconfig("Pause", state="disabled")
+            self._menu.entryconfig("Next Step", state="normal")
+            return
+        self._root.after(self.FRAME_IDLE, self.__frame)
+
+    def __run_process(self):
+        if self.inEditMode():
+            self.__editModeCompile()
+        if not self.inEditMode() and not self._currentWidget.processRunning:
+            self._runningSpeed = 0
+            self._maxSpeed = False
+            self._currentWidget.startProcess()
+            self._menu.entryconfig("Pause", state="normal")
+            self._menu.entryconfig("Next Step", state="disabled")
+            self._root.after(self.FRAME_DELAY, self.__processFrame)
+
+    def __processFrame(self):
+        """Une image de l'exécution dans un processus séparé : la simulation
+        continue pendant que l'affichage recopie l'état publié
+        """
+        if self.inEditMode() or not self._currentWidget.processRunning:
+            return
+        if self._currentWidget.processFrame() < 0:
+            self._currentWidget.stopProcess()
+            self._menu.entryconfig("Pause", state="disabled")
+            self._menu.entryconfig("Next Step", state="normal")
+            return
+        self._root.after(self.FRAME_DELAY, self.__processFrame)
+
     def __pause(self):
         self._runningSpeed = 0
+        self._maxSpeed = False
+        if not self.inEditMode() and self._currentWidget.processRunning:
+            self._currentWidget.stopProcess()
+        self._menu.entryconfig("Next Step", state="normal")
         self._menu.entryconfig("Pause", state="disabled")
 
     def __reinitSim(self):
         if not self.inEditMode():
-            e = self._currentEngineId.get()
-            engine = ProcessorEngine(e)
             try :
-                asm = self._currentWidget.asm
-                executeur = Executeur(engine, asm.getDecimal())
+                program = self._currentWidget.program
+                executeur = Executeur(program.engine, program.binary)
             except Exception as e:
                 self._currentWidget.addMessage(str(e))
             else :
                 textCode = self._currentWidget.textCode
+                self._maxSpeed = False
                 self._menu.entryconfig("Pause", state="disabled")
                 self._menu.entryconfig("Next Step", state="disabled")
-                self.__goSimMode(executeur, textCode, asm)
+                self.__goSimMode(executeur, textCode, program)
 
     def __step(self):
         if self.inEditMode():
@@ -284,6 +333,11 @@ class InputCodeWindow:
                 self._menu.entryconfig("Pause", state="normal")
                 self._menu.entryconfig("Next Step", state="disabled")
 
+    def __stepBack(self):
+        if not self.inEditMode() and self._runningSpeed == 0 and self._currentWidget.canStepBack:
+            self._currentWidget.stepBackRun()
+            self._menu.entryconfig("Next Step", state="normal")
+
     def show(self):
         self._root.mainloop()
 
@@ -0,0 +1,304 @@
+"""
+.. module:: modules.cli
+:synopsis: interface en ligne de commande, sans interface graphique.
+
+    * upsim compile fichier.code : affiche le code assembleur ou binaire
+    * upsim run fichier.code : exécute le programme et affiche les sorties
+    * upsim bench fichier.code : mesure les temps de compilation, d'exécution et de démarrage
+
+    L'option --json produit une sortie lisible par un programme.
+    Les saisies peuvent commencer par une valeur négative : --input -7,2 ou --input=-7,2.
+
+.. note:: l'exécuteur n'est importé que par les commandes qui exécutent le programme,
+    et seul le modèle de processeur demandé est chargé : upsim compile ne paie pas
+    l'import de la simulation.
+"""
+
+from typing import List, Dict, Tuple, Optional, Any, TYPE_CHECKING
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from modules.errors import CompilationError, ParseError, ExpressionError, ExecutionError
+from modules.engine.registry import ENGINES, DEFAULT_ENGINE
+from modules.passmanager import PassManager
+from modules.program import Program
+
+if TYPE_CHECKING:
+    from modules.exec.executeur import Executeur
+    from modules.exec.components import InputSource
+
+# modules dont le temps de démarrage est mesuré par upsim bench
+STARTUP_MODULES:Tuple[str, ...] = ("modules.program", "modules.cli", "modules.exec.executeur")
+
+STATES = {
+    -1: "halt",
+    -2: "waiting_input",
+    0: "limit"
+}
+
+def _parseInputs(text:str) -> List[int]:
+    """
+    :param text: entiers séparés par des virgules
+    :type text: str
+    :return: liste des entiers
+    :rtype: List[int]
+    """
+    try:
+        return [int(item) for item in text.split(",") if item.strip() != ""]
+    except ValueError:
+        raise argparse.ArgumentTypeError("liste d'entiers attendue : {}".format(text))
+
+def _joinNegativeInputs(argv:List[str]) -> List[str]:
+    """argparse prend une valeur commençant par un tiret pour une option :
+    --input -7,2 est réécrit en --input=-7,2
+
+    :param argv: arguments de la ligne de commande
+    :type argv: List[str]
+    :return: arguments, la valeur de --input accolée à l'option quand elle commence par un nombre négatif
+    :rtype: List[str]
+    """
+    joined:List[str] = []
+    for item in argv:
+        if len(joined) > 0 and joined[-1] == "--input" and re.match(r"^-\d", item):
+            joined[-1] = "--input=" + item
+        else:
+            joined.append(item)
+    return joined
+
+def run(program:Program, inputs:List[int], mode:str = "translated", maxCycles:int = 0, inputSource:Optional["InputSource"] = None) -> Tuple["Executeur", Dict[str, Any]]:
+    """Exécute un programme compilé
+
+    :param program: programme compilé
+    :type program: Program
+    :param inputs: saisies, placées dans le buffer d'entrée avant l'exécution
+    :type inputs: List[int]
+    :param mode: "translated" pour l'exécution par blocs traduits, "step" pour l'exécution pas à pas
+    :type mode: str
+    :param maxCycles: limite de l'exécution, 0 si illimitée : nombre de pas élémentaires en mode step,
+      nombre approximatif d'instructions en mode translated
+    :type maxCycles: int
+    :param inputSource: source lue à la demande, après les saisies
+    :type inputSource: Optional[InputSource]
+    :return: exécuteur dans son état final et compteurs
+    :rtype: Tuple[Executeur, Dict[str, Any]]
+    """
+    from modules.exec.executeur import Executeur
+    executeur = Executeur(program.engine, program.binary)
+    executeur.bufferizeMany(inputs)
+    if not inputSource is None:
+        executeur.addInputSource(inputSource)
+    counters:Dict[str, Any] = {}
+    start = time.perf_counter()
+    if mode == "step":
+        cycles = 0
+        instructions = 0
+        state = 0
+        while maxCycles == 0 or cycles < maxCycles:
+            state = executeur.step()
+            cycles += 1
+            if state == 0 or state == -1:
+                instructions += 1
+            if state < 0:
+                break
+        counters["cycles"] = cycles
+        counters["instructions"] = instructions
+    else:
+        state = executeur.translatedRun(maxCycles)
+    counters["runSeconds"] = time.perf_counter() - start
+    counters["state"] = STATES.get(state, "limit")
+    return executeur, counters
+
+def _result(program:Program, executeur:"Executeur", counters:Dict[str, Any]) -> Dict[str, Any]:
+    """
+    :return: description de l'état final, pour la sortie JSON
+    :rtype: Dict[str, Any]
+    """
+    memory = executeur.memory.content
+    variables = {
+        name: memory[address].toSignInt() if address < len(memory) else 0
+        for name, address in program.addressMap.variables.items()
+        if not name.startswith("#")
+    }
+    return {
+        "engine": program.engine.name,
+        "state": counters.pop("state"),
+        "output": [item.toSignInt() for item in executeur.screen.list],
+        "variables": variables,
+        "registers": [item.toSignInt() for item in executeur.registers.content],
+        "linePointer": executeur.linePointer.intValue,
+        "counters": dict(counters, compileSeconds=program.compileSeconds)
+    }
+
+def _commandCompile(program:Program, options:argparse.Namespace) -> Dict[str, Any]:
+    if not options.json:
+        if options.binary:
+            print("\n".join(program.binary))
+        else:
+            print(program.engine.getAsm(program.fifos, True))
+    return {
+        "engine": program.engine.name,
+        "asm": program.engine.getAsm(program.fifos, True).split("\n"),
+        "binary": program.binary,
+        "instructions": program.addressMap.codeSize,
+        "ranges": program.addressMap.ranges,
+        "labels": program.addressMap.labels,
+        "variables": program.addressMap.variables,
+        "counters": {"compileSeconds": program.compileSeconds}
+    }
+
+def _commandRun(program:Program, options:argparse.Namespace) -> Dict[str, Any]:
+    from modules.exec.components import StreamSource
+    if options.input_file is None:
+        executeur, counters = run(program, options.input, options.mode, options.max_cycles)
+    elif options.input_file == "-":
+        executeur, counters = run(program, options.input, options.mode, options.max_cycles, StreamSource(sys.stdin))
+    else:
+        try:
+            with open(options.input_file, encoding="utf-8") as inputFile:
+                executeur, counters = run(program, options.input, options.mode, options.max_cycles, StreamSource(inputFile))
+        except OSError as error:
+            raise ExecutionError("Fichier de saisies illisible : {}".format(error))
+    result = _result(program, executeur, counters)
+    if not options.json:
+        print("\n".join(executeur.screen.getStringList("dec")))
+        if result["state"] != "halt":
+            print("état : {}".format(result["state"]), file=sys.stderr)
+    return result
+
+def startupSeconds(moduleName:str, repeat:int) -> float:
+    """Mesure le démarrage d'un interpréteur qui importe un module, comme un appel
+    de la ligne de commande. La mesure tient compte du cache des fichiers .pyc.
+
+    :param moduleName: nom du module, chaîne vide pour l'interpréteur seul
+    :type moduleName: str
+    :param repeat: nombre de répétitions
+    :type repeat: int
+    :return: meilleure durée, en secondes
+    :rtype: float
+    """
+    import os
+    import subprocess
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", "import " + moduleName if moduleName != "" else "pass"]
+    durations = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=root, check=True)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+def _commandBench(program:Program, options:argparse.Namespace) -> Dict[str, Any]:
+    startup = {"interpreter": startupSeconds("", options.repeat)}
+    for moduleName in STARTUP_MODULES:
+        startup[moduleName] = startupSeconds(moduleName, options.repeat)
+    timings:Dict[str, Dict[str, float]] = {}
+    for mode in ("step", "translated"):
+        durations = []
+        for _ in range(options.repeat):
+            executeur, counters = run(program, options.input, mode, options.max_cycles)
+            durations.append(counters["runSeconds"])
+        timings[mode] = {"best": min(durations), "mean": sum(durations) / len(durations)}
+    if not options.json:
+        print("compilation : {:.6f} s".format(program.compileSeconds))
+        for mode, values in timings.items():
+            print("{:<10} : meilleur {:.6f} s, moyenne {:.6f} s".format(mode, values["best"], values["mean"]))
+        for moduleName, seconds in startup.items():
+            print("démarrage {:<24} : {:.6f} s".format(moduleName, seconds))
+    return {
+        "engine": program.engine.name,
+        "repeat": options.repeat,
+        "compileSeconds": program.compileSeconds,
+        "runSeconds": timings,
+        "startupSeconds": startup
+    }
+
+COMMANDS = {
+    "compile": _commandCompile,
+    "run": _commandRun,
+    "bench": _commandBench
+}
+
+def buildParser() -> argparse.ArgumentParser:
+    """
+    :return: analyseur des arguments de la ligne de commande
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="upsim", description="Compilation et simulation de programmes pour microprocesseur virtuel")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, helpText in (("compile", "affiche le code assembleur"), ("run", "exécute le programme"), ("bench", "mesure les temps de compilation, d'exécution et de démarrage")):
+        subparser = subparsers.add_parser(command, help=helpText)
+        subparser.add_argument("file", help="fichier du programme")
+        subparser.add_argument("--engine", default=DEFAULT_ENGINE, help="modèle de processeur : {} ou un modèle déclaré, voir modules.engine.registry".format(", ".join(ENGINES)))
+        subparser.add_argument("-O", dest="optimization", type=int, choices=PassManager.LEVELS, default=PassManager.DEFAULT_LEVEL, help="niveau d'optimisation")
+        subparser.add_argument("--json", action="store_true", help="sortie JSON")
+        if command == "compile":
+            subparser.add_argument("--binary", action="store_true", help="affiche le code binaire au lieu de l'assembleur")
+            continue
+        subparser.add_argument("--input", type=_parseInputs, default=[], help="saisies, séparées par des virgules, par exemple --input -7,2")
+        subparser.add_argument("--max-cycles", type=int, default=0, help="limite de l'exécution : pas élémentaires en mode step, instructions (approximatif) en mode translated")
+        if command == "run":
+            subparser.add_argument("--mode", choices=("translated", "step"), default="translated", help="mode d'exécution")
+            subparser.add_argument("--input-file", default=None, help="fichier d'entiers lus à la demande après les saisies de --input, - pour l'entrée standard")
+        else:
+            subparser.add_argument("--repeat", type=int, default=5, help="nombre de répétitions")
+    return parser
+
+def main(argv:Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande
+
+    :param argv: arguments, par défaut ceux du processus
+    :type argv: Optional[List[str]]
+    :return: code de sortie, 0 en cas de succès, 1 en cas d'erreur
+    :rtype: int
+    """
+    options = buildParser().parse_args(_joinNegativeInputs(sys.argv[1:] if argv is None else argv))
+    try:
+        with open(options.file, encoding="utf-8") as codeFile:
+            code = codeFile.read()
+    except OSError as error:
+        return _error(options, error)
+    try:
+        program = Program(code, options.engine, options.optimization)
+        result = COMMANDS[options.command](program, options)
+        if options.json:
+            print(json.dumps(result))
+        sys.stdout.flush()
+    except (ParseError, CompilationError, ExpressionError, ExecutionError, ZeroDivisionError) as error:
+        return _error(options, error)
+    except BrokenPipeError:
+        # lecteur fermé avant la fin de la sortie, upsim compile ... | head par exemple
+        _silenceStdout()
+        return 1
+    return 0
+
+def _silenceStdout() -> None:
+    """Redirige la sortie standard vers os.devnull, pour que les écritures encore en attente
+    ne provoquent pas une nouvelle erreur à la fermeture de l'interpréteur
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, sys.stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        # sortie standard remplacée par un objet sans descripteur de fichier
+        pass
+    finally:
+        os.close(devnull)
+
+def _error(options:argparse.Namespace, error:Exception) -> int:
+    """Affiche une erreur
+
+    :return: code de sortie
+    :rtype: int
+    """
+    if options.json:
+        print(json.dumps({"error": str(error)}))
+    else:
+        print("Erreur : {}".format(error), file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@
     * CompilationManager qui délègue à CompileExpressionManager la compilation d'expression, fournit l'objet AssembleurContainer chargé de contenir le code assembleur final
 """
 
-from typing import Union, List, Optional, Tuple
+from typing import Union, List, Optional, Tuple, Dict
 
 from modules.errors import CompilationError
 from modules.primitives.variable import Variable
@@ -27,18 +27,34 @@ from modules.engine.processorengine import ProcessorEngine
 class CompileExpressionManager:
     _registers : RegistersManager
     _actions       : ActionsFIFO
+    _registersContent : Dict[str, Register]
 
-    def __init__(self, engine:ProcessorEngine, registers:RegistersManager):
+    def __init__(self, engine:ProcessorEngine, registers:RegistersManager, registersContent:Optional[Dict[str, Register]] = None):
         """Constructeur
 
         :param engine: modèle de processeur utilisé
         :type engine: ProcessorEngine
         :param registers: gestionnaire de registres
         :type registers: RegistersManager
+        :param registersContent: valeurs déjà présentes dans les registres, indexées par leur version str
+        :type registersContent: Optional[Dict[str, Register]]
+
+        .. note:: registersContent permet à une comparaison qui en suit immédiatement une autre
+            de ne pas recharger les opérandes déjà présents dans les registres.
         """
         self._engine = engine
         self._registers = registers
         self._registers.purgeStack()
+        self._registersContent = dict(registersContent) if not registersContent is None else {}
+
+    @property
+    def registersContent(self) -> Dict[str, Register]:
+        """Accesseur
+
+        :return: valeurs connues des registres après compilation
+        :rtype: Dict[str, Register]
+        """
+        return dict(self._registersContent)
 
 
     def compile(self, fifo:ActionsFIFO) -> ActionsFIFO:
@@ -144,6 +160,7 @@ class CompileExpressionManager:
         if destinationRegister is None:
             raise CompilationError("Pas de registre disponible")
         self._actions.append(memoryRegister, destinationRegister, Operators.LOAD)
+        self._setRegisterContent(destinationRegister, None)
         return destinationRegister
 
     def _swapStackRegister(self):
@@ -166,6 +183,22 @@ class CompileExpressionManager:
         self._registers.push(register)
         return register
 
+    def _getUALOutputRegister(self) -> Register:
+        """Retourne le registre recevant le résultat de l'UAL.
+        Si le processeur ne permet pas de choisir la sortie de l'UAL, c'est toujours le registre 0.
+
+        :return: registre destination du calcul
+        :rtype: Register
+        :raises: CompilationError si aucune registre n'est disponible
+        """
+        if self._engine.ualOutputIsFree():
+            return self._getAvailableRegister()
+        r0 = self._registers.getZeroRegister()
+        if not self._registers.isFree(0):
+            raise CompilationError("La sortie de l'UAL n'est pas disponible")
+        self._registers.push(r0)
+        return r0
+
     def _UALoutputIsAvailable(self) -> bool:
         """
         :return: vrai si la sortie de l'UAL est libre
@@ -217,6 +250,7 @@ class CompileExpressionManager:
         self._registers.extractFromStack(index0)
         self._registers.insertInStack(index0, freeRegister)
         self._actions.append(r0, freeRegister, Operators.MOVE)
+        self._setRegisterContent(freeRegister, self._getRegisterContent(r0))
 
     def _pushBinaryOperator(self, operator:Operator):
         """Ajoute une opération binaire.
@@ -239,8 +273,9 @@ class CompileExpressionManager:
         if operator.isComparaison:
             self._actions.append(rFirstCalc, rLastCalc, operator)
             return
-        registreDestination = self._getAvailableRegister()
+        registreDestination = self._getUALOutputRegister()
         self._actions.append(rFirstCalc, rLastCalc, registreDestination, operator)
+        self._setRegisterContent(registreDestination, None)
 
     def _pushBinaryOperatorWithLitteral(self, operator:Operator, litteral:Litteral):
         """Ajoute une opération binaire dont le 2e opérand est un littéral
@@ -254,8 +289,9 @@ class CompileExpressionManager:
         """
         registreOperand = self._getTopStackRegister()
         self._freeRegister()
-        registreDestination = self._getAvailableRegister()
+        registreDestination = self._getUALOutputRegister()
         self._actions.append(registreOperand, litteral, registreDestination, operator)
+        self._setRegisterContent(registreDestination, None)
 
     def _pushUnaryOperator(self, operator:Operator):
         """Ajoute une opération unaire
@@ -267,8 +303,9 @@ class CompileExpressionManager:
         """
         registreOperand = self._getTopStackRegister()
         self._freeRegister()
-        registreDestination = self._getAvailableRegister()
+        registreDestination = self._getUALOutputRegister()
         self._actions.append(registreOperand, registreDestination, operator)
+        self._setRegisterContent(registreDestination, None)
 
     def _pushUnaryOperatorWithLitteral(self, operator:Operator, litteral:Litteral):
         """Ajoute une opération unaire dont l'opérande est un littéral
@@ -279,8 +316,9 @@ class CompileExpressionManager:
         :param litteral: littéral
         :type litteral: Litteral
         """
-        registreDestination = self._getAvailableRegister()
+        registreDestination = self._getUALOutputRegister()
         self._actions.append(litteral, registreDestination, operator)
+        self._setRegisterContent(registreDestination, None)
 
     def _pushValue(self, value:Union[Litteral,Variable]):
         """Charge une valeur dans le premier registre disponible
@@ -288,7 +326,14 @@ class CompileExpressionManager:
         :param value: valeur à charger
         :type value: Union[Litteral,Variable]
         """
+        key = str(value)
+        knownRegister = self._registersContent.get(key)
+        if not knownRegister is None and self._registers.isFree(knownRegister.rank) and (knownRegister.rank != 0 or self._engine.ualOutputIsFree()):
+            # la valeur est déjà dans un registre libre
+            self._registers.push(knownRegister)
+            return
         registreDestination = self._getAvailableRegister()
+        self._setRegisterContent(registreDestination, key)
         if isinstance(value, Litteral):
             if self._engine.litteralOperatorAvailable(Operators.MOVE, value):
                 self._actions.append(value, registreDestination, Operators.MOVE)
@@ -299,6 +344,30 @@ class CompileExpressionManager:
             self._actions.append(value, registreDestination, Operators.LOAD)
 
 
+    def _getRegisterContent(self, register:Register) -> Optional[str]:
+        """
+        :param register: registre
+        :type register: Register
+        :return: valeur connue du registre, None si inconnue
+        :rtype: Optional[str]
+        """
+        for key, item in self._registersContent.items():
+            if item is register:
+                return key
+        return None
+
+    def _setRegisterContent(self, register:Register, key:Optional[str]):
+        """Enregistre l'écriture d'un registre
+
+        :param register: registre modifié
+        :type register: Register
+        :param key: valeur placée dans le registre, None si elle est le résultat d'un calcul
+        :type key: Optional[str]
+        """
+        self._registersContent = { k:r for k, r in self._registersContent.items() if not r is register }
+        if not key is None:
+            self._registersContent[key] = register
+
     def _getNeededRegisterSpace(self, needUAL:bool):
         """Déplace des registres au besoin
         * Déplace le registre 0 s'il est nécessaire pour l'UAL.
@@ -14,15 +14,17 @@
 .. note:: CompilationManager délègue à CompileExpressionManager la compilation des
     expressions arithmétiques.
 """
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, cast
 
 from modules.errors import CompilationError
 from modules.primitives.label import Label
-from modules.structuresnodes import StructureNode, StructureNodeList, JumpNode, SimpleNode, TransfertNode
+from modules.structuresnodes import StructureNode, StructureNodeList, JumpNode, SimpleNode, TransfertNode, IfNode
+from modules.passmanager import PassManager, PassRecord
 from modules.compileexpressionmanager import CompileExpressionManager
+from modules.expressionnodes.comparaison import ComparaisonExpressionNode
 from modules.engine.processorengine import ProcessorEngine
 from modules.primitives.actionsfifo import ActionsFIFO
-from modules.primitives.register import RegistersManager
+from modules.primitives.register import Register, RegistersManager
 from modules.primitives.operators import Operators
 
 #from assembleurcontainer import AssembleurContainer
@@ -30,13 +32,21 @@ from modules.primitives.operators import Operators
 class CompilationManager:
     _engine:ProcessorEngine
     _linearList:StructureNodeList
-    def __init__(self, engine:ProcessorEngine, listOfStructureNodes:List[StructureNode]):
+    _optimizationLevel:int
+    _passManager:PassManager
+    _lastCondition:Optional[ComparaisonExpressionNode] = None
+    _registersContent:Dict[str, Register] = {}
+    def __init__(self, engine:ProcessorEngine, listOfStructureNodes:List[StructureNode], optimizationLevel:int = PassManager.DEFAULT_LEVEL, passManager:Optional[PassManager] = None):
         """Constructeur
 
         :param engine: objet décrivant le modèle de processeur
         :type engine: ProcessorEngine
         :param listOfStructureNodes: liste de noeuds décrivant le programme à compiler
         :type listOfStructureNodes: list[StructureNode]
+        :param optimizationLevel: niveau d'optimisation, 0, 1 ou 2
+        :type optimizationLevel: int
+        :param passManager: gestionnaire des passes, éventuellement enrichi de passes supplémentaires
+        :type passManager: Optional[PassManager]
 
         .. note::
 
@@ -44,12 +54,34 @@ class CompilationManager:
         la liste fournie n'est pas stockée, on en produit une forme linéaire (while et if transformé) aussitôt.
         """
         self._engine = engine
+        self._optimizationLevel = optimizationLevel
+        self._passManager = PassManager() if passManager is None else passManager
         self._linearList = StructureNodeList(listOfStructureNodes)
         comparaisonSymbolsAvailables = self._engine.getComparaisonSymbolsAvailables()
-        self._linearList.linearize(comparaisonSymbolsAvailables)
+        self._passManager.run(optimizationLevel, self._linearList, comparaisonSymbolsAvailables, self._instructionsCount)
+
+    @property
+    def optimizationLevel(self) -> int:
+        """Accesseur
+
+        :return: niveau d'optimisation
+        :rtype: int
+        """
+        return self._optimizationLevel
+
+    @property
+    def passRecords(self) -> List[PassRecord]:
+        """Accesseur
+
+        :return: durée et variation du nombre d'instructions de chaque passe exécutée
+        :rtype: List[PassRecord]
+        """
+        return self._passManager.records
 
     def compile(self) -> List[ActionsFIFO]:
         registers = RegistersManager(self._engine.registersNumber())
+        self._lastCondition = None
+        self._registersContent = {}
         listActionsFifos = [self._compileNode(node, registers) for node in self._linearList]
         # à ce stade, les labels sont définitifs et un numéro peut leur être alloué
         Label.initFreeIndex()
@@ -58,6 +90,25 @@ class CompilationManager:
                 item.label.initIndex()
         return listActionsFifos
 
+    def _instructionsCount(self, nodes:StructureNodeList) -> Optional[int]:
+        """Compile la liste fournie pour en compter les instructions
+
+        :param nodes: programme en cours de transformation
+        :type nodes: StructureNodeList
+        :return: nombre d'instructions, None si le programme n'est pas encore linéaire
+        :rtype: Optional[int]
+        """
+        if nodes.head is None or any([isinstance(node, IfNode) for node in nodes]):
+            return None
+        registers = RegistersManager(self._engine.registersNumber())
+        self._lastCondition = None
+        self._registersContent = {}
+        fifos = [
+            self._compileNode(node, registers) for node in nodes
+            if not (isinstance(node, SimpleNode) and node.operator is None)
+        ]
+        return self._engine.instructionsCount(fifos)
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -76,6 +127,11 @@ class CompilationManager:
         :return: le maillon numéro de ligne, label, action fifo
         :rtype: ActionsFIFO
         """
+        # état laissé par un éventuel saut conditionnel précédent
+        lastCondition = self._lastCondition
+        registersContent = self._registersContent
+        self._lastCondition = None
+        self._registersContent = {}
         
         if isinstance(node, TransfertNode):
             expression = node.expression
@@ -98,13 +154,23 @@ class CompilationManager:
         elif isinstance(node, JumpNode):
             labelCible = node.cible.assignLabel()
             condition = node.getCondition()
+            # un saut sans label n'est atteint qu'en suivant le saut conditionnel précédent
+            # qui n'a modifié ni les registres ni le résultat de la comparaison,
+            # réutilisation réservée aux conditions traitées par la passe optimizeConditions
+            enchaine = self._linearList.conditionsOptimized and node.label is None and not lastCondition is None
             if condition is None:
                 actionsItem = ActionsFIFO()
+            elif enchaine and condition.hasSameOperands(cast(ComparaisonExpressionNode, lastCondition)):
+                actionsItem = ActionsFIFO()
+                actionsItem.append(condition.operator)
+                self._registersContent = registersContent
             else:
                 fifo = condition.getFIFO(self._engine.litteralDomain)
-                cem = CompileExpressionManager(self._engine, registers)
+                cem = CompileExpressionManager(self._engine, registers, registersContent if enchaine else None)
                 actionsItem = cem.compile(fifo)
+                self._registersContent = cem.registersContent
             actionsItem.append(labelCible, Operators.GOTO)
+            self._lastCondition = condition
 
         elif isinstance(node, SimpleNode) and not node.operator is None:
             actionsItem = ActionsFIFO()
@@ -0,0 +1,203 @@
+"""
+.. module:: modules.engine.addressmap
+:synopsis: correspondance entre les adresses du code binaire et le programme d'origine.
+    Produite par ProcessorEngine.getAddressMap en même temps que le binaire :
+    plages d'adresses → ligne d'origine, adresses des labels et des variables.
+    Les recherches par adresse se font par dichotomie.
+"""
+
+from typing import List, Dict, Tuple, Optional, Union
+from bisect import bisect_right
+import json
+
+from modules.errors import ExecutionError
+
+AddressRange = Tuple[int, int, int]
+
+class AddressMap:
+    """Correspondance adresses ↔ programme d'origine.
+
+    :Example:
+
+    >>> addressMap = AddressMap.fromLineNumbers([1, 2, 2, 3, 2, 0], {"Lab1": 4}, {"x": 6})
+    >>> addressMap.ranges
+    [(0, 1, 1), (1, 3, 2), (3, 4, 3), (4, 5, 2), (5, 6, 0)]
+    >>> addressMap.lineOf(2), addressMap.lineOf(6)
+    (2, None)
+    >>> addressMap.addressesOf(2)
+    [1, 4]
+    >>> addressMap.symbolAt(6)
+    'x'
+    >>> binary, loaded = AddressMap.loads(addressMap.dumps(["0000"]))
+    >>> binary, loaded.lineNumbers == addressMap.lineNumbers
+    (['0000'], True)
+    """
+    VERSION:int = 1
+
+    _ranges:List[AddressRange]
+    _starts:List[int]
+    _labels:Dict[str, int]
+    _variables:Dict[str, int]
+    _symbols:Dict[int, str]
+
+    def __init__(self, ranges:List[AddressRange], labels:Dict[str, int], variables:Dict[str, int]):
+        """Constructeur
+
+        :param ranges: plages d'adresses (début, fin exclue, ligne d'origine), contiguës et croissantes
+        :type ranges: List[AddressRange]
+        :param labels: adresse de chaque label, par nom
+        :type labels: Dict[str, int]
+        :param variables: adresse de chaque variable, par nom
+        :type variables: Dict[str, int]
+        """
+        self._ranges = [(start, end, lineNumber) for start, end, lineNumber in ranges]
+        self._starts = [start for start, end, lineNumber in self._ranges]
+        self._labels = dict(labels)
+        self._variables = dict(variables)
+        self._symbols = {address: name for name, address in self._variables.items()}
+
+    @classmethod
+    def fromLineNumbers(cls, lineNumbers:List[int], labels:Optional[Dict[str, int]] = None, variables:Optional[Dict[str, int]] = None) -> "AddressMap":
+        """Construit la correspondance à partir du numéro de ligne de chaque adresse,
+        les adresses consécutives d'une même ligne formant une plage
+
+        :param lineNumbers: numéro de ligne de chaque adresse d'instruction
+        :type lineNumbers: List[int]
+        :param labels: adresse de chaque label, par nom
+        :type labels: Optional[Dict[str, int]]
+        :param variables: adresse de chaque variable, par nom
+        :type variables: Optional[Dict[str, int]]
+        :return: correspondance
+        :rtype: AddressMap
+        """
+        ranges:List[AddressRange] = []
+        for address, lineNumber in enumerate(lineNumbers):
+            if len(ranges) > 0 and ranges[-1][2] == lineNumber:
+                start, end, _ = ranges[-1]
+                ranges[-1] = (start, address + 1, lineNumber)
+            else:
+                ranges.append((address, address + 1, lineNumber))
+        return cls(ranges, labels or {}, variables or {})
+
+    @property
+    def ranges(self) -> List[AddressRange]:
+        """Accesseur
+
+        :return: plages d'adresses (début, fin exclue, ligne d'origine)
+        :rtype: List[AddressRange]
+        """
+        return list(self._ranges)
+
+    @property
+    def codeSize(self) -> int:
+        """Accesseur
+
+        :return: nombre d'instructions, variables non comprises
+        :rtype: int
+        """
+        if len(self._ranges) == 0:
+            return 0
+        return self._ranges[-1][1]
+
+    @property
+    def lineNumbers(self) -> List[int]:
+        """Accesseur
+
+        :return: numéro de ligne de chaque adresse d'instruction
+        :rtype: List[int]
+        """
+        lineNumbers:List[int] = []
+        for start, end, lineNumber in self._ranges:
+            lineNumbers.extend([lineNumber] * (end - start))
+        return lineNumbers
+
+    @property
+    def labels(self) -> Dict[str, int]:
+        return dict(self._labels)
+
+    @property
+    def variables(self) -> Dict[str, int]:
+        return dict(self._variables)
+
+    def lineOf(self, address:int) -> Optional[int]:
+        """
+        :param address: adresse d'une instruction
+        :type address: int
+        :return: numéro de ligne dans le programme d'origine, None pour une adresse hors du code
+        :rtype: Optional[int]
+        """
+        index = bisect_right(self._starts, address) - 1
+        if index < 0:
+            return None
+        start, end, lineNumber = self._ranges[index]
+        if address >= end:
+            return None
+        return lineNumber
+
+    def addressesOf(self, lineNumber:int) -> List[int]:
+        """
+        :param lineNumber: numéro de ligne dans le programme d'origine
+        :type lineNumber: int
+        :return: adresse de début de chaque plage produite par cette ligne
+        :rtype: List[int]
+        """
+        return [start for start, end, item in self._ranges if item == lineNumber]
+
+    def variableAddress(self, name:str) -> int:
+        """
+        :param name: nom de la variable
+        :type name: str
+        :return: adresse de la variable
+        :rtype: int
+        :raises: ExecutionError si la variable est inconnue
+        """
+        if not name in self._variables:
+            raise ExecutionError("Variable inconnue : {}".format(name))
+        return self._variables[name]
+
+    def symbolAt(self, address:int) -> Optional[str]:
+        """
+        :param address: adresse mémoire
+        :type address: int
+        :return: nom de la variable rangée à cette adresse, None s'il n'y en a pas
+        :rtype: Optional[str]
+        """
+        return self._symbols.get(address)
+
+    def dumps(self, binary:Optional[List[str]] = None) -> str:
+        """Sérialisation JSON, avec le code binaire s'il est fourni
+
+        :param binary: code binaire correspondant
+        :type binary: Optional[List[str]]
+        :return: texte JSON
+        :rtype: str
+        """
+        data:Dict[str, Union[int, List, Dict]] = {
+            "version": self.VERSION,
+            "ranges": [list(item) for item in self._ranges],
+            "labels": self._labels,
+            "variables": self._variables
+        }
+        if binary is not None:
+            data["binary"] = binary
+        return json.dumps(data)
+
+    @classmethod
+    def loads(cls, text:str) -> Tuple[Optional[List[str]], "AddressMap"]:
+        """Désérialisation d'un texte produit par dumps
+
+        :param text: texte JSON
+        :type text: str
+        :return: code binaire, None s'il n'a pas été sauvegardé, et correspondance
+        :rtype: Tuple[Optional[List[str]], AddressMap]
+        :raises: ExecutionError si le texte est illisible
+        """
+        try:
+            data = json.loads(text)
+            if data["version"] != cls.VERSION:
+                raise ExecutionError("Format de correspondance inconnu", {"version": data["version"]})
+            ranges = [(int(start), int(end), int(lineNumber)) for start, end, lineNumber in data["ranges"]]
+            addressMap = cls(ranges, data["labels"], data["variables"])
+        except (ValueError, KeyError, TypeError) as error:
+            raise ExecutionError("Correspondance illisible : {}".format(error))
+        return data.get("binary"), addressMap
@@ -222,6 +222,9 @@ class AsmGenerator_CONDITIONAL_GOTO(AsmGenerator):
         :return: Les conditions sont satisfaites
         :rtype: bool
         """
+        if len(operands) == 2:
+            # forme sans comparaison, les indicateurs de la comparaison précédente sont réutilisés
+            return operands[0] == self._comparaisonOperator and isinstance(operands[1], Label)
         if not super().sastifyConditions(operands):
             return False
         return operands[2] == self._comparaisonOperator
@@ -234,6 +237,8 @@ class AsmGenerator_CONDITIONAL_GOTO(AsmGenerator):
         :rtype: List[str]
         """
         assert self.sastifyConditions(operands)
+        if len(operands) == 2:
+            return ["{} {}".format(self._asmForGoto, operands[1])]
         register1 = operands[0]
         register2 = operands[1]
         cible     = operands[3]
@@ -254,6 +259,8 @@ class AsmGenerator_CONDITIONAL_GOTO(AsmGenerator):
         """
         assert self.sastifyConditions(operands)
         opsInt = self._operandsToInt(operands, addressList)
+        if len(operands) == 2:
+            return [self._opCodeForGoto + format(opsInt[0], "0"+str(self._slots[2])+"b")]
         opsBinary = self._intToBinary(opsInt)
         return [
             self._opCodeForCompare + opsBinary[0] + opsBinary[1],
@@ -4,7 +4,10 @@
 """
 
 from typing import List, Tuple
-from typing_extensions import TypedDict
+try:
+    from typing import TypedDict
+except ImportError: # python < 3.8
+    from typing_extensions import TypedDict # type: ignore
 from abc import ABC, ABCMeta, abstractmethod
 from enum import Enum
 
@@ -51,10 +54,19 @@ class Decodeur(metaclass=ABCMeta):
             size_args -= s
         self._args = args
         assert size_args == 0, "L'opcode {} n'a pas le bon nombre de slots pour les arguments.".format(opcode)
-        self._opcodePos = Tuple([i for i, b in enumerate(opcode) if b in "01"])
-        self._argPos = Tuple([i for i, b in enumerate(opcode) if b == "#"])
+        self._opcodePos = tuple([i for i, b in enumerate(opcode) if b in "01"])
+        self._argPos = tuple([i for i, b in enumerate(opcode) if b == "#"])
         self._regex = r"^[01]{" + str(len(opcode)) + r"}$"
 
+    @property
+    def pattern(self) -> str:
+        """Accesseur
+
+        :return: format du mot, voir le constructeur
+        :rtype: str
+        """
+        return self._opcode
+
     def match(self, binary:str) -> bool:
         """
         vérifie si le code binaire correspond au format
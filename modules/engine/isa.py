@@ -0,0 +1,343 @@
+"""
+.. module:: modules.engine.isa
+:synopsis: description déclarative du jeu d'instructions d'un modèle de processeur.
+    Chaque instruction est décrite une seule fois : opérateur, mnémonique, opcode
+    et champs dans l'ordre du codage. La description produit les générateurs
+    (notation ".3.3.6" de AsmGenerator) et les décodeurs (notation "####" de Decodeur)
+    du modèle ; check vérifie que chaque codage produit se décode en lui-même.
+
+    Champs, séparés par des espaces, la cible en premier :
+
+    * ``rN`` registre sur N bits, N = 0 pour la sortie implicite de l'UAL ;
+    * ``lN`` littéral sur N bits ;
+    * ``vN`` adresse d'une variable, ``aN`` adresse d'un label, sur N bits ;
+    * ``xN`` N bits inutilisés, à 0 dans le codage, placés juste après l'opcode.
+"""
+
+from typing import List, Dict, Tuple, Optional, Union, Any
+
+from modules.errors import CompilationError
+from modules.primitives.operators import Operator, Operators
+from modules.primitives.actionsfifo import ActionType
+from modules.primitives.litteral import Litteral
+from modules.primitives.variable import Variable
+from modules.primitives.register import Register
+from modules.primitives.label import Label
+from modules.engine.asmgenerator import AsmGenerator, AsmGenerator_SINGLE, AsmGenerator_TRANSFERT, AsmGenerator_CONDITIONAL_GOTO
+from modules.engine.decode import Decodeur, Decoded, DefaultDecoded, ArgsType
+
+Field = Tuple[str, int]
+
+FIELD_TYPES:Dict[str, Tuple[type, ArgsType]] = {
+    "r": (Register, ArgsType.REGISTRE),
+    "l": (Litteral, ArgsType.LITTERAL),
+    "v": (Variable, ArgsType.ADRESSE),
+    "a": (Label, ArgsType.ADRESSE)
+}
+
+def _parseFields(fields:str) -> List[Field]:
+    """
+    :param fields: champs, par exemple "x4 r3 r3"
+    :type fields: str
+    :return: liste des champs (lettre, nombre de bits)
+    :rtype: List[Field]
+    :raises: CompilationError si un champ est mal formé
+    """
+    parsed:List[Field] = []
+    for item in fields.split():
+        letter, width = item[0], item[1:]
+        if not (letter == "x" or letter in FIELD_TYPES) or not width.isdigit():
+            raise CompilationError("Champ d'instruction invalide : {}".format(item))
+        parsed.append((letter, int(width)))
+    return parsed
+
+class Instruction:
+    """Description d'une instruction.
+
+    Une instruction avec comparator est un saut conditionnel codé en deux mots :
+    la comparaison (opcode et champs) puis le branchement (branch, un opcode suivi d'un champ a).
+
+    :Example:
+
+    >>> add = Instruction(Operators.ADD, "ADD", "1000", "r3 r3 l6")
+    >>> add.generatorBinary, add.decodeurs()[0].pattern
+    ('1000.3.3.6', '1000############')
+    >>> Instruction(Operators.NEG, "NEG", "11110110", "x2 r0 r2").decodeurs()[0].pattern
+    '11110110XX##'
+    """
+    operator:Operator
+    mnemonic:str
+    opcode:str
+    padding:int
+    fields:List[Field]
+    comparator:Optional[Operator]
+    branchOpcode:str
+    branchField:Optional[Field]
+
+    def __init__(self, operator:Operator, mnemonic:str, opcode:str, fields:str = "", comparator:Optional[Operator] = None, branch:str = ""):
+        """Constructeur
+
+        :param operator: opérateur produit par la compilation
+        :type operator: Operator
+        :param mnemonic: mnémonique assembleur, "comparaison;branchement" pour un saut conditionnel
+        :type mnemonic: str
+        :param opcode: bits fixes du début du mot
+        :type opcode: str
+        :param fields: champs du mot, la cible en premier
+        :type fields: str
+        :param comparator: comparaison d'un saut conditionnel
+        :type comparator: Optional[Operator]
+        :param branch: opcode et champ du mot de branchement d'un saut conditionnel, par exemple "0010 a8"
+        :type branch: str
+        :raises: CompilationError si la description est incohérente
+        """
+        self.operator = operator
+        self.mnemonic = mnemonic
+        self.opcode = opcode
+        parsed = _parseFields(fields)
+        self.padding = sum([width for letter, width in parsed if letter == "x"])
+        self.fields = [field for field in parsed if field[0] != "x"]
+        letters = "".join([letter for letter, width in parsed])
+        if "x" in letters.lstrip("x"):
+            raise CompilationError("Les bits inutilisés doivent suivre l'opcode : {}".format(mnemonic))
+        self.comparator = comparator
+        self.branchOpcode = ""
+        self.branchField = None
+        if comparator is None:
+            return
+        branchOpcode, _, branchField = branch.partition(" ")
+        branchFields = _parseFields(branchField)
+        if len(branchFields) != 1 or branchFields[0][0] != "a" or [letter for letter, width in self.fields] != ["r", "r"]:
+            raise CompilationError("Saut conditionnel mal décrit : {}".format(mnemonic))
+        self.branchOpcode = branchOpcode
+        self.branchField = branchFields[0]
+
+    @property
+    def size(self) -> int:
+        """Accesseur
+
+        :return: nombre de bits d'un mot de l'instruction
+        :rtype: int
+        """
+        return len(self.opcode) + self.padding + sum([width for letter, width in self.fields])
+
+    @property
+    def generatorBinary(self) -> str:
+        """Accesseur
+
+        :return: codage dans la notation de AsmGenerator
+        :rtype: str
+        """
+        binary = self.opcode
+        if self.padding > 0:
+            binary += "#{}#".format(self.padding)
+        binary += "".join([".{}".format(width) for letter, width in self.fields])
+        if not self.branchField is None:
+            binary += ".{}.{}".format(self.branchOpcode, self.branchField[1])
+        return binary
+
+    def generator(self) -> AsmGenerator:
+        """
+        :return: générateur de l'instruction
+        :rtype: AsmGenerator
+        """
+        if not self.comparator is None:
+            return AsmGenerator_CONDITIONAL_GOTO(self.operator, self.mnemonic, self.generatorBinary, comparator=self.comparator)
+        if len(self.fields) == 0:
+            return AsmGenerator_SINGLE(self.operator, self.mnemonic, self.generatorBinary)
+        # les opérandes de la compilation placent la cible en dernier
+        types = [FIELD_TYPES[letter][0] for letter, width in self.fields]
+        return AsmGenerator_TRANSFERT(self.operator, self.mnemonic, self.generatorBinary, operands=types[1:] + types[:1])
+
+    def decodeurs(self) -> List[Decodeur]:
+        """
+        :return: décodeurs des mots de l'instruction
+        :rtype: List[Decodeur]
+        """
+        args = [(FIELD_TYPES[letter][1], width) for letter, width in self.fields if width > 0]
+        pattern = self.opcode + "X" * self.padding + "#" * sum([width for letter, width in self.fields])
+        if self.branchField is None:
+            return [Decodeur(pattern, self.operator, *args)]
+        branchPattern = self.branchOpcode + "#" * self.branchField[1]
+        return [
+            Decodeur(pattern, Operators.CMP, *args),
+            Decodeur(branchPattern, self.comparator, (ArgsType.ADRESSE, self.branchField[1]))
+        ]
+
+class IsaDescription:
+    """Description complète d'un modèle de processeur
+    """
+    name:str
+    dataBits:int
+    registerBits:int
+    freeUalOutput:bool
+    litteralDomain:Tuple[int, int]
+    comparators:List[Operator]
+    instructions:List[Instruction]
+
+    def __init__(self, name:str, dataBits:int, registerBits:int, freeUalOutput:bool, litteralDomain:Tuple[int, int], comparators:List[Operator], instructions:List[Instruction]):
+        """Constructeur
+
+        :param name: nom du modèle
+        :type name: str
+        :param dataBits: nombre de bits d'un mot
+        :type dataBits: int
+        :param registerBits: nombre de bits de l'adresse d'un registre
+        :type registerBits: int
+        :param freeUalOutput: la sortie de l'UAL peut être choisie
+        :type freeUalOutput: bool
+        :param litteralDomain: valeurs extrêmes des littéraux
+        :type litteralDomain: Tuple[int, int]
+        :param comparators: comparaisons disponibles
+        :type comparators: List[Operator]
+        :param instructions: instructions, dans l'ordre de recherche des générateurs et des décodeurs
+        :type instructions: List[Instruction]
+        :raises: CompilationError si une instruction n'a pas la taille d'un mot
+        """
+        self.name = name
+        self.dataBits = dataBits
+        self.registerBits = registerBits
+        self.freeUalOutput = freeUalOutput
+        self.litteralDomain = litteralDomain
+        self.comparators = list(comparators)
+        self.instructions = list(instructions)
+        for instruction in self.instructions:
+            sizes = [instruction.size]
+            if not instruction.branchField is None:
+                sizes.append(len(instruction.branchOpcode) + instruction.branchField[1])
+            if any([size != dataBits for size in sizes]):
+                raise CompilationError("L'instruction {} n'occupe pas un mot de {} bits".format(instruction.mnemonic, dataBits))
+
+    def asmGenerators(self) -> Tuple[AsmGenerator, ...]:
+        """
+        :return: générateurs du modèle
+        :rtype: Tuple[AsmGenerator, ...]
+        """
+        return tuple([instruction.generator() for instruction in self.instructions])
+
+    def decodeurs(self) -> Tuple[Decodeur, ...]:
+        """
+        :return: décodeurs du modèle, chaque codage n'apparaissant qu'une fois,
+          celui de la comparaison après ceux des sauts conditionnels
+        :rtype: Tuple[Decodeur, ...]
+        """
+        decodeurs:Dict[str, Decodeur] = {}
+        comparaisons:Dict[str, Decodeur] = {}
+        for instruction in self.instructions:
+            words = instruction.decodeurs()
+            if instruction.branchField is not None:
+                # saut conditionnel : comparaison puis branchement
+                comparaison = words.pop(0)
+                comparaisons.setdefault(comparaison.pattern, comparaison)
+            for decodeur in words:
+                decodeurs.setdefault(decodeur.pattern, decodeur)
+        return tuple(decodeurs.values()) + tuple(comparaisons.values())
+
+    def opcodeTable(self) -> str:
+        """
+        :return: codage de chaque mot, une ligne "MNÉMONIQUE : codage" par mot,
+          dans l'ordre des instructions, la comparaison n'apparaissant qu'une fois
+        :rtype: str
+        """
+        lines:List[str] = []
+        for instruction in self.instructions:
+            mnemonics = instruction.mnemonic.split(";")
+            for mnemonic, decodeur in zip(mnemonics, instruction.decodeurs()):
+                line = "{:<7} : {}".format(mnemonic, decodeur.pattern)
+                if not line in lines:
+                    lines.append(line)
+        return "\n".join(lines)
+
+    def engineAttributes(self) -> Dict[str, Any]:
+        """
+        :return: attributs de classe d'un ProcessorEngine décrit par ce modèle
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "_name": self.name,
+            "_register_address_bits": self.registerBits,
+            "_data_bits": self.dataBits,
+            "_freeUalOutput": self.freeUalOutput,
+            "_litteralDomain": self.litteralDomain,
+            "_comparaisonOperators": list(self.comparators),
+            "_asmGenerators": self.asmGenerators(),
+            "_decodeurs": self.decodeurs()
+        }
+
+    def engineClass(self, className:str, moduleName:str = __name__) -> type:
+        """Crée une classe de modèle de processeur, à déclarer dans modules.engine.registry
+
+        :param className: nom de la classe
+        :type className: str
+        :param moduleName: module où la classe est rangée, pour qu'un exécuteur qui l'utilise puisse être sérialisé
+        :type moduleName: str
+        :return: sous-classe de ProcessorEngine
+        :rtype: type
+        """
+        from modules.engine.processorengine import ProcessorEngine
+        attributes = self.engineAttributes()
+        attributes["__module__"] = moduleName
+        return type(className, (ProcessorEngine,), attributes)
+
+    def _sampleValues(self, instruction:Instruction) -> List[List[int]]:
+        """
+        :param instruction: instruction
+        :type instruction: Instruction
+        :return: valeurs des champs à vérifier : tous à 0, tous au maximum, tous différents
+        :rtype: List[List[int]]
+        """
+        widths = [width for letter, width in instruction.fields]
+        if not instruction.branchField is None:
+            widths.append(instruction.branchField[1])
+        return [
+            [0 for width in widths],
+            [2**width - 1 for width in widths],
+            [(index + 1) % 2**width if width > 0 else 0 for index, width in enumerate(widths)]
+        ]
+
+    def _decode(self, decodeurs:Tuple[Decodeur, ...], word:str) -> Decoded:
+        for decodeur in decodeurs:
+            if decodeur.match(word):
+                return decodeur.decode(word)
+        return DefaultDecoded
+
+    def check(self) -> List[str]:
+        """Vérifie que chaque codage produit par les générateurs est reconnu
+        par les décodeurs comme la même instruction, avec les mêmes champs
+
+        :return: description des erreurs, vide si le modèle est cohérent
+        :rtype: List[str]
+        """
+        decodeurs = self.decodeurs()
+        errors:List[str] = []
+        for instruction in self.instructions:
+            generator = instruction.generator()
+            for values in self._sampleValues(instruction):
+                addressList:Dict[Union[Label, Variable], int] = {}
+                objects:List[ActionType] = []
+                for (letter, width), value in zip(instruction.fields, values):
+                    if letter == "r":
+                        objects.append(Register(value, False))
+                    elif letter == "l":
+                        objects.append(Litteral(value))
+                    else:
+                        item = Variable("isa") if letter == "v" else Label()
+                        addressList[item] = value
+                        objects.append(item)
+                expected:List[Tuple[Operator, List[Tuple[ArgsType, int]]]] = [(
+                    instruction.operator if instruction.comparator is None else Operators.CMP,
+                    [(FIELD_TYPES[letter][1], value) for (letter, width), value in zip(instruction.fields, values) if width > 0]
+                )]
+                if instruction.comparator is None:
+                    operands = objects[1:] + objects[:1]
+                else:
+                    label = Label()
+                    addressList[label] = values[-1]
+                    operands = objects + [instruction.comparator, label]
+                    expected.append((instruction.comparator, [(ArgsType.ADRESSE, values[-1])]))
+                words = generator.binary(operands, addressList)
+                for word, (operator, args) in zip(words, expected):
+                    decoded = self._decode(decodeurs, word)
+                    if len(word) != self.dataBits or decoded["operator"] != operator or decoded["args"] != args:
+                        errors.append("{} {} : {} décodé en {} {}".format(instruction.mnemonic, values, word, decoded["operator"], decoded["args"]))
+        return errors
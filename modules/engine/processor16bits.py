@@ -1,144 +1,66 @@
 """
 .. module:: processor16bitsengine
    :synopsis: Exemple de modèle de processeur
+
+Le codage des instructions est décrit par ISA, voir ISA.opcodeTable()
 """
 
-from typing import Tuple
+from typing import List, Tuple
 
 from modules.engine.processorengine import ProcessorEngine
 from modules.primitives.operators import Operators, Operator
-from modules.primitives.actionsfifo import ActionType, ActionsFIFO
 from modules.primitives.litteral import Litteral
-from modules.primitives.variable import Variable
-from modules.primitives.register import Register
-from modules.primitives.label import Label
-from modules.engine.asmgenerator import AsmGenerator ,AsmGenerator_SINGLE, AsmGenerator_TRANSFERT, AsmGenerator_CONDITIONAL_GOTO
-
-from modules.engine.decode import Decodeur, ArgsType
-
-'''
-littéraux
-NEG     : 010110##########
-INVERSE : 010111##########
-ADD     : 1000############
-MINUS   : 1001############
-MULT    : 1010############
-DIV     : 1011############
-MOD     : 1100############
-AND     : 1101############
-OR      : 1110############
-XOR     : 1111############
-MOVE    : 01001###########
-autres
-HALT    : 0000XXXXXXXXXXXX
-NEG     : 010100XXXX######
-INVERSE : 010101XXXX######
-ADD     : 0110000#########
-MINUS   : 0110001#########
-MULT    : 0110010#########
-DIV     : 0110011#########
-MOD     : 0110100#########
-AND     : 0110101#########
-OR      : 0110110#########
-XOR     : 0110111#########
-HALT    : 00000XXXXXXXXXXX
-GOTO    : 00001###########
-NOTEQ   : 0001000#########
-EQ      : 0001001#########
-INF     : 0001010#########
-SUP     : 0001011#########
-CMP     : 00011XXXXX######
-PRINT   : 00100XXXXXXXX###
-INPUT   : 00101XX#########
-LOAD    : 0011############
-MOVE    : 01000XXXXX######
-STORE   : 0111############
-'''
+from modules.engine.asmgenerator import AsmGenerator
+from modules.engine.decode import Decodeur
+from modules.engine.isa import IsaDescription, Instruction
 
-class Processor16Bits(ProcessorEngine):
-    _name                  :str = "Processeur 16 bits"
-    _register_address_bits :int = 3
-    _data_bits             :int = 16
-    _freeUalOutput         :bool = True
-    _litteralDomain        :Tuple[int,int] = (0,63)
-    
-    _comparaisonOperators = [
-        Operators.NOTEQ,
-        Operators.EQ,
-        Operators.INF,
-        Operators.SUP
+ISA = IsaDescription("Processeur 16 bits", dataBits=16, registerBits=3, freeUalOutput=True, litteralDomain=(0,63),
+    comparators=[Operators.NOTEQ, Operators.EQ, Operators.INF, Operators.SUP],
+    instructions=[
+        Instruction(Operators.NEG,     "NEG",   "010110",  "r3 l7"),
+        Instruction(Operators.INVERSE, "NOT",   "010111",  "r3 l7"),
+        Instruction(Operators.ADD,     "ADD",   "1000",    "r3 r3 l6"),
+        Instruction(Operators.MINUS,   "SUB",   "1001",    "r3 r3 l6"),
+        Instruction(Operators.MULT,    "MULT",  "1010",    "r3 r3 l6"),
+        Instruction(Operators.DIV,     "DIV",   "1011",    "r3 r3 l6"),
+        Instruction(Operators.MOD,     "MOD",   "1100",    "r3 r3 l6"),
+        Instruction(Operators.AND,     "AND",   "1101",    "r3 r3 l6"),
+        Instruction(Operators.OR,      "OR",    "1110",    "r3 r3 l6"),
+        Instruction(Operators.XOR,     "XOR",   "1111",    "r3 r3 l6"),
+        Instruction(Operators.MOVE,    "MOVE",  "01001",   "r3 l8"),
+        Instruction(Operators.NEG,     "NEG",   "010100",  "x4 r3 r3"),
+        Instruction(Operators.INVERSE, "NOT",   "010101",  "x4 r3 r3"),
+        Instruction(Operators.ADD,     "ADD",   "0110000", "r3 r3 r3"),
+        Instruction(Operators.MINUS,   "SUB",   "0110001", "r3 r3 r3"),
+        Instruction(Operators.MULT,    "MULT",  "0110010", "r3 r3 r3"),
+        Instruction(Operators.DIV,     "DIV",   "0110011", "r3 r3 r3"),
+        Instruction(Operators.MOD,     "MOD",   "0110100", "r3 r3 r3"),
+        Instruction(Operators.AND,     "AND",   "0110101", "r3 r3 r3"),
+        Instruction(Operators.OR,      "OR",    "0110110", "r3 r3 r3"),
+        Instruction(Operators.XOR,     "XOR",   "0110111", "r3 r3 r3"),
+        Instruction(Operators.MOVE,    "MOVE",  "01000",   "x5 r3 r3"),
+        Instruction(Operators.PRINT,   "PRINT", "00100",   "x8 r3"),
+        Instruction(Operators.INPUT,   "INPUT", "00101",   "x2 v9"),
+        Instruction(Operators.LOAD,    "LOAD",  "0011",    "r3 v9"),
+        Instruction(Operators.STORE,   "STORE", "0111",    "v9 r3"),
+        Instruction(Operators.HALT,    "HALT",  "00000",   "x11"),
+        Instruction(Operators.GOTO,    "JMP",   "00001",   "a11"),
+        Instruction(Operators.GOTO, "CMP;BNE", "00011", "x5 r3 r3", comparator=Operators.NOTEQ, branch="0001000 a9"),
+        Instruction(Operators.GOTO, "CMP;BEQ", "00011", "x5 r3 r3", comparator=Operators.EQ,    branch="0001001 a9"),
+        Instruction(Operators.GOTO, "CMP;BLT", "00011", "x5 r3 r3", comparator=Operators.INF,   branch="0001010 a9"),
+        Instruction(Operators.GOTO, "CMP;BGT", "00011", "x5 r3 r3", comparator=Operators.SUP,   branch="0001011 a9")
     ]
+)
 
-    _asmGenerators: Tuple[AsmGenerator, ...] = (
-        AsmGenerator_TRANSFERT(Operators.NEG,     "NEG",   "010110.3.7",     operands = [Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.INVERSE, "NOT",   "010111.3.7",     operands = [Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.ADD,     "ADD",   "1000.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.MINUS,   "SUB",   "1001.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.MULT,    "MULT",  "1010.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.DIV,     "DIV",   "1011.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.MOD,     "MOD",   "1100.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.AND,     "AND",   "1101.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.OR,      "OR",    "1110.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.XOR,     "XOR",   "1111.3.3.6",     operands = [Register, Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.MOVE,    "MOVE",  "01001.3.8",      operands = [Litteral, Register]),
-        AsmGenerator_TRANSFERT(Operators.NEG,     "NEG",   "010100#4#.3.3",  operands = [Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.INVERSE, "NOT",   "010101#4#.3.3",  operands = [Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.ADD,     "ADD",   "0110000.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.MINUS,   "SUB",   "0110001.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.MULT,    "MULT",  "0110010.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.DIV,     "DIV",   "0110011.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.MOD,     "MOD",   "0110100.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.AND,     "AND",   "0110101.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.OR,      "OR",    "0110110.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.XOR,     "XOR",   "0110111.3.3.3",  operands = [Register, Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.GOTO,    "MOVE",  "01000#5#.3.3",   operands = [Register, Register]),
-        AsmGenerator_TRANSFERT(Operators.PRINT,   "PRINT", "00100#8#.3",     operands = [Register]),
-        AsmGenerator_TRANSFERT(Operators.INPUT,   "INPUT", "00101#2#.9",      operands = [Variable]),
-        AsmGenerator_TRANSFERT(Operators.LOAD,    "LOAD",  "0011.3.9",       operands = [Variable, Register]),
-        AsmGenerator_TRANSFERT(Operators.STORE,   "STORE", "0111.9.3",       operands = [Register, Variable]),
-        AsmGenerator_SINGLE(Operators.HALT,       "HALT",  "0000#12"),
-        AsmGenerator_TRANSFERT(Operators.GOTO,    "JMP",   "00001.11",       operands = [Label]),
-        AsmGenerator_CONDITIONAL_GOTO(Operators.GOTO, "CMP;BNE", "00011#5#.3.3.0001000.9", comparator = Operators.NOTEQ),
-        AsmGenerator_CONDITIONAL_GOTO(Operators.GOTO, "CMP;BEQ", "00011#5#.3.3.0001001.9", comparator = Operators.EQ),
-        AsmGenerator_CONDITIONAL_GOTO(Operators.GOTO, "CMP;BLT", "00011#5#.3.3.0001010.9", comparator = Operators.INF),
-        AsmGenerator_CONDITIONAL_GOTO(Operators.GOTO, "CMP;BGT", "00011#5#.3.3.0001011.9", comparator = Operators.SUP)
-    )
-
-    _decodeurs: Tuple[Decodeur,...] = (
-        Decodeur("010110##########", Operators.NEG, (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 7)),
-        Decodeur("010111##########", Operators.INVERSE, (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 7)),
-        Decodeur("1000############", Operators.ADD, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1001############", Operators.MINUS, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1010############", Operators.MULT, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1011############", Operators.DIV, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1100############", Operators.MOD, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1101############", Operators.AND, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1110############", Operators.OR, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("1111############", Operators.XOR, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 6)),
-        Decodeur("01001###########", Operators.MOVE, (ArgsType.REGISTRE, 3), (ArgsType.LITTERAL, 8)),
-        Decodeur("010100XXXX######", Operators.NEG, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("010101XXXX######", Operators.INVERSE, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110000#########", Operators.ADD, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110001#########", Operators.MINUS, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110010#########", Operators.MULT, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110011#########", Operators.DIV, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110100#########", Operators.MOD, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110101#########", Operators.AND, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110110#########", Operators.OR, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("0110111#########", Operators.XOR, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("01000XXXXX######", Operators.MOVE, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3)),
-        Decodeur("00100XXXXXXXX###", Operators.PRINT, (ArgsType.REGISTRE, 3)),
-        Decodeur("00101XX#########", Operators.INPUT, (ArgsType.ADRESSE, 9)),
-        Decodeur("0011############", Operators.LOAD, (ArgsType.REGISTRE, 3), (ArgsType.ADRESSE, 9)),
-        Decodeur("0111############", Operators.STORE, (ArgsType.ADRESSE, 9), (ArgsType.REGISTRE, 3)),
-        Decodeur("0000XXXXXXXXXXXX", Operators.HALT),
-        Decodeur("00001###########", Operators.GOTO, (ArgsType.ADRESSE, 11)),
-        Decodeur("0001000#########", Operators.NOTEQ, (ArgsType.ADRESSE, 9)),
-        Decodeur("0001001#########", Operators.EQ, (ArgsType.ADRESSE, 9)),
-        Decodeur("0001010#########", Operators.INF, (ArgsType.ADRESSE, 9)),
-        Decodeur("0001011#########", Operators.SUP, (ArgsType.ADRESSE, 9)),
-        Decodeur("0011XXXXX#######", Operators.CMP, (ArgsType.REGISTRE, 3), (ArgsType.REGISTRE, 3))
-    )
+class Processor16Bits(ProcessorEngine):
+    _name                  :str = ISA.name
+    _register_address_bits :int = ISA.registerBits
+    _data_bits             :int = ISA.dataBits
+    _freeUalOutput         :bool = ISA.freeUalOutput
+    _litteralDomain        :Tuple[int,int] = ISA.litteralDomain
+    _comparaisonOperators  :List[Operator] = ISA.comparators
+    _asmGenerators         :Tuple[AsmGenerator, ...] = ISA.asmGenerators()
+    _decodeurs             :Tuple[Decodeur,...] = ISA.decodeurs()
 
 
     # hérité
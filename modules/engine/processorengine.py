@@ -15,8 +15,16 @@ from modules.primitives.operators import Operator, Operators
 from modules.primitives.actionsfifo import ActionsFIFO, ActionType
 from modules.engine.asmgenerator import AsmGenerator
 from modules.engine.decode import Decodeur, Decoded, DefaultDecoded
+from modules.engine.addressmap import AddressMap
 
 class ProcessorEngine(metaclass=ABCMeta):
+    """Modèle de processeur.
+
+    Les tables d'un modèle sont des attributs de classe ; les index qui en sont dérivés
+    (générateurs par opérateur, instructions décodées par mot binaire) sont calculés à la
+    première utilisation puis partagés par toutes les instances du modèle. Une instance
+    ne conserve aucun état : une seule suffit par processus, voir modules.engine.registry.getEngine.
+    """
     _name                  :str
     _register_address_bits :int
     _data_bits             :int
@@ -27,29 +35,35 @@ class ProcessorEngine(metaclass=ABCMeta):
     _comparaisonOperators: List[Operator]
     _litteralDomain      :Tuple[int, int]
 
-    def __init__(self):
-        """Constructeur
+    @classmethod
+    def _classCache(cls, key:str) -> Dict[Any, Any]:
+        """Cache propre à la classe du modèle, partagé par ses instances
 
-        :param name: nom du modèle de processeur utilisé
-        :type name: str
+        :param key: nom du cache
+        :type key: str
+        :return: dictionnaire du cache, créé au premier appel
+        :rtype: Dict[Any, Any]
         """
-        if self.ualOutputIsFree():
-            destReg = 1
-        else:
-            destReg = 0
-        self.__opNumber = {
-            "neg":  1 + destReg,
-            "move": 2,
-            "+":    2 + destReg,
-            "-":    2 + destReg,
-            "*":    2 + destReg,
-            "/":    2 + destReg,
-            "%":    2 + destReg,
-            "&":    2 + destReg,
-            "|":    2 + destReg,
-            "^":    2 + destReg,
-            "~":    1 + destReg,
-        }
+        attribute = "_cache_" + key
+        cache = cls.__dict__.get(attribute)
+        if cache is None:
+            cache = {}
+            setattr(cls, attribute, cache)
+        return cache
+
+    @classmethod
+    def _generatorsFor(cls, operator:Operator) -> Tuple[AsmGenerator,...]:
+        """
+        :param operator: opérateur
+        :type operator: Operator
+        :return: générateurs de cet opérateur, dans l'ordre de _asmGenerators
+        :rtype: Tuple[AsmGenerator,...]
+        """
+        index = cls._classCache("generators")
+        if len(index) == 0:
+            for asmGen in cls._asmGenerators:
+                index[asmGen.operator] = index.get(asmGen.operator, ()) + (asmGen,)
+        return index.get(operator, ())
 
     @property
     def name(self):
@@ -122,12 +136,25 @@ class ProcessorEngine(metaclass=ABCMeta):
         :result: objet contenant l'opérateur et les arguments
         :rtype: Decoded
 
+        .. note:: le décodage d'un entier est mis en cache pour le modèle, le résultat
+          est partagé et ne doit pas être modifié.
         """
         if isinstance(binary, int):
-            strBinary = format(binary, '0'+str(self._data_bits)+'b')
-        else:
-            strBinary = binary
-        
+            cache = self._classCache("decoded")
+            decoded = cache.get(binary)
+            if decoded is None:
+                decoded = self._decode(format(binary, '0'+str(self._data_bits)+'b'))
+                cache[binary] = decoded
+            return decoded
+        return self._decode(binary)
+
+    def _decode(self, strBinary:str) -> Decoded:
+        """
+        :param strBinary: code binaire
+        :type strBinary: str
+        :result: objet contenant l'opérateur et les arguments
+        :rtype: Decoded
+        """
         for decodeurItem in self._decodeurs:
             if decodeurItem.match(strBinary):
                 return decodeurItem.decode(strBinary)
@@ -195,8 +222,8 @@ class ProcessorEngine(metaclass=ABCMeta):
         :rtype: List[str]
         :raise: CompilationError
         """
-        for asmGen in self._asmGenerators:
-            if asmGen.operator != operator or not asmGen.sastifyConditions(operands):
+        for asmGen in self._generatorsFor(operator):
+            if not asmGen.sastifyConditions(operands):
                 continue
             return asmGen.asm(operands)
         strOperands = ", ".join([str(it) for it in operands])
@@ -261,6 +288,52 @@ class ProcessorEngine(metaclass=ABCMeta):
         variablesList = self._getVariablesList(fifos)
         return [v.binary(self.dataBits) for v in variablesList]
 
+    def instructionsCount(self, fifos:List[ActionsFIFO]) -> int:
+        """
+        :param fifos: file des actions produite par la compilation
+        :type fifos: List[ActionsFIFO]
+        :return: nombre d'instructions du programme, variables non comprises
+        :rtype: int
+        :raises: CompilationError
+        """
+        return sum([len(self._actionToAsm(fifo.clone())) for fifo in fifos])
+
+    def getAddressMap(self, fifos:List[ActionsFIFO]) -> AddressMap:
+        """
+        :param fifos: file des actions produite par la compilation
+        :type fifos: List[ActionsFIFO]
+        :return: correspondance entre les adresses du binaire produit par getBinary
+          et les lignes, labels et variables du programme d'origine
+        :rtype: AddressMap
+        :raises: CompilationError
+        """
+        ranges:List[Tuple[int, int, int]] = []
+        labels:Dict[str, int] = {}
+        address = 0
+        for fifo in fifos:
+            if not fifo.label is None:
+                labels[fifo.label.name] = address
+            size = len(self._actionToAsm(fifo.clone()))
+            if size == 0:
+                continue
+            if len(ranges) > 0 and ranges[-1][2] == fifo.lineNumber:
+                ranges[-1] = (ranges[-1][0], address + size, fifo.lineNumber)
+            else:
+                ranges.append((address, address + size, fifo.lineNumber))
+            address += size
+        variables = {v.name: address + index for index, v in enumerate(self._getVariablesList(fifos))}
+        return AddressMap(ranges, labels, variables)
+
+    def getLineNumbers(self, fifos:List[ActionsFIFO]) -> List[int]:
+        """
+        :param fifos: file des actions produite par la compilation
+        :type fifos: List[ActionsFIFO]
+        :return: pour chaque adresse d'instruction, numéro de ligne dans le programme d'origine
+        :rtype: List[int]
+        :raises: CompilationError
+        """
+        return self.getAddressMap(fifos).lineNumbers
+
     def getAsm(self, fifos:Union[ActionsFIFO, List[ActionsFIFO]], withVariables:bool=False) -> str:
         """
         :param fifos: file des actions produite par la compilation
@@ -318,8 +391,8 @@ class ProcessorEngine(metaclass=ABCMeta):
         :rtype: List[str]
         :raise: CompilationError
         """
-        for asmGen in self._asmGenerators:
-            if asmGen.operator != operator or not asmGen.sastifyConditions(operands):
+        for asmGen in self._generatorsFor(operator):
+            if not asmGen.sastifyConditions(operands):
                 continue
             return asmGen.binary(operands,addressList)
         strOperands = ", ".join([str(it) for it in operands])
@@ -0,0 +1,172 @@
+"""
+.. module:: modules.engine.registry
+:synopsis: modèles de processeur disponibles, désignés par un nom court.
+    Le module d'un modèle n'est importé qu'à la première demande : un programme
+    qui n'utilise que le modèle 16 bits ne charge pas le modèle 12 bits.
+    Chaque modèle est instancié une seule fois par processus, voir getEngine.
+
+    D'autres modèles peuvent être déclarés :
+
+    * par registerEngine ;
+    * dans un fichier JSON désigné par la variable d'environnement UPSIM_ENGINES,
+      de la forme ``{"nom": "module:Classe"}`` ou ``{"nom": {"class": "module:Classe", "label": "libellé"}}`` ;
+    * par un paquet installé, dans le groupe de points d'entrée ``upsimulator.engines``.
+      Ces points d'entrée ne sont lus que pour un nom inconnu ou pour la liste complète,
+      leur lecture coûtant plus que l'import du compilateur.
+"""
+
+from typing import List, Dict, Tuple, Type, Union, Any, TYPE_CHECKING
+import importlib
+import json
+import os
+
+from modules.errors import CompilationError
+
+if TYPE_CHECKING:
+    from modules.engine.processorengine import ProcessorEngine
+
+ENTRY_POINT_GROUP:str = "upsimulator.engines"
+CONFIG_VARIABLE:str = "UPSIM_ENGINES"
+
+# nom court -> (module:classe ou classe, libellé)
+ENGINES:Dict[str, Tuple[Union[str, type], str]] = {
+    "16": ("modules.engine.processor16bits:Processor16Bits", "16 bits"),
+    "12": ("modules.engine.processor12bits:Processor12Bits", "12 bits")
+}
+
+DEFAULT_ENGINE:str = "16"
+
+_instances:Dict[str, "ProcessorEngine"] = {}
+_loaded:Dict[str, bool] = {"config": False, "entryPoints": False}
+
+def registerEngine(name:str, target:Union[str, type], label:str = "") -> None:
+    """Déclare un modèle de processeur, en remplaçant un modèle de même nom
+
+    :param name: nom court du modèle
+    :type name: str
+    :param target: classe du modèle, ou chemin "module:Classe" importé à la première demande
+    :type target: Union[str, type]
+    :param label: libellé du modèle, le nom court si vide
+    :type label: str
+    """
+    ENGINES[name] = (target, label if label != "" else name)
+    _instances.pop(name, None)
+
+def loadConfig(path:str) -> None:
+    """Déclare les modèles décrits dans un fichier JSON
+
+    :param path: chemin du fichier
+    :type path: str
+    :raises: CompilationError si le fichier est illisible
+    """
+    try:
+        with open(path, encoding="utf-8") as configFile:
+            data = json.load(configFile)
+        for name, description in data.items():
+            if isinstance(description, str):
+                registerEngine(name, description)
+            else:
+                registerEngine(name, description["class"], description.get("label", ""))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+        raise CompilationError("Configuration des modèles illisible : {}".format(error))
+
+def _loadConfig() -> None:
+    """Lit une fois le fichier désigné par la variable d'environnement
+    """
+    if _loaded["config"]:
+        return
+    _loaded["config"] = True
+    path = os.environ.get(CONFIG_VARIABLE, "")
+    if path != "":
+        loadConfig(path)
+
+def _loadEntryPoints() -> None:
+    """Lit une fois les points d'entrée des paquets installés,
+    sans importer les modules qu'ils désignent
+    """
+    if _loaded["entryPoints"]:
+        return
+    _loaded["entryPoints"] = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError: # python < 3.8
+        return
+    found:Any = entry_points()
+    if hasattr(found, "select"):
+        items = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        items = found.get(ENTRY_POINT_GROUP, [])
+    for item in items:
+        if not item.name in ENGINES:
+            registerEngine(item.name, item.value)
+
+def engineNames() -> List[str]:
+    """
+    :return: noms courts de tous les modèles disponibles, dans l'ordre de déclaration
+    :rtype: List[str]
+    """
+    _loadConfig()
+    _loadEntryPoints()
+    return list(ENGINES)
+
+def engineLabel(name:str) -> str:
+    """
+    :param name: nom court du modèle
+    :type name: str
+    :return: libellé du modèle, pour un menu
+    :rtype: str
+    :raises: CompilationError si le modèle est inconnu
+    """
+    return ENGINES[_find(name)][1]
+
+def _find(name:str) -> str:
+    """
+    :param name: nom court du modèle
+    :type name: str
+    :return: le nom, une fois vérifié qu'il est déclaré
+    :rtype: str
+    :raises: CompilationError si le modèle est inconnu
+    """
+    _loadConfig()
+    if not name in ENGINES:
+        _loadEntryPoints()
+    if not name in ENGINES:
+        raise CompilationError("Modèle de processeur inconnu : {}".format(name), {"available": list(ENGINES)})
+    return name
+
+def engineClass(name:str) -> Type["ProcessorEngine"]:
+    """Importe le module du modèle si nécessaire
+
+    :param name: nom court du modèle
+    :type name: str
+    :return: classe du modèle
+    :rtype: Type[ProcessorEngine]
+    :raises: CompilationError si le modèle est inconnu ou ne peut pas être importé
+    """
+    target, label = ENGINES[_find(name)]
+    if not isinstance(target, str):
+        return target
+    moduleName, _, className = target.partition(":")
+    try:
+        loaded = getattr(importlib.import_module(moduleName), className)
+    except (ImportError, AttributeError) as error:
+        raise CompilationError("Modèle de processeur {} introuvable : {}".format(name, error))
+    ENGINES[name] = (loaded, label)
+    return loaded
+
+def getEngine(name:str) -> "ProcessorEngine":
+    """Modèle de processeur partagé par toutes les compilations et tous les exécuteurs du processus.
+    Un modèle ne conserve aucun état propre à une compilation : ses tables sont
+    des attributs de classe et ses caches sont partagés par toutes ses instances.
+
+    :param name: nom court du modèle
+    :type name: str
+    :return: instance unique du modèle
+    :rtype: ProcessorEngine
+    :raises: CompilationError si le modèle est inconnu
+    """
+    engine = _instances.get(name)
+    if engine is None:
+        engine = engineClass(name)()
+        _instances[name] = engine
+    return engine
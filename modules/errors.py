@@ -55,3 +55,15 @@ class AttributesError(Exception):
 
         # Now for your custom code...
         self.errors = errors
+
+class ExecutionError(Exception):
+    '''
+    Erreur levée quand l'état de l'exécuteur ne peut pas être sauvegardé ou restauré
+    '''
+    def __init__(self, message, errors = None):
+
+        # Call the base class constructor with the parameters it needs
+        super().__init__(message)
+
+        # Now for your custom code...
+        self.errors = errors
@@ -0,0 +1,91 @@
+"""
+.. module:: modules.exec.asyncexecuteur
+:synopsis: exécution du code binaire dans une boucle asyncio.
+    Les saisies sont lues à la demande dans une asyncio.Queue, attendue au lieu de l'état -2,
+    les affichages sont transmis dans une autre asyncio.Queue sans être conservés par l'écran.
+    L'exécution rend la main à la boucle d'événements toutes les N instructions,
+    ce qui permet à un seul processus de servir de nombreuses sessions.
+"""
+
+from typing import List, Union, Optional
+import asyncio
+
+from modules.engine.processorengine import ProcessorEngine
+from modules.exec.executeur import Executeur
+from modules.exec.components import DataValue, CallbackSink, QueueSource
+
+class AsyncExecuteur(Executeur):
+    """Exécuteur piloté par asyncio.
+
+    :Example:
+
+    >>> from modules.engine.processor16bits import Processor16Bits
+    >>> # INPUT @4 ; LOAD r0, @4 ; PRINT r0 ; HALT
+    >>> binary = ["0010100000000100", "0011000000000100", "0010000000000000", "0000000000000000", "0000000000000000"]
+    >>> async def session():
+    ...     executeur = AsyncExecuteur(Processor16Bits(), binary)
+    ...     await executeur.inputs.put(42)
+    ...     await executeur.run()
+    ...     return [value.intValue for value in executeur.drainOutputs()]
+    >>> asyncio.run(session())
+    [42]
+    """
+    YIELD_EVERY:int = 1000
+
+    inputs: "asyncio.Queue[int]"
+    outputs: "asyncio.Queue[Optional[DataValue]]"
+    _yieldEvery: int
+
+    def __init__(self, engine:ProcessorEngine, binary:Union[List[int],List[str]], yieldEvery:int = YIELD_EVERY):
+        """Constructeur
+
+        :param engine: modèle de processeur
+        :type engine: ProcessorEngine
+        :param binary: code binaire (liste d'entiers ou représentation binaire en str)
+        :type binary: List[int]
+        :param yieldEvery: nombre approximatif d'instructions exécutées avant de rendre la main à la boucle d'événements
+        :type yieldEvery: int
+        """
+        super().__init__(engine, binary)
+        self._yieldEvery = yieldEvery
+        self.inputs = asyncio.Queue()
+        self.outputs = asyncio.Queue()
+        self.screen.setSink(CallbackSink(self.outputs.put_nowait))
+        self.addInputSource(QueueSource(self.inputs))
+
+    def drainOutputs(self) -> List[DataValue]:
+        """Vide la file des affichages sans attendre
+
+        :return: valeurs affichées, la marque de fin None étant ignorée
+        :rtype: List[DataValue]
+        """
+        values:List[DataValue] = []
+        while not self.outputs.empty():
+            value = self.outputs.get_nowait()
+            if not value is None:
+                values.append(value)
+        return values
+
+    async def run(self) -> int:
+        """Exécution du programme jusqu'à l'arrêt ou un point d'arrêt.
+        Une saisie attendue par le programme est lue dans la file inputs, en attendant
+        si elle est vide. Entre deux tranches d'exécution, la main est rendue à la boucle d'événements.
+
+        :return: état en cours.
+          -1 = halt, la marque de fin None est alors ajoutée à la file outputs
+          0 = arrêt sur un point d'arrêt ou une surveillance, décrit par breakReason
+        :rtype: int
+        """
+        while True:
+            state = self.translatedRun(self._yieldEvery)
+            if state == -1:
+                self.outputs.put_nowait(None)
+                return state
+            if state == -2:
+                # la file était vide : la valeur attendue passe par le buffer
+                value = await self.inputs.get()
+                self.bufferize(value)
+            elif not self.breakReason is None:
+                return state
+            else:
+                await asyncio.sleep(0)
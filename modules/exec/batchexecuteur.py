@@ -0,0 +1,335 @@
+"""
+.. module:: modules.exec.batchexecuteur
+:synopsis: exécution d'un même code binaire sur de nombreux jeux d'entrées à la fois.
+    Les états des N machines sont rangés dans des tableaux NumPy : registres N×R,
+    mémoire N×M, pointeurs de ligne N. À chaque pas, les machines dont le pointeur de ligne
+    est le plus petit exécutent ensemble la même instruction, les autres attendent.
+    Les machines séparées par un test se regroupent ainsi dès que leurs chemins se rejoignent.
+
+.. note:: nécessite NumPy, dépendance optionnelle.
+"""
+
+from typing import List, Dict, Tuple, Sequence, Union, Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from modules.errors import ExecutionError
+from modules.engine.processorengine import ProcessorEngine
+from modules.engine.decode import ArgsType
+from modules.primitives.operators import Operator, Operators
+from modules.exec.components import formatValue
+
+DecodedInstruction = Tuple[Operator, List[int], List[int]]
+
+class BatchExecuteur:
+    """Exécution d'un code binaire sur N jeux d'entrées.
+
+    Chaque machine reçoit la liste de ses saisies au départ. Une machine qui demande
+    une saisie alors que sa liste est épuisée s'arrête dans l'état WAITING_INPUT.
+    Une division par zéro arrête la machine concernée dans l'état HALT et la signale
+    dans divisionErrors.
+
+    .. warning:: une machine qui boucle indéfiniment sur des adresses plus petites que
+      celles des autres bloque les autres. Le paramètre maxSteps de run permet de s'en prémunir.
+    """
+    RUNNING:int = 0
+    HALT:int = -1
+    WAITING_INPUT:int = -2
+
+    _engine:ProcessorEngine
+    _mask:int
+    _signBit:int
+    _decoded:Dict[int, DecodedInstruction]
+    registers:Any
+    memory:Any
+    linePointers:Any
+    states:Any
+    isZero:Any
+    isPos:Any
+    divisionErrors:Any
+    _inputs:Any
+    _inputsCount:Any
+    _inputsIndex:Any
+    _outputs:Any
+    _outputsCount:Any
+
+    def __init__(self, engine:ProcessorEngine, binary:Union[List[int],List[str]], inputs:Sequence[Sequence[int]]):
+        """Constructeur
+
+        :param engine: modèle de processeur
+        :type engine: ProcessorEngine
+        :param binary: code binaire (liste d'entiers ou représentation binaire en str)
+        :type binary: List[int]
+        :param inputs: pour chaque machine, liste des saisies
+        :type inputs: Sequence[Sequence[int]]
+        :raises: ExecutionError si NumPy n'est pas disponible ou si aucun jeu d'entrées n'est fourni
+        """
+        if np is None:
+            raise ExecutionError("L'exécution par lots nécessite NumPy")
+        if len(inputs) == 0:
+            raise ExecutionError("Aucun jeu d'entrées")
+        self._engine = engine
+        self._mask = 2**engine.dataBits - 1
+        self._signBit = 2**(engine.dataBits - 1)
+        self._decoded = {}
+        lanes = len(inputs)
+        program = [int(item, 2) if isinstance(item, str) else item for item in binary]
+
+        self.registers = np.zeros((lanes, engine.registersNumber()), dtype=np.int64)
+        self.memory = np.zeros((lanes, max(len(program), 1)), dtype=np.int64)
+        self.memory[:, :len(program)] = program
+        self.linePointers = np.zeros(lanes, dtype=np.int64)
+        self.states = np.full(lanes, self.RUNNING, dtype=np.int64)
+        self.isZero = np.ones(lanes, dtype=bool)
+        self.isPos = np.ones(lanes, dtype=bool)
+        self.divisionErrors = np.zeros(lanes, dtype=bool)
+
+        self._inputs = np.zeros((lanes, max([len(values) for values in inputs] + [1])), dtype=np.int64)
+        for lane, values in enumerate(inputs):
+            self._inputs[lane, :len(values)] = [value & self._mask for value in values]
+        self._inputsCount = np.array([len(values) for values in inputs], dtype=np.int64)
+        self._inputsIndex = np.zeros(lanes, dtype=np.int64)
+        self._outputs = np.zeros((lanes, 16), dtype=np.int64)
+        self._outputsCount = np.zeros(lanes, dtype=np.int64)
+
+    @property
+    def lanesCount(self) -> int:
+        """Accesseur
+
+        :return: nombre de machines
+        :rtype: int
+        """
+        return len(self.states)
+
+    def getOutputs(self, lane:int) -> List[int]:
+        """
+        :param lane: indice de la machine
+        :type lane: int
+        :return: valeurs affichées par la machine
+        :rtype: List[int]
+        """
+        return self._outputs[lane, :self._outputsCount[lane]].tolist()
+
+    def getStringList(self, lane:int, base:str = 'dec') -> List[str]:
+        """
+        :param lane: indice de la machine
+        :type lane: int
+        :param base: base de la lecture, parmi 'bin', 'dec', 'hex', 'udec'
+        :type base: str
+        :return: affichage de la machine
+        :rtype: List[str]
+        """
+        return [formatValue(self._engine.dataBits, value, base) for value in self.getOutputs(lane)]
+
+    def run(self, maxSteps:int = 0) -> int:
+        """Exécute les machines jusqu'à ce qu'elles soient toutes arrêtées ou en attente de saisie
+
+        :param maxSteps: nombre maximum de pas, 0 si illimité. Un pas exécute une instruction
+          pour toutes les machines partageant le plus petit pointeur de ligne.
+        :type maxSteps: int
+        :return: nombre de pas exécutés
+        :rtype: int
+        """
+        steps = 0
+        while maxSteps == 0 or steps < maxSteps:
+            running = self.states == self.RUNNING
+            if not running.any():
+                break
+            address = int(self.linePointers[running].min())
+            lanes = np.nonzero(running & (self.linePointers == address))[0]
+            if address < self.memory.shape[1]:
+                words = self.memory[lanes, address]
+            else:
+                words = np.zeros(len(lanes), dtype=np.int64)
+            word = int(words[0])
+            # code automodifiant : les machines dont le mot diffère attendent le pas suivant
+            lanes = lanes[words == word]
+            self._execute(address, word, lanes)
+            steps += 1
+        return steps
+
+    def _decode(self, word:int) -> DecodedInstruction:
+        """
+        :param word: mot binaire d'une instruction
+        :type word: int
+        :return: opérateur, registres et autres arguments, mis en cache
+        :rtype: DecodedInstruction
+        """
+        decoded = self._decoded.get(word)
+        if decoded is None:
+            result = self._engine.instructionDecode(word)
+            opRegisters = [value for argType, value in result["args"] if argType == ArgsType.REGISTRE]
+            opSpecial = [value for argType, value in result["args"] if argType != ArgsType.REGISTRE]
+            decoded = (result["operator"], opRegisters, opSpecial)
+            self._decoded[word] = decoded
+        return decoded
+
+    def _reserve(self, address:int) -> None:
+        """Élargit la mémoire pour que l'adresse soit définie
+
+        :param address: adresse à atteindre
+        :type address: int
+        """
+        width = self.memory.shape[1]
+        if address >= width:
+            self.memory = np.pad(self.memory, ((0, 0), (0, address + 1 - width)))
+
+    def _setFlags(self, lanes:Any, result:Any) -> None:
+        """Fixe les indicateurs de l'UAL d'après un résultat
+
+        :param lanes: indices des machines
+        :type lanes: np.ndarray
+        :param result: résultats, masqués
+        :type result: np.ndarray
+        """
+        self.isZero[lanes] = result == 0
+        self.isPos[lanes] = (result & self._signBit) == 0
+
+    def _print(self, lanes:Any, values:Any) -> None:
+        """Ajoute une valeur à l'affichage de chaque machine
+
+        :param lanes: indices des machines
+        :type lanes: np.ndarray
+        :param values: valeurs affichées
+        :type values: np.ndarray
+        """
+        counts = self._outputsCount[lanes]
+        width = self._outputs.shape[1]
+        if counts.max() >= width:
+            self._outputs = np.pad(self._outputs, ((0, 0), (0, width)))
+        self._outputs[lanes, counts] = values
+        self._outputsCount[lanes] = counts + 1
+
+    def _condition(self, operator:Operator, lanes:Any) -> Any:
+        """
+        :param operator: opérateur de comparaison du saut
+        :type operator: Operator
+        :param lanes: indices des machines
+        :type lanes: np.ndarray
+        :return: pour chaque machine, le saut doit être effectué
+        :rtype: np.ndarray
+        """
+        z = self.isZero[lanes]
+        p = self.isPos[lanes]
+        if operator == Operators.EQ:
+            return z
+        if operator == Operators.NOTEQ:
+            return ~z
+        if operator == Operators.INF:
+            return ~(p | z)
+        if operator == Operators.SUP:
+            return p & ~z
+        if operator == Operators.SUPOREQ:
+            return p
+        return z | ~p
+
+    def _calc(self, operator:Operator, operands:List[Any]) -> Any:
+        """
+        :param operator: opérateur arithmétique
+        :type operator: Operator
+        :param operands: opérandes, une valeur par machine
+        :type operands: List[np.ndarray]
+        :return: résultats masqués
+        :rtype: np.ndarray
+        """
+        M = self._mask
+        N = self._signBit
+        a = operands[0]
+        if operator == Operators.NEG:
+            return (-a) & M
+        if operator == Operators.INVERSE:
+            return (~a) & M
+        b = operands[1]
+        if operator == Operators.ADD:
+            return (a + b) & M
+        if operator == Operators.MINUS:
+            return (a - b) & M
+        if operator == Operators.MULT:
+            return (a * b) & M
+        if operator == Operators.DIV:
+            return (((a ^ N) - N) // ((b ^ N) - N)) & M
+        if operator == Operators.MOD:
+            return (((a ^ N) - N) % ((b ^ N) - N)) & M
+        if operator == Operators.AND:
+            return a & b
+        if operator == Operators.OR:
+            return a | b
+        return a ^ b
+
+    def _execute(self, address:int, word:int, lanes:Any) -> None:
+        """Exécute une instruction pour un groupe de machines
+
+        :param address: adresse de l'instruction
+        :type address: int
+        :param word: mot binaire de l'instruction
+        :type word: int
+        :param lanes: indices des machines
+        :type lanes: np.ndarray
+        """
+        operator, opRegisters, opSpecial = self._decode(word)
+        suivant = address + 1
+
+        if operator == Operators.HALT:
+            self.states[lanes] = self.HALT
+            self.linePointers[lanes] = suivant
+            return
+
+        if operator == Operators.GOTO:
+            self.linePointers[lanes] = opSpecial[0]
+            return
+
+        if operator.isComparaison:
+            self.linePointers[lanes] = np.where(self._condition(operator, lanes), opSpecial[0], suivant)
+            return
+
+        self.linePointers[lanes] = suivant
+
+        if operator == Operators.INPUT:
+            cible = opSpecial[0]
+            self._reserve(cible)
+            available = self._inputsIndex[lanes] < self._inputsCount[lanes]
+            self.states[lanes[~available]] = self.WAITING_INPUT
+            reading = lanes[available]
+            self.memory[reading, cible] = self._inputs[reading, self._inputsIndex[reading]]
+            self._inputsIndex[reading] += 1
+
+        elif operator == Operators.PRINT:
+            self._print(lanes, self.registers[lanes, opRegisters[0]])
+
+        elif operator == Operators.MOVE:
+            if len(opRegisters) == 1:
+                self.registers[lanes, opRegisters[0]] = opSpecial[0] & self._mask
+            else:
+                self.registers[lanes, opRegisters[0]] = self.registers[lanes, opRegisters[1]]
+
+        elif operator == Operators.LOAD:
+            self._reserve(opSpecial[0])
+            self.registers[lanes, opRegisters[0]] = self.memory[lanes, opSpecial[0]]
+
+        elif operator == Operators.STORE:
+            self._reserve(opSpecial[0])
+            self.memory[lanes, opSpecial[0]] = self.registers[lanes, opRegisters[0]]
+
+        elif operator == Operators.CMP:
+            result = (self.registers[lanes, opRegisters[0]] - self.registers[lanes, opRegisters[1]]) & self._mask
+            self._setFlags(lanes, result)
+
+        elif operator.isArithmetic:
+            if not self._engine.ualOutputIsFree():
+                # la sortie de l'UAL est toujours le registre 0, non codé dans l'instruction
+                opRegisters = [0] + opRegisters
+            operands = [self.registers[lanes, index] for index in opRegisters[1:]]
+            operands.extend([np.full(len(lanes), value & self._mask, dtype=np.int64) for value in opSpecial])
+            if operator in (Operators.DIV, Operators.MOD):
+                failed = operands[1] == 0
+                if failed.any():
+                    self.states[lanes[failed]] = self.HALT
+                    self.divisionErrors[lanes[failed]] = True
+                    lanes = lanes[~failed]
+                    operands = [values[~failed] for values in operands]
+            result = self._calc(operator, operands)
+            self.registers[lanes, opRegisters[0]] = result
+            self._setFlags(lanes, result)
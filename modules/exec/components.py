@@ -4,7 +4,141 @@
     Mémoire, registres, UAL, écran...
 """
 
-from typing import List, Union, Callable, Tuple, Dict, Optional, Any, cast
+from typing import List, Union, Callable, Tuple, Dict, Optional, Any, Deque, TextIO, Iterable, Iterator, cast
+from collections import deque
+from functools import lru_cache
+
+from modules.errors import ExecutionError
+
+class WordSpec:
+    """Caractéristiques communes à tous les mots d'une taille donnée :
+    masques et formats d'écriture, calculs en complément à 2 sur des entiers.
+    Une seule instance par taille, obtenue par wordSpec.
+
+    :Example:
+
+    >>> spec = wordSpec(8)
+    >>> spec.sub(3, 5), spec.toSignInt(spec.sub(3, 5))
+    (254, -2)
+    >>> spec.div(spec.neg(7), 2), spec.toStr(200, 'hex')
+    (252, '0xC8')
+    """
+    __slots__ = ("size", "mask", "signBit", "binFormat", "hexFormat", "operations")
+
+    def __init__(self, size:int):
+        '''
+        :param size: taille du mot
+        :type size: int
+        '''
+        self.size = size
+        self.mask = 2**size - 1
+        self.signBit = 2**(size-1)
+        self.binFormat = "0b{:0"+str(size)+"b}"
+        if size % 4 > 0:
+            self.hexFormat = "0x{:0"+str(size//4 + 1)+"X}"
+        else:
+            self.hexFormat = "0x{:0"+str(size//4)+"X}"
+        mask = self.mask
+        # table des opérations de l'UAL : fonction (a, b) → résultat, b ignoré pour les opérations unaires
+        self.operations:Dict[str, Callable[[int, int], int]] = {
+            "neg": lambda a, b: (-a) & mask,
+            "~": lambda a, b: (~a) & mask,
+            "+": lambda a, b: (a + b) & mask,
+            "-": lambda a, b: (a - b) & mask,
+            "cmp": lambda a, b: (a - b) & mask,
+            "*": self.mul,
+            "/": self.div,
+            "%": self.mod,
+            "&": lambda a, b: a & b,
+            "|": lambda a, b: a | b,
+            "^": lambda a, b: a ^ b
+        }
+
+    def __reduce__(self) -> Tuple[Callable[[int], "WordSpec"], Tuple[int]]:
+        # une copie désérialisée reste l'instance partagée
+        return (wordSpec, (self.size,))
+
+    def toSignInt(self, value:int) -> int:
+        '''
+        :param value: mot, entier non signé
+        :type value: int
+        :return: valeur signée en complément à 2
+        :rtype: int
+        '''
+        if value & self.signBit == 0:
+            return value
+        return value - self.mask - 1
+
+    def toStr(self, value:int, base:str = 'bin') -> str:
+        '''
+        :param value: mot, entier non signé
+        :type value: int
+        :param base: base de l'écriture parmi 'bin', 'hex', 'dec', 'udec'
+        :type base: str
+        :result: valeur sous forme str
+        :rtype: str
+        '''
+        if base == 'bin':
+            return self.binFormat.format(value)
+        if base == 'hex':
+            return self.hexFormat.format(value)
+        if base == 'udec' or value & self.signBit == 0:
+            return str(value)
+        return "-"+str(((~value) + 1) & self.mask)
+
+    def neg(self, a:int) -> int:
+        return (-a) & self.mask
+
+    def inverse(self, a:int) -> int:
+        return (~a) & self.mask
+
+    def add(self, a:int, b:int) -> int:
+        return (a + b) & self.mask
+
+    def sub(self, a:int, b:int) -> int:
+        return (a - b) & self.mask
+
+    def mul(self, a:int, b:int) -> int:
+        return (self.toSignInt(a) * self.toSignInt(b)) & self.mask
+
+    def div(self, a:int, b:int) -> int:
+        '''
+        :raises: ZeroDivisionError si b est nul
+        '''
+        return (self.toSignInt(a) // self.toSignInt(b)) & self.mask
+
+    def mod(self, a:int, b:int) -> int:
+        '''
+        :raises: ZeroDivisionError si b est nul
+        '''
+        return (self.toSignInt(a) % self.toSignInt(b)) & self.mask
+
+    def calc(self, a:int, operation:str, b:int) -> int:
+        '''calcule une opération binaire sur deux mots
+
+        :param a: premier mot
+        :type a: int
+        :param operation: opération parmi +, -, *, /, %, &, |, ^
+        :type operation: str
+        :param b: second mot
+        :type b: int
+        :return: résultat
+        :rtype: int
+        '''
+        function = self.operations.get(operation)
+        if function is None:
+            return (a + b) & self.mask
+        return function(a, b)
+
+@lru_cache(maxsize=None)
+def wordSpec(size:int) -> WordSpec:
+    '''
+    :param size: taille du mot
+    :type size: int
+    :return: caractéristiques partagées des mots de cette taille
+    :rtype: WordSpec
+    '''
+    return WordSpec(size)
 
 class DataValue:
     """Gestion d'un mot de donnée, en particulier
@@ -13,7 +147,13 @@ class DataValue:
     * gestion de dépassemnt
     * affichage dans différentes bases
     * calculs
+
+    Les masques et les formats sont partagés par tous les mots de même taille, voir WordSpec.
     """
+    __slots__ = ("_spec", "_value")
+    _spec:WordSpec
+    _value:int
+
     def __init__(self, size:int, value:int=0):
         '''
         :param size: taille du mot
@@ -21,15 +161,33 @@ class DataValue:
         :param value: valeur initiale
         :type value: int
         '''
-        self._size = size
-        self._mask = 2**size - 1
-        self._negMask = 2**(size-1)
-        self._value = value & self._mask
-        self._binFormat = "0b{:0"+str(size)+"b}"
-        if size % 4 > 0:
-            self._hexFormat = "0x{:0"+str(size//4 + 1)+"X}"
-        else:
-            self._hexFormat = "0x{:0"+str(size//4)+"X}"
+        spec = wordSpec(size)
+        self._spec = spec
+        self._value = value & spec.mask
+
+    @classmethod
+    def _make(cls, spec:WordSpec, value:int) -> "DataValue":
+        '''Construction sans masquage, pour une valeur déjà dans le domaine du mot
+
+        :param spec: caractéristiques du mot
+        :type spec: WordSpec
+        :param value: valeur, entier non signé
+        :type value: int
+        :return: mot
+        :rtype: DataValue
+        '''
+        out = cls.__new__(cls)
+        out._spec = spec
+        out._value = value
+        return out
+
+    @property
+    def size(self) -> int:
+        return self._spec.size
+
+    @property
+    def spec(self) -> WordSpec:
+        return self._spec
 
     @property
     def intValue(self) -> int:
@@ -41,9 +199,7 @@ class DataValue:
         :return: valeur courante
         :rtype: int
         '''
-        if self.isPos():
-            return self._value
-        return - (((~self._value) + 1) & self._mask)
+        return self._spec.toSignInt(self._value)
 
     def isNul(self) -> bool:
         '''test si c'est entier nul
@@ -59,12 +215,12 @@ class DataValue:
         :result: la valeur est positive (ou nulle)
         :rtype: bool
         '''
-        return self._value & self._negMask == 0
+        return self._value & self._spec.signBit == 0
 
     def inc(self) -> None:
         '''incrémente la valeur tenant compte du codage CA2
         '''
-        self._value = (self._value + 1) & self._mask
+        self._value = (self._value + 1) & self._spec.mask
 
     def opposite(self) -> "DataValue":
         '''calcul l'opposé d'un entier tenant compte du codage CA2
@@ -72,8 +228,7 @@ class DataValue:
         :return: oppposé de la valeur
         :rtype: DataValue
         '''
-        oppValue = ((~self._value) + 1) & self._mask
-        return DataValue(self._size, oppValue)
+        return DataValue._make(self._spec, self._spec.neg(self._value))
 
     def inverse(self) -> "DataValue":
         '''calcul l'inverse d'un entier tenant compte du codage CA2
@@ -81,7 +236,7 @@ class DataValue:
         :return: inverse de la valeur
         :rtype: DataValue
         '''
-        return DataValue(self._size, ~self._value)
+        return DataValue._make(self._spec, self._spec.inverse(self._value))
 
     def mask(self, mask:int) -> "DataValue":
         '''Calcule le résultat de la valeur masquée
@@ -91,7 +246,7 @@ class DataValue:
         :return: valeur masquée
         :rtype: DataValue
         '''
-        return DataValue(self._size, self._value & mask)
+        return DataValue._make(self._spec, self._value & mask)
 
     def toStr(self, base:str = 'bin') -> str:
         '''transtypage tenant compte que value n'est pas forcément sur 32 bits
@@ -102,17 +257,7 @@ class DataValue:
         :result: valeur sous forme str
         :rtype: str
         '''
-        if base == 'bin':
-            return self._binFormat.format(self._value)
-        if base == 'hex':
-            return self._hexFormat.format(self._value)
-        if base == 'udec' or self.isPos():
-            # décimal non signé
-            return str(self._value)
-        # pour base 10, on ajoute une notation avec - pour nombre négatif
-        # dans ce cas, il faut tenir compte du codage CA2 avec une taille
-        # de mot qui n'est pas forcément le 32 bits de python
-        return "-"+str(((~self._value) + 1) & self._mask)
+        return self._spec.toStr(self._value, base)
 
     def calc(self, otherValue:"DataValue", operation:str) -> "DataValue":
         '''calcule l'opération avec une autre valeur
@@ -122,28 +267,10 @@ class DataValue:
         :return: résultat
         :rtype: DataValue
         '''
-        if operation == "&":
-            return DataValue(self._size, self._value & otherValue._value)
-        if operation == "|":
-            return DataValue(self._size, self._value | otherValue._value)
-        if operation == "^":
-            return DataValue(self._size, self._value ^ otherValue._value)
-        if operation == "-":
-            return self.calc(otherValue.opposite(), "+")
-        if operation == "*":
-            result = self.toSignInt() * otherValue.toSignInt()
-            return DataValue(self._size, result)
-        if operation == "/":
-            result = self.toSignInt() // otherValue.toSignInt()
-            return DataValue(self._size, result)
-        if operation == "%":
-            result = self.toSignInt() % otherValue.toSignInt()
-            return DataValue(self._size, result)
-
-        return DataValue(self._size, self._value + otherValue._value)
+        return DataValue._make(self._spec, self._spec.calc(self._value, operation, otherValue._value))
 
     def clone(self) -> "DataValue":
-        return DataValue(self._size, self._value)
+        return DataValue._make(self._spec, self._value)
 
     def __str__(self) -> str:
         '''transtypage str, par défaut en binaire
@@ -156,6 +283,8 @@ class BaseComponent:
     """
 
     __onEvent:List[Tuple[str,Callable[[Dict[str, Any]],None]]]
+    __onEventWhenMuted:List[Tuple[str,Callable[[Dict[str, Any]],None]]]
+    _muted:bool = False
     def __init__(self, size:int):
         '''
         :param size: taille des mots en bits
@@ -163,6 +292,7 @@ class BaseComponent:
         '''
         self._size = size
         self.__onEvent = []
+        self.__onEventWhenMuted = []
 
     @property
     def size(self) -> int:
@@ -173,15 +303,43 @@ class BaseComponent:
         '''
         return self._size
 
-    def bind(self, eventName:str, callback:Callable[[Dict[str,Union[str,int]]],None]):
+    def bind(self, eventName:str, callback:Callable[[Dict[str,Union[str,int]]],None], keepWhenMuted:bool = False):
         '''Enregistre un événement
 
         :param eventName: nom de l'événement
         :type eventName: str
         :param callback: fonction callback
         :type callback: Callable
+        :param keepWhenMuted: la fonction est appelée même quand les événements sont suspendus,
+            réservé à ce qui doit rester cohérent avec le composant, comme le cache des blocs traduits
+        :type keepWhenMuted: bool
         '''
         self.__onEvent.append((eventName, callback))
+        if keepWhenMuted:
+            self.__onEventWhenMuted.append((eventName, callback))
+
+    def hasBinding(self, eventName:str) -> bool:
+        '''Permet d'éviter de préparer les paramètres d'un événement que personne n'écoute
+
+        :param eventName: nom de l'événement, sans le préfixe "on"
+        :type eventName: str
+        :return: au moins une fonction est enregistrée pour cet événement
+        :rtype: bool
+        '''
+        eventName = "on"+eventName
+        for evt, callback in self.__onEventWhenMuted if self._muted else self.__onEvent:
+            if evt == eventName:
+                return True
+        return False
+
+    def setMuted(self, muted:bool) -> None:
+        '''Suspend ou rétablit le déclenchement des événements,
+        sauf pour les fonctions enregistrées avec keepWhenMuted
+
+        :param muted: les événements ne sont plus déclenchés
+        :type muted: bool
+        '''
+        self._muted = muted
 
     def trigger(self, eventName:str, params:Dict[str, Any]) -> None:
         '''Déclenche un événement
@@ -192,26 +350,178 @@ class BaseComponent:
         :type params: Union[str,int]
         '''
         eventName = "on"+eventName
-        for evt, callback in self.__onEvent:
+        for evt, callback in self.__onEventWhenMuted if self._muted else self.__onEvent:
             if evt == eventName:
                 callback(params)
 
+class InputSource:
+    """
+    Source de saisies, lue à la demande par le buffer d'entrée quand il est vide.
+    Cette version de base ne fournit rien.
+    """
+    def read(self) -> Optional[int]:
+        '''
+        :return: valeur suivante, None si aucune n'est disponible pour l'instant
+        :rtype: Optional[int]
+        '''
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        '''Accesseur
+
+        :return: la source ne fournira plus de valeur
+        :rtype: bool
+        '''
+        return True
+
+class IteratorSource(InputSource):
+    """
+    Source lisant les valeurs d'un itérable, consommé au fur et à mesure des saisies
+    """
+    _iterator:Iterator[int]
+    _exhausted:bool
+
+    def __init__(self, values:Iterable[int]):
+        '''
+        :param values: valeurs à saisir, éventuellement un générateur
+        :type values: Iterable[int]
+        '''
+        self._iterator = iter(values)
+        self._exhausted = False
+
+    def read(self) -> Optional[int]:
+        if self._exhausted:
+            return None
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._exhausted = True
+            return None
+
+    @property
+    def exhausted(self) -> bool:
+        return self._exhausted
+
+class StreamSource(InputSource):
+    """
+    Source lisant des entiers séparés par des blancs dans un flux texte,
+    fichier ou sys.stdin, une ligne à la fois
+    """
+    _stream:TextIO
+    _pending:Deque[int]
+    _exhausted:bool
+
+    def __init__(self, stream:TextIO):
+        '''
+        :param stream: flux texte ouvert en lecture
+        :type stream: TextIO
+        '''
+        self._stream = stream
+        self._pending = deque()
+        self._exhausted = False
+
+    def read(self) -> Optional[int]:
+        '''
+        :return: valeur suivante, None en fin de flux
+        :rtype: Optional[int]
+        :raises: ExecutionError si le flux contient autre chose que des entiers
+        '''
+        while len(self._pending) == 0:
+            if self._exhausted:
+                return None
+            line = self._stream.readline()
+            if line == "":
+                self._exhausted = True
+                return None
+            try:
+                self._pending.extend([int(item) for item in line.split()])
+            except ValueError:
+                raise ExecutionError("Saisie invalide : {}".format(line.strip()))
+        return self._pending.popleft()
+
+    @property
+    def exhausted(self) -> bool:
+        return self._exhausted and len(self._pending) == 0
+
+class QueueSource(InputSource):
+    """
+    Source lisant une file alimentée par ailleurs, asyncio.Queue ou queue.Queue,
+    sans jamais attendre. Une file vide ne termine pas la source.
+    """
+    _queue:Any
+
+    def __init__(self, queue:Any):
+        '''
+        :param queue: file de saisies, munie de empty et get_nowait
+        :type queue: Union[asyncio.Queue, queue.Queue]
+        '''
+        self._queue = queue
+
+    def read(self) -> Optional[int]:
+        if self._queue.empty():
+            return None
+        return self._queue.get_nowait()
+
+    @property
+    def exhausted(self) -> bool:
+        return False
+
 class BufferComponent(BaseComponent):
     """
-    Gestion du buffer d'entrée
+    Gestion du buffer d'entrée.
+
+    Les valeurs sont conservées comme entiers dans une file à double entrée.
+    Quand le buffer est vide, une lecture tire la valeur suivante des sources ajoutées
+    par addSource, dans leur ordre d'ajout : les saisies ne sont produites qu'au moment
+    où le programme les lit.
     """
-    _list:List[DataValue]
+    _values:Deque[int]
+    _sources:Deque[InputSource]
+    _mask:int
+    _readCount:int
 
     def __init__(self, size:int):
         super().__init__(size)
-        self._list = []
+        self._values = deque()
+        self._sources = deque()
+        self._mask = 2**size - 1
+        self._readCount = 0
+
+    def _pull(self) -> bool:
+        '''Tire une valeur des sources
+
+        :return: une valeur a été ajoutée au buffer
+        :rtype: bool
+        '''
+        sources = self._sources
+        while len(sources) > 0:
+            value = sources[0].read()
+            if not value is None:
+                self._values.append(value & self._mask)
+                return True
+            if not sources[0].exhausted:
+                return False
+            sources.popleft()
+        return False
 
     def empty(self) -> bool:
         '''
-        :return: True si le buffer est vide
+        :return: True si le buffer est vide et qu'aucune source ne fournit de valeur
         :rtype: bool
         '''
-        return len(self._list) == 0
+        return len(self._values) == 0 and not self._pull()
+
+    def pop(self) -> Optional[int]:
+        '''Lecture sans événement, utilisée par l'exécution des blocs traduits
+
+        :return: premier item du buffer s'il existe, sinon None
+        :rtype: Optional[int]
+        '''
+        if len(self._values) > 0 or self._pull():
+            self._readCount += 1
+            return self._values.popleft()
+        return None
 
     def read(self) -> Union[DataValue, bool]:
         '''
@@ -221,8 +531,9 @@ class BufferComponent(BaseComponent):
         .. note:: déclenche l'événement "readempty"
         ou "read" renvoyant la valeur "readed"
         '''
-        if len(self._list) > 0:
-            out = self._list.pop(0)
+        value = self.pop()
+        if not value is None:
+            out = DataValue(self._size, value)
             self.trigger("read", { "readed": out })
             return out
         self.trigger("readempty", {})
@@ -236,49 +547,342 @@ class BufferComponent(BaseComponent):
         .. note:: déclenche l'événement "write" renvoyant "writed"
         '''
         newValue = DataValue(self._size, value)
-        self._list.append(newValue)
+        self._values.append(newValue.intValue)
         self.trigger("write", { "writed": newValue })
 
+    def writeMany(self, values:Iterable[int]) -> None:
+        '''
+        :param values: valeurs à ajouter dans le buffer
+        :type values: Iterable[int]
+
+        .. note:: déclenche un seul événement "write" renvoyant le nombre "count" de valeurs ajoutées
+        '''
+        mask = self._mask
+        count = len(self._values)
+        self._values.extend([value & mask for value in values])
+        self.trigger("write", { "count": len(self._values) - count })
+
+    def unread(self, value:int) -> None:
+        '''Remet une valeur en tête du buffer, annulant une lecture
+
+        :param value: valeur lue précédemment
+        :type value: int
+
+        .. note:: déclenche l'événement "write" renvoyant "writed"
+        '''
+        newValue = DataValue(self._size, value)
+        self._values.appendleft(newValue.intValue)
+        self._readCount -= 1
+        self.trigger("write", { "writed": newValue })
+
+    def addSource(self, source:InputSource) -> None:
+        '''Ajoute une source, lue quand le buffer et les sources précédentes sont vides
+
+        :param source: source de saisies
+        :type source: InputSource
+        '''
+        self._sources.append(source)
+
+    def clear(self) -> None:
+        '''Vide le buffer, les sources sont conservées
+
+        .. note:: déclenche l'événement "read"
+        '''
+        self._values.clear()
+        self.trigger("read", {})
+
+    def restore(self, values:Iterable[int], readCount:int, sources:Iterable[InputSource]) -> None:
+        '''Remplace le contenu du buffer et ses sources, par exemple lors de la restauration d'un état sauvegardé
+
+        :param values: valeurs présentes dans le buffer
+        :type values: Iterable[int]
+        :param readCount: nombre de valeurs déjà lues
+        :type readCount: int
+        :param sources: sources de saisies restant à lire
+        :type sources: Iterable[InputSource]
+
+        .. note:: déclenche l'événement "read"
+        '''
+        mask = self._mask
+        self._values = deque([value & mask for value in values])
+        self._sources = deque(sources)
+        self._readCount = readCount
+        self.trigger("read", {})
+
+    @property
+    def sources(self) -> List[InputSource]:
+        '''Accesseur
+
+        :return: sources de saisies restant à lire
+        :rtype: List[InputSource]
+        '''
+        return list(self._sources)
+
+    @property
+    def readCount(self) -> int:
+        '''Accesseur
+
+        :return: nombre de valeurs lues depuis la création
+        :rtype: int
+        '''
+        return self._readCount
+
+    @property
+    def values(self) -> List[int]:
+        '''Accesseur
+
+        :return: valeurs présentes dans le buffer, sans celles que les sources n'ont pas encore fournies
+        :rtype: List[int]
+        '''
+        return list(self._values)
+
     @property
     def list(self):
         '''Accesseur
         :return: clone du contenu du buffer
-        :rtype: List[int]
+        :rtype: List[DataValue]
         '''
-        return [item for item in self._list]
+        return [DataValue(self._size, value) for value in self._values]
+
+@lru_cache(maxsize=4096)
+def formatValue(size:int, value:int, base:str) -> str:
+    '''Écriture d'une valeur, mise en cache pour chaque valeur et chaque base
+
+    :param size: taille du mot
+    :type size: int
+    :param value: valeur entière
+    :type value: int
+    :param base: base de l'écriture parmi 'bin', 'hex', 'dec', 'udec'
+    :type base: str
+    :return: valeur sous forme str
+    :rtype: str
+    '''
+    return wordSpec(size).toStr(value, base)
 
-class ScreenComponent(BaseComponent):
+class OutputSink:
+    """
+    Destination des valeurs affichées à l'écran. Cette version de base ne conserve rien.
+    """
+    def write(self, value:DataValue) -> None:
+        '''
+        :param value: valeur affichée
+        :type value: DataValue
+        '''
+        pass
+
+    def clear(self) -> None:
+        '''Oublie les valeurs conservées
+        '''
+        pass
+
+    def dropLast(self, count:int) -> None:
+        '''Retire les dernières valeurs conservées, quand c'est possible
+
+        :param count: nombre de valeurs retirées
+        :type count: int
+        '''
+        pass
+
+    def flush(self) -> None:
+        '''Transmet les valeurs en attente
+        '''
+        pass
+
+    def restore(self, values:List[DataValue]) -> None:
+        '''Remplace les valeurs conservées, sans les transmettre à nouveau
+
+        :param values: valeurs conservées
+        :type values: List[DataValue]
+        '''
+        pass
+
+    @property
+    def values(self) -> List[DataValue]:
+        '''Accesseur
+
+        :return: valeurs conservées
+        :rtype: List[DataValue]
+        '''
+        return []
+
+class ListSink(OutputSink):
     """
-    Gestion de l'écran
+    Conserve toutes les valeurs affichées. Comportement par défaut de l'écran.
     """
     _list:List[DataValue]
 
-    def __init__(self, size):
-        super().__init__(size)
+    def __init__(self):
+        self._list = []
+
+    def write(self, value:DataValue) -> None:
+        self._list.append(value)
+
+    def clear(self) -> None:
         self._list = []
 
+    def restore(self, values:List[DataValue]) -> None:
+        self._list = list(values)
+
+    def dropLast(self, count:int) -> None:
+        if count > 0:
+            del self._list[-count:]
+
+    @property
+    def values(self) -> List[DataValue]:
+        return list(self._list)
+
+class RingSink(OutputSink):
+    """
+    Ne conserve que les dernières valeurs affichées, en mémoire constante.
+    """
+    _ring:Deque[DataValue]
+
+    def __init__(self, capacity:int):
+        '''
+        :param capacity: nombre de valeurs conservées
+        :type capacity: int
+        '''
+        self._ring = deque(maxlen=capacity)
+
+    def write(self, value:DataValue) -> None:
+        self._ring.append(value)
+
+    def clear(self) -> None:
+        self._ring.clear()
+
+    def restore(self, values:List[DataValue]) -> None:
+        self._ring.clear()
+        self._ring.extend(values)
+
+    def dropLast(self, count:int) -> None:
+        for _ in range(min(count, len(self._ring))):
+            self._ring.pop()
+
+    @property
+    def values(self) -> List[DataValue]:
+        return list(self._ring)
+
+class CallbackSink(OutputSink):
+    """
+    Transmet chaque valeur affichée à une fonction, sans rien conserver.
+    """
+    _callback:Callable[[DataValue], None]
+
+    def __init__(self, callback:Callable[[DataValue], None]):
+        '''
+        :param callback: fonction recevant chaque valeur affichée
+        :type callback: Callable[[DataValue], None]
+        '''
+        self._callback = callback
+
+    def write(self, value:DataValue) -> None:
+        self._callback(value)
+
+class StreamSink(OutputSink):
+    """
+    Écrit les valeurs affichées, une par ligne, dans un fichier ou un tube.
+    Les lignes sont regroupées avant écriture ; rien n'est conservé.
+    L'exécuteur transmet les lignes en attente à l'arrêt du programme et à chaque attente de saisie.
+    """
+    _stream:TextIO
+    _base:str
+    _bufferSize:int
+    _pending:List[str]
+
+    def __init__(self, stream:TextIO, base:str = 'dec', bufferSize:int = 64):
+        '''
+        :param stream: flux texte ouvert en écriture
+        :type stream: TextIO
+        :param base: base de l'écriture parmi 'bin', 'hex', 'dec', 'udec'
+        :type base: str
+        :param bufferSize: nombre de lignes regroupées avant écriture, 1 pour écrire immédiatement
+        :type bufferSize: int
+        '''
+        self._stream = stream
+        self._base = base
+        self._bufferSize = bufferSize
+        self._pending = []
+
+    def write(self, value:DataValue) -> None:
+        self._pending.append(formatValue(value.size, value.intValue, self._base))
+        if len(self._pending) >= self._bufferSize:
+            self.flush()
+
+    def dropLast(self, count:int) -> None:
+        if count > 0:
+            del self._pending[-count:]
+
+    def flush(self) -> None:
+        if len(self._pending) > 0:
+            self._stream.write("\n".join(self._pending) + "\n")
+            self._pending = []
+        self._stream.flush()
+
+class ScreenComponent(BaseComponent):
+    """
+    Gestion de l'écran. Les valeurs affichées sont confiées à une destination,
+    par défaut une liste conservant tout l'affichage.
+    """
+    _sink:OutputSink
+    _count:int
+
+    def __init__(self, size, sink:Optional[OutputSink] = None):
+        super().__init__(size)
+        self._sink = ListSink() if sink is None else sink
+        self._count = 0
+
+    @property
+    def sink(self) -> OutputSink:
+        '''Accesseur
+
+        :return: destination des valeurs affichées
+        :rtype: OutputSink
+        '''
+        return self._sink
+
+    def setSink(self, sink:OutputSink) -> None:
+        '''Change la destination des valeurs affichées. Les valeurs en attente
+        dans l'ancienne destination sont transmises.
+
+        :param sink: nouvelle destination
+        :type sink: OutputSink
+        '''
+        self._sink.flush()
+        self._sink = sink
+
+    @property
+    def count(self) -> int:
+        '''Accesseur
+
+        :return: nombre de valeurs affichées depuis le dernier effacement,
+            conservées ou non par la destination
+        :rtype: int
+        '''
+        return self._count
+
     def empty(self) -> bool:
         '''
         :return: True si le buffer est vide
         :rtype: bool
         '''
-        return len(self._list) == 0
+        return self._count == 0
 
     def getStringList(self, base:str = 'bin') -> List[str]:
         '''
         :param base: base de la lecture, parmi 'bin', 'dec', 'hex', 'udec'
         :type base: str
-        :return: liste du contenu de l'écran
+        :return: liste du contenu de l'écran conservé par la destination
         :rtype: List[str]
         '''
-        return [item.toStr(base) for item in self._list]
+        return [formatValue(self._size, item.intValue, base) for item in self._sink.values]
 
     def clear(self):
         '''Efface le contenu
 
         .. note:: déclenche l'événement "clear"
         '''
-        self._list = []
+        self._sink.clear()
+        self._count = 0
         self.trigger("clear", {})
 
     def write(self, value:Union[DataValue,int]) -> None:
@@ -290,24 +894,87 @@ class ScreenComponent(BaseComponent):
         '''
         if isinstance(value,int):
             value = DataValue(self._size, value)
-        self._list.append(value)
+        self._sink.write(value)
+        self._count += 1
         self.trigger("write", { "writed":value.clone() })
 
+    def restore(self, values:List[int], count:int) -> None:
+        '''Remplace le contenu de l'écran, par exemple lors de la restauration d'un état sauvegardé.
+        Les valeurs sont confiées directement à la destination, qui ne les transmet pas à nouveau.
+
+        :param values: valeurs conservées par la destination
+        :type values: List[int]
+        :param count: nombre de valeurs affichées, conservées ou non
+        :type count: int
+
+        .. note:: déclenche l'événement "truncate" renvoyant "length", l'affichage est à redessiner
+        '''
+        self._sink.restore([DataValue(self._size, value) for value in values])
+        self._count = count
+        self.trigger("truncate", { "length":count })
+
+    def truncate(self, length:int) -> None:
+        '''Ne conserve que les premières lignes de l'écran. Les valeurs déjà transmises
+        par une destination qui ne les conserve pas ne peuvent pas être retirées.
+
+        :param length: nombre de lignes conservées
+        :type length: int
+
+        .. note:: déclenche l'événement "truncate" renvoyant "length"
+        '''
+        if length < self._count:
+            self._sink.dropLast(self._count - length)
+            self._count = length
+        self.trigger("truncate", { "length":length })
+
+    def flush(self) -> None:
+        '''Transmet les valeurs en attente dans la destination
+        '''
+        self._sink.flush()
+
+    @property
+    def list(self) -> List[DataValue]:
+        '''Accesseur
+        :return: clone du contenu de l'écran conservé par la destination
+        :rtype: List[DataValue]
+        '''
+        return self._sink.values
+
 class UalComponent(BaseComponent):
     '''
-    Gestion de l'Unité Arithmétique et Logique
+    Gestion de l'Unité Arithmétique et Logique.
+
+    Les opérandes et le résultat sont conservés comme entiers. L'opération courante
+    est une fonction de la table WordSpec.operations, choisie par setOperation ;
+    les indicateurs nul et positif sont fixés une fois par calcul.
     '''
-    __result:DataValue
-    __op1:DataValue
-    __op2:DataValue
+    __result:int
+    __op1:int
+    __op2:int
     __isZero:bool = True
     __isPos:bool = True
     __operation:str = "+"
+    __function:Callable[[int, int], int]
+    _spec:WordSpec
+    OPERATIONS:Tuple[str,...] = ("neg", "~", "+", "-", "*", "/", "%", "&", "|", "^", "cmp")
     def __init__(self, size:int):
         super().__init__(size)
-        self.__op1 = DataValue(size, 0)
-        self.__op2 = DataValue(size, 0)
-        self.__result = DataValue(size, 0)
+        self._spec = wordSpec(size)
+        self.__op1 = 0
+        self.__op2 = 0
+        self.__result = 0
+        self.__function = self._spec.operations[self.__operation]
+
+    def _toInt(self, value:Union[DataValue,int]) -> int:
+        '''
+        :param value: valeur
+        :type value: Union[DataValue,int]
+        :return: mot correspondant, masqué
+        :rtype: int
+        '''
+        if isinstance(value, int):
+            return value & self._spec.mask
+        return value.intValue
 
     @property
     def operation(self) -> str:
@@ -325,7 +992,7 @@ class UalComponent(BaseComponent):
         :return: opérande 1
         :rtype: DataValue
         '''
-        return self.__op1.clone()
+        return DataValue._make(self._spec, self.__op1)
 
     @property
     def op2(self) -> DataValue:
@@ -335,18 +1002,19 @@ class UalComponent(BaseComponent):
         :rtype: DataValue
         '''
 
-        return self.__op2.clone()
+        return DataValue._make(self._spec, self.__op2)
 
     def setOperation(self, opName:str) -> None:
         '''Fixe l'opération
 
-        :param opName: opération parmi neg, ~, +, -, *, /, %, &, |, ^
+        :param opName: opération parmi neg, ~, +, -, *, /, %, &, |, ^, cmp
         :type opName: str
 
         .. note:: déclenche l'événement "setoperation" renvoyant "operation"
         '''
-        if opName in ("neg", "~", "+", "-", "*", "/", "%", "&", "|", "^", "cmp"):
+        if opName in self.OPERATIONS:
             self.__operation = opName
+            self.__function = self._spec.operations[opName]
             self.trigger("setoperation", { "operation":opName })
 
     def writeFirstOperand(self, value:Union[DataValue,int]) -> None:
@@ -357,10 +1025,9 @@ class UalComponent(BaseComponent):
 
         .. note:: déclenche l'événement "writeop1" renvoyant "writed"
         '''
-        if isinstance(value,int):
-            value = DataValue(self._size, value)
-        self.__op1 = value
-        self.trigger("writeop1", { "writed": value.clone()})
+        self.__op1 = self._toInt(value)
+        if self.hasBinding("writeop1"):
+            self.trigger("writeop1", { "writed": self.op1 })
 
     def writeSecondOperand(self, value:Union[DataValue,int]) -> None:
         '''Fixe l'opérande 2
@@ -370,10 +1037,17 @@ class UalComponent(BaseComponent):
 
         .. note:: déclenche l'événement "writeop2" renvoyant "writed"
         '''
-        if isinstance(value,int):
-            value = DataValue(self._size, value)
-        self.__op2 = value
-        self.trigger("writeop2", { "writed": value.clone()})
+        self.__op2 = self._toInt(value)
+        if self.hasBinding("writeop2"):
+            self.trigger("writeop2", { "writed": self.op2 })
+
+    def writeResult(self, value:Union[DataValue,int]) -> None:
+        '''Fixe le résultat, sans calcul
+
+        :param value: valeur du résultat
+        :type value: Union[DataValue,int]
+        '''
+        self.__result = self._toInt(value)
 
     def read(self) -> DataValue:
         '''lit le résultat
@@ -381,7 +1055,23 @@ class UalComponent(BaseComponent):
         :return: résultat du dernier calcul
         :rtype: DataValue
         '''
-        return self.__result.clone()
+        return DataValue._make(self._spec, self.__result)
+
+    def calc(self) -> int:
+        '''exécute le calcul sans produire de DataValue
+
+        :return: valeur du résultat
+        :rtype: int
+        :raises: ZeroDivisionError pour une division par zéro
+        '''
+        value = self.__function(self.__op1, self.__op2)
+        self.__isZero = value == 0
+        self.__isPos = value & self._spec.signBit == 0
+        if self.__operation != "cmp":
+            self.__result = value
+        if self.hasBinding("calc"):
+            self.trigger("calc", { "result":DataValue._make(self._spec, value), "iszero":self.__isZero, "ispos":self.__isPos } )
+        return value
 
     def execCalc(self) -> DataValue:
         '''exécute le calcul
@@ -389,20 +1079,21 @@ class UalComponent(BaseComponent):
         :return: valeur du résultat
         :rtype: DataValue
         '''
-        if self.__operation == "~":
-            result = self.__op1.inverse()
-        elif self.__operation == "neg":
-            result = self.__op1.opposite()
-        elif self.__operation == "cmp":
-            result = self.__op1.calc(self.__op2, "-")
-        else:
-            result = self.__op1.calc(self.__op2, self.__operation)
-        self.__isPos = result.isPos()
-        self.__isZero = result.isNul()
-        self.trigger("calc", { "result":result.clone(), "iszero":self.__isZero, "ispos":self.__isPos } )
-        if self.__operation != "cmp":
-            self.__result = result
-        return result
+        return DataValue._make(self._spec, self.calc())
+
+    def setFlags(self, isZero:bool, isPos:bool) -> None:
+        '''Fixe les indicateurs, comme après un calcul
+
+        :param isZero: le résultat est nul
+        :type isZero: bool
+        :param isPos: le résultat est positif ou nul
+        :type isPos: bool
+
+        .. note:: déclenche l'événement "setflags" renvoyant "iszero" et "ispos"
+        '''
+        self.__isZero = isZero
+        self.__isPos = isPos
+        self.trigger("setflags", { "iszero":isZero, "ispos":isPos })
 
     @property
     def isZero(self) -> bool:
@@ -516,6 +1207,41 @@ class RegisterGroup(BaseComponent):
         '''
         return [item.clone() for item in self._list]
 
+    @property
+    def count(self) -> int:
+        '''Accesseur
+
+        :return: nombre de registres définis
+        :rtype: int
+        '''
+        return len(self._list)
+
+    def peek(self, index:int) -> int:
+        '''Lecture sans déclencher d'événement
+
+        :param index: indice du registre
+        :type index: int
+        :return: valeur entière du registre, 0 s'il n'est pas encore défini
+        :rtype: int
+        '''
+        if 0 <= index < len(self._list):
+            return self._list[index].intValue
+        return 0
+
+    def setContent(self, values:List[int]) -> None:
+        '''Remplace tout le contenu. Si le nombre de registres est limité,
+        le contenu est complété par des 0 ou tronqué.
+
+        :param values: nouvelles valeurs
+        :type values: List[int]
+
+        .. note:: déclenche l'événement "fill"
+        '''
+        if not self._unlimited:
+            values = (list(values) + [0]*len(self._list))[:len(self._list)]
+        self._list = [DataValue(self._size, item) for item in values]
+        self.trigger("fill", {})
+
     def __fill(self, index) -> None:
         '''Complète la mémoire pour que l'indice index soit défini
         si le nombre de registres est illimité
@@ -540,7 +1266,7 @@ class RegisterGroup(BaseComponent):
 
         .. note:: déclenche l'événement "inc" qui renvoie "index" et "value"
         '''
-        if self._unlimited and index > len(self._list):
+        if self._unlimited and index >= len(self._list):
             self.__fill(index)
         if 0 <= index < len(self._list):
             value = self._list[index]
@@ -556,7 +1282,7 @@ class RegisterGroup(BaseComponent):
 
         .. note:: déclenche l'événement "read" qui renvoie "index" et "value"
         '''
-        if self._unlimited and index > len(self._list):
+        if self._unlimited and index >= len(self._list):
             self.__fill(index)
         if 0 <= index < len(self._list):
             value = self._list[index].clone()
@@ -576,7 +1302,7 @@ class RegisterGroup(BaseComponent):
         '''
         if isinstance(value, int):
             value = DataValue(self.size, value)
-        if self._unlimited and index > len(self._list):
+        if self._unlimited and index >= len(self._list):
             self.__fill(index)
         if 0 <= index < len(self._list):
             self._list[index] = value
@@ -0,0 +1,139 @@
+"""
+.. module:: modules.exec.eventbus
+:synopsis: regroupement des événements des composants d'exécution pour l'interface graphique.
+    Les événements reçus entre deux rafraîchissements sont conservés puis remis en une fois
+    à chaque abonné : la dernière valeur par registre ou par case mémoire, ou bien tous
+    les événements pour les abonnés qui en ont besoin (lignes ajoutées à l'écran).
+    Le nombre d'appels à l'interface croît ainsi avec le nombre d'éléments modifiés
+    et non avec le nombre d'événements.
+"""
+
+from typing import List, Dict, Tuple, Callable, Optional, Any, Sequence
+
+from modules.exec.components import BaseComponent
+
+Change = Tuple[str, Dict[str, Any]]
+ChangesCallback = Callable[[List[Change]], None]
+Scheduler = Callable[[Callable[[], None]], Any]
+
+class _Subscription:
+    """Abonnement : événements reçus depuis la dernière remise
+    """
+    __slots__ = ("callback", "keepAll", "changes", "order")
+    callback:ChangesCallback
+    keepAll:bool
+    changes:Dict[Any, Change]
+    order:List[Change]
+
+    def __init__(self, callback:ChangesCallback, keepAll:bool):
+        self.callback = callback
+        self.keepAll = keepAll
+        self.changes = {}
+        self.order = []
+
+class EventBus:
+    """Bus d'événements entre les composants et les widgets.
+
+    Un abonné reçoit une liste de couples (nom de l'événement, paramètres). Par défaut,
+    seul le dernier événement de chaque nom et de chaque indice (paramètre "index", None pour
+    un registre seul) est conservé, dans l'ordre de la dernière modification.
+
+    :Example:
+
+    >>> from modules.exec.components import RegisterGroup
+    >>> registers = RegisterGroup(4, 8)
+    >>> received = []
+    >>> bus = EventBus()
+    >>> bus.bind(registers, ("write", "inc"), received.append)
+    >>> for value in range(100):
+    ...     registers.write(value % 2, value)
+    >>> bus.pending
+    True
+    >>> bus.flush()
+    >>> [(name, params["index"], params["writed"].intValue) for name, params in received[0]]
+    [('write', 0, 98), ('write', 1, 99)]
+    """
+    _scheduler:Optional[Scheduler]
+    _subscriptions:List[_Subscription]
+    _dirty:List[_Subscription]
+    _scheduled:bool
+
+    def __init__(self, scheduler:Optional[Scheduler] = None):
+        """Constructeur
+
+        :param scheduler: programme l'appel de flush, par exemple after_idle d'un widget tkinter.
+          None si flush est appelé explicitement.
+        :type scheduler: Optional[Scheduler]
+        """
+        self._scheduler = scheduler
+        self._subscriptions = []
+        self._dirty = []
+        self._scheduled = False
+
+    def bind(self, component:BaseComponent, eventNames:Sequence[str], callback:ChangesCallback, keepAll:bool = False) -> None:
+        """Abonne une fonction à des événements d'un composant
+
+        :param component: composant observé
+        :type component: BaseComponent
+        :param eventNames: noms des événements, sans le préfixe "on"
+        :type eventNames: Sequence[str]
+        :param callback: fonction recevant la liste des changements
+        :type callback: ChangesCallback
+        :param keepAll: conserver tous les événements, dans leur ordre, au lieu du dernier par nom et par indice
+        :type keepAll: bool
+        """
+        subscription = _Subscription(callback, keepAll)
+        self._subscriptions.append(subscription)
+        for eventName in eventNames:
+            component.bind("on" + eventName, self._recorder(subscription, eventName))
+
+    def _recorder(self, subscription:_Subscription, eventName:str) -> Callable[[Dict[str, Any]], None]:
+        """
+        :param subscription: abonnement
+        :type subscription: _Subscription
+        :param eventName: nom de l'événement
+        :type eventName: str
+        :return: fonction enregistrant un événement pour l'abonnement
+        :rtype: Callable[[Dict[str, Any]], None]
+        """
+        def record(params:Dict[str, Any]) -> None:
+            if len(subscription.order) == 0 and len(subscription.changes) == 0:
+                self._dirty.append(subscription)
+            if subscription.keepAll:
+                subscription.order.append((eventName, params))
+            else:
+                key = (eventName, params.get("index"))
+                # la clé est replacée en fin : l'ordre est celui de la dernière modification
+                subscription.changes.pop(key, None)
+                subscription.changes[key] = (eventName, params)
+            if not self._scheduled and not self._scheduler is None:
+                self._scheduled = True
+                self._scheduler(self.flush)
+        return record
+
+    @property
+    def pending(self) -> bool:
+        """Accesseur
+
+        :return: des changements attendent d'être remis
+        :rtype: bool
+        """
+        return len(self._dirty) > 0
+
+    def flush(self) -> None:
+        """Remet les changements en attente, un appel par abonné concerné,
+        dans l'ordre des abonnements
+        """
+        self._scheduled = False
+        dirty = self._dirty
+        self._dirty = []
+        for subscription in self._subscriptions:
+            if not subscription in dirty:
+                continue
+            if subscription.keepAll:
+                changes = subscription.order
+                subscription.order = []
+            else:
+                changes = list(subscription.changes.values())
+                subscription.changes = {}
+            subscription.callback(changes)
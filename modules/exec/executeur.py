@@ -6,9 +6,20 @@
     executeurcomponents
 """
 
-from typing import List, Tuple, Union, Sequence, Optional
+from typing import List, Tuple, Union, Sequence, Optional, Dict, Set, Any, Deque, Iterable, Callable, cast
+from collections import deque
+import struct
+import time
+import pickle
+
+from modules.errors import ExecutionError
 from modules.engine.processorengine import ProcessorEngine
-from modules.exec.components import BufferComponent, ScreenComponent, RegisterComponent, RegisterGroup, UalComponent, MemoryComponent, DataValue
+from modules.engine.decode import ArgsType
+from modules.engine.addressmap import AddressMap
+from modules.primitives.operators import Operator, Operators
+from modules.exec.components import BufferComponent, ScreenComponent, RegisterComponent, RegisterGroup, UalComponent, MemoryComponent, DataValue, InputSource, IteratorSource
+from modules.exec.translator import BlockTranslator
+from modules.exec.profiler import Profiler
 
 class Executeur:
     """Classe d'exécution d'un code binaire. Initialisé avec :
@@ -28,6 +39,28 @@ class Executeur:
     _BUFFER:int = 5                  # buffer
     _UAL:int = 6                     # Unité Arithmétique et Logique
     _REGISTERS_OFFSET:int = 7        # registre 0
+
+    SNAPSHOT_MAGIC:bytes = b"uPSn"
+    SNAPSHOT_VERSION:int = 2
+    # en-tête : magique, version, taille des mots, nombre de registres, état
+    # puis opérande de l'instruction, registre de l'instruction, registre cible de l'UAL, ligne asm
+    _SNAPSHOT_HEADER:str = "<4sBBBiIIII"
+    # retour arrière : mode actif, profondeur, nombre de pas
+    # puis pour chaque pas l'état interne, sur le modèle de _recordUndo, et ses écritures (cible, indice, valeur)
+    _UNDO_HEADER:str = "<BII"
+    _UNDO_FRAME:str = "<iIIII6{}BBII"
+    _UNDO_WRITE:str = "<BI{}"
+    UNDO_DEPTH:int = 10000           # nombre de pas mémorisés par défaut pour le retour arrière
+    TIMED_CHECK:int = 64             # nombre de pas entre deux lectures de l'horloge dans timedRun
+    # conditions des sauts, d'après les indicateurs nul et positif de l'UAL
+    _CONDITIONS:Dict[Operator, Callable[[bool, bool], bool]] = {
+        Operators.EQ: lambda isZero, isPos: isZero,
+        Operators.NOTEQ: lambda isZero, isPos: not isZero,
+        Operators.INF: lambda isZero, isPos: not (isPos or isZero),
+        Operators.SUP: lambda isZero, isPos: isPos and not isZero,
+        Operators.SUPOREQ: lambda isZero, isPos: isPos,
+        Operators.INFOREQ: lambda isZero, isPos: isZero or not isPos
+    }
     _engine: ProcessorEngine
     memory: MemoryComponent
     linePointer: RegisterComponent
@@ -35,13 +68,24 @@ class Executeur:
     registers: RegisterGroup
     inputBuffer: BufferComponent
     screen: ScreenComponent
-    _instructionRegisterMask: int = 0
+    _instructionOperand: int = 0
     _instructionRegister_regIndex:int = 0
     _currentState: int = 0
     _ualCible: int = 0
     _registerNumber: int
     currentAsmLine:int = 0
     messages:List[str]
+    _translator: BlockTranslator
+    # pour chaque pas : état interne avant le pas, puis anciennes valeurs des cases écrites (cible, indice, valeur)
+    _undoLog: Optional[Deque[Tuple[Tuple[Any, ...], List[Tuple[int, int, int]]]]] = None
+    _undoWrites: Optional[List[Tuple[int, int, int]]] = None
+    _breakpoints: Set[int]
+    _watchedMemory: Set[int]
+    _watchedRegisters: Set[int]
+    _addressMap: Optional[AddressMap] = None
+    breakReason: Optional[str] = None
+    _stopAddress: Optional[int] = None
+    _profiler: Optional[Profiler] = None
 
     def __init__(self, engine:ProcessorEngine, binary:Union[List[int],List[str]]):
         """Constructeur
@@ -67,6 +111,16 @@ class Executeur:
         self._mask = self._getMask()
         self.messages = ["Initialisation"]
 
+        self._breakpoints = set()
+        self._watchedMemory = set()
+        self._watchedRegisters = set()
+
+        self._translator = BlockTranslator(engine)
+        # le cache des blocs traduits doit suivre la mémoire, même quand les événements sont suspendus
+        self.memory.bind("onwrite", self._onMemoryWrite, keepWhenMuted=True)
+        self.memory.bind("oninc", self._onMemoryWrite, keepWhenMuted=True)
+        self.memory.bind("onfill", self._onMemoryFill, keepWhenMuted=True)
+
     @property
     def waitingInput(self) -> bool:
         """Accesseur.
@@ -76,6 +130,69 @@ class Executeur:
         """
         return self._currentState == -2
 
+    @property
+    def undoCount(self) -> int:
+        """Accesseur.
+
+        :return: nombre de pas pouvant être annulés par stepBack
+        :rtype: int
+        """
+        if self._undoLog is None:
+            return 0
+        return len(self._undoLog)
+
+    @property
+    def breakpoints(self) -> List[int]:
+        """Accesseur.
+
+        :return: adresses des points d'arrêt
+        :rtype: List[int]
+        """
+        return sorted(self._breakpoints)
+
+    @property
+    def hasStops(self) -> bool:
+        """Accesseur.
+
+        :return: au moins un point d'arrêt ou une surveillance est armé
+        :rtype: bool
+        """
+        return len(self._breakpoints) > 0 or len(self._watchedMemory) > 0 or len(self._watchedRegisters) > 0
+
+    @property
+    def engine(self) -> ProcessorEngine:
+        """Accesseur.
+
+        :return: modèle de processeur simulé
+        :rtype: ProcessorEngine
+        """
+        return self._engine
+
+    @property
+    def currentState(self) -> int:
+        """Accesseur.
+
+        :return: état courant, voir step
+        :rtype: int
+        """
+        return self._currentState
+
+    def _onMemoryWrite(self, params:Dict[str, Any]) -> None:
+        """Invalide les blocs traduits couvrant une case mémoire modifiée
+
+        :param params: paramètres de l'événement, dont l'indice de la case
+        :type params: Dict[str, Any]
+        """
+        self._translator.invalidate(params["index"])
+
+    def _onMemoryFill(self, params:Dict[str, Any]) -> None:
+        """Oublie tous les blocs traduits quand la mémoire est remplacée
+
+        :param params: paramètres de l'événement
+        :type params: Dict[str, Any]
+        """
+        self._translator.clear()
+
     def _getMask(self) -> int:
         """
         :return: masque pour empêcher la saisie d'un nombre trop grand
@@ -96,11 +213,14 @@ class Executeur:
         if source == self._MEMORY:
             return self.memory.readAddressedRegister()
         if source == self._INSTRUCTION_REGISTER:
-            return self.instructionRegister.read().mask(self._instructionRegisterMask)
+            return DataValue(self._engine.dataBits, self._instructionOperand)
         if source == self._LINE_POINTER:
             return self.linePointer.read()
         if source == self._BUFFER:
-            return self.inputBuffer.read()
+            value = self.inputBuffer.read()
+            if self._undoWrites is not None and isinstance(value, DataValue):
+                self._undoWrites.append((self._BUFFER, 0, value.intValue))
+            return value
         if source == self._UAL:
             return self.ual.read()
         if self._REGISTERS_OFFSET <= source < self._REGISTERS_OFFSET + self._registerNumber:
@@ -118,6 +238,9 @@ class Executeur:
         """
         if bus == self._DATA_BUS:
             if cible == self._MEMORY:
+                if self._undoWrites is not None:
+                    address = self.memory.address.intValue
+                    self._undoWrites.append((self._MEMORY, address, self.memory.peek(address)))
                 self.memory.writeAddressedRegister(value)
             elif cible == self._MEMORY_ADDRESS:
                 self.memory.setAddress(value)
@@ -131,6 +254,8 @@ class Executeur:
                 self.ual.writeFirstOperand(value)
             elif self._REGISTERS_OFFSET <= cible < self._REGISTERS_OFFSET + self._registerNumber:
                 index = cible - self._REGISTERS_OFFSET
+                if self._undoWrites is not None:
+                    self._undoWrites.append((self._REGISTERS_OFFSET, index, self.registers.peek(index)))
                 self.registers.write(index, value)
         elif bus == self._DATA_BUS_2 and cible == self._UAL:
             self.ual.writeSecondOperand(value)
@@ -153,6 +278,31 @@ class Executeur:
             return sourceValue
         return False
 
+    def _conditionSatisfied(self, operator:Operator) -> bool:
+        """Teste la condition d'un saut conditionnel d'après les indicateurs de l'UAL
+
+        :param operator: opérateur de comparaison du saut
+        :type operator: Operator
+        :return: le saut doit être effectué
+        :rtype: bool
+        """
+        condition = self._CONDITIONS.get(operator)
+        if condition is None:
+            return False
+        return condition(self.ual.isZero, self.ual.isPos)
+
+    @staticmethod
+    def _ualOperationName(operator:Operator) -> str:
+        """
+        :param operator: opérateur arithmétique
+        :type operator: Operator
+        :return: nom de l'opération pour l'UAL
+        :rtype: str
+        """
+        if operator == Operators.NEG:
+            return "neg"
+        return operator.symbol
+
     def bufferize(self, value:int) -> None:
         """Ajoute un entier au buffer d'entrée
 
@@ -162,6 +312,360 @@ class Executeur:
         value &= self._mask
         self.inputBuffer.write(value)
 
+    def bufferizeMany(self, values:Iterable[int]) -> None:
+        """Ajoute des entiers au buffer d'entrée, en une seule opération
+
+        :param values: valeurs à bufferiser
+        :type values: Iterable[int]
+        """
+        self.inputBuffer.writeMany(values)
+
+    def addInputSource(self, source:Union[InputSource, Iterable[int]]) -> None:
+        """Ajoute une source de saisies, lue à la demande quand le programme
+        exécute une saisie et que le buffer d'entrée est vide
+
+        :param source: source de saisies, ou itérable de valeurs lu au fur et à mesure
+        :type source: Union[InputSource, Iterable[int]]
+        """
+        if not isinstance(source, InputSource):
+            source = IteratorSource(source)
+        self.inputBuffer.addSource(source)
+
+    def addBreakpoint(self, address:int) -> None:
+        """Arrête nonStopRun et translatedRun avant l'exécution de l'instruction à cette adresse
+
+        :param address: adresse de l'instruction
+        :type address: int
+        """
+        self._breakpoints.add(address)
+
+    def removeBreakpoint(self, address:int) -> None:
+        """Supprime un point d'arrêt
+
+        :param address: adresse de l'instruction
+        :type address: int
+        """
+        self._breakpoints.discard(address)
+
+    @property
+    def addressMap(self) -> Optional[AddressMap]:
+        """Accesseur.
+
+        :return: correspondance entre adresses et programme d'origine, None si elle est inconnue
+        :rtype: Optional[AddressMap]
+        """
+        return self._addressMap
+
+    def setAddressMap(self, addressMap:AddressMap) -> None:
+        """Fixe la correspondance entre adresses et programme d'origine,
+        nécessaire pour les points d'arrêt sur une ligne et les surveillances de variables
+
+        :param addressMap: correspondance, voir ProcessorEngine.getAddressMap
+        :type addressMap: AddressMap
+        """
+        self._addressMap = addressMap
+
+    def setLineNumbers(self, lineNumbers:List[int]) -> None:
+        """Fixe la correspondance entre adresses et lignes du programme d'origine
+
+        :param lineNumbers: numéro de ligne de chaque adresse, voir ProcessorEngine.getLineNumbers
+        :type lineNumbers: List[int]
+        """
+        self._addressMap = AddressMap.fromLineNumbers(lineNumbers)
+
+    def addLineBreakpoint(self, lineNumber:int) -> List[int]:
+        """Place un point d'arrêt au début de chaque suite d'instructions
+        produite par une ligne du programme d'origine
+
+        :param lineNumber: numéro de ligne dans le programme d'origine
+        :type lineNumber: int
+        :return: adresses des points d'arrêt ajoutés
+        :rtype: List[int]
+        :raises: ExecutionError si la correspondance des lignes est inconnue ou si la ligne ne produit pas de code
+        """
+        if self._addressMap is None:
+            raise ExecutionError("Correspondance entre adresses et lignes inconnue (setAddressMap)")
+        addresses = self._addressMap.addressesOf(lineNumber)
+        if len(addresses) == 0:
+            raise ExecutionError("Aucune instruction pour cette ligne", {"lineNumber": lineNumber})
+        self._breakpoints.update(addresses)
+        return addresses
+
+    def removeLineBreakpoint(self, lineNumber:int) -> None:
+        """Supprime les points d'arrêt placés sur les instructions d'une ligne
+
+        :param lineNumber: numéro de ligne dans le programme d'origine
+        :type lineNumber: int
+        """
+        if self._addressMap is None:
+            return
+        for start, end, item in self._addressMap.ranges:
+            if item == lineNumber:
+                self._breakpoints.difference_update(range(start, end))
+
+    def addWatchpoint(self, address:int) -> None:
+        """Arrête nonStopRun et translatedRun après une instruction modifiant la case mémoire,
+        une variable par exemple
+
+        :param address: adresse surveillée
+        :type address: int
+        """
+        self._watchedMemory.add(address)
+
+    def addVariableWatchpoint(self, name:str) -> int:
+        """Surveille une variable du programme d'origine
+
+        :param name: nom de la variable
+        :type name: str
+        :return: adresse surveillée
+        :rtype: int
+        :raises: ExecutionError si la correspondance est inconnue ou si la variable n'existe pas
+        """
+        if self._addressMap is None:
+            raise ExecutionError("Correspondance entre adresses et variables inconnue (setAddressMap)")
+        address = self._addressMap.variableAddress(name)
+        self._watchedMemory.add(address)
+        return address
+
+    def addRegisterWatchpoint(self, index:int) -> None:
+        """Arrête nonStopRun et translatedRun après une instruction modifiant le registre
+
+        :param index: indice du registre surveillé
+        :type index: int
+        """
+        self._watchedRegisters.add(index)
+
+    def removeWatchpoint(self, address:int) -> None:
+        """Supprime la surveillance d'une case mémoire
+
+        :param address: adresse surveillée
+        :type address: int
+        """
+        self._watchedMemory.discard(address)
+
+    def removeRegisterWatchpoint(self, index:int) -> None:
+        """Supprime la surveillance d'un registre
+
+        :param index: indice du registre surveillé
+        :type index: int
+        """
+        self._watchedRegisters.discard(index)
+
+    def clearStops(self) -> None:
+        """Supprime tous les points d'arrêt et toutes les surveillances
+        """
+        self._breakpoints = set()
+        self._watchedMemory = set()
+        self._watchedRegisters = set()
+
+    def _watchedValues(self) -> List[int]:
+        """
+        :return: valeurs des registres puis des cases mémoire surveillés, par indices croissants
+        :rtype: List[int]
+        """
+        values = [self.registers.peek(index) for index in sorted(self._watchedRegisters)]
+        values.extend([self.memory.peek(address) for address in sorted(self._watchedMemory)])
+        return values
+
+    def _stopReason(self, watched:List[int]) -> Optional[str]:
+        """Cherche la raison d'un arrêt au début d'une instruction
+
+        :param watched: valeurs surveillées au début de l'exécution
+        :type watched: List[int]
+        :return: description de l'arrêt, None s'il n'y a pas lieu de s'arrêter
+        :rtype: Optional[str]
+        """
+        values = self._watchedValues()
+        if values != watched:
+            names = ["registre {}".format(index) for index in sorted(self._watchedRegisters)]
+            names.extend([self._memoryName(address) for address in sorted(self._watchedMemory)])
+            changes = ["{} : {} -> {}".format(name, old, new) for name, old, new in zip(names, watched, values) if old != new]
+            return "Surveillance : " + ", ".join(changes)
+        address = self.linePointer.intValue
+        if address in self._breakpoints:
+            lineNumber = None if self._addressMap is None else self._addressMap.lineOf(address)
+            if lineNumber is not None:
+                return "Point d'arrêt : adresse {}, ligne {}".format(address, lineNumber)
+            return "Point d'arrêt : adresse {}".format(address)
+        return None
+
+    def _startStopReason(self) -> Optional[str]:
+        """Cherche un point d'arrêt sur l'instruction de départ d'une exécution.
+        Il est ignoré quand l'exécution reprend après un arrêt à cette même adresse.
+
+        :return: description de l'arrêt, None s'il n'y a pas lieu de s'arrêter
+        :rtype: Optional[str]
+        """
+        address = self.linePointer.intValue
+        resumed = address == self._stopAddress
+        self._stopAddress = None
+        if resumed or self._currentState != 0 or not address in self._breakpoints:
+            return None
+        return self._stopReason(self._watchedValues())
+
+    def _break(self, reason:str) -> int:
+        """Arrête l'exécution sur un point d'arrêt ou une surveillance
+
+        :param reason: description de l'arrêt
+        :type reason: str
+        :return: état en cours
+        :rtype: int
+        """
+        self.breakReason = reason
+        self.messages.append(reason)
+        self._stopAddress = self.linePointer.intValue
+        return self._currentState
+
+    def _memoryName(self, address:int) -> str:
+        """
+        :param address: adresse mémoire
+        :type address: int
+        :return: désignation de la case, avec le nom de la variable s'il est connu
+        :rtype: str
+        """
+        name = None if self._addressMap is None else self._addressMap.symbolAt(address)
+        if name is None:
+            return "mémoire {}".format(address)
+        return "mémoire {} ({})".format(address, name)
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        """Accesseur.
+
+        :return: compteurs du profilage en cours, None si le profilage n'est pas actif
+        :rtype: Optional[Profiler]
+        """
+        return self._profiler
+
+    def enableProfiling(self, addressMap:Optional[AddressMap] = None) -> Profiler:
+        """Active le profilage : chaque pas élémentaire est compté pour l'adresse
+        de l'instruction en cours.
+
+        :param addressMap: correspondance entre adresses et lignes, pour regrouper par ligne ;
+          par défaut, la correspondance fixée par setAddressMap
+        :type addressMap: Optional[AddressMap]
+        :return: compteurs du profilage
+        :rtype: Profiler
+
+        .. note:: pendant le profilage, translatedRun s'exécute pas à pas pour que les cycles soient exacts.
+        """
+        if addressMap is None:
+            addressMap = self._addressMap
+        self._profiler = Profiler(addressMap)
+        return self._profiler
+
+    def disableProfiling(self) -> None:
+        """Désactive le profilage
+        """
+        self._profiler = None
+
+    def _profileStep(self, profiler:Profiler) -> None:
+        """Compte le pas élémentaire qui va être exécuté
+
+        :param profiler: compteurs du profilage
+        :type profiler: Profiler
+        """
+        state = self._currentState
+        if state == 0:
+            address = self.linePointer.intValue
+            profiler.countExecution(address)
+            profiler.countCycle(address)
+        elif state > 0 or (state == -2 and not self.inputBuffer.empty()):
+            # une attente de saisie sans valeur disponible n'est pas comptée
+            profiler.countCycle(self.currentAsmLine)
+
+    def enableUndo(self, depth:int = UNDO_DEPTH) -> None:
+        """Active le mode réversible : chaque pas mémorise les anciennes valeurs
+        de ce qu'il modifie, ce qui permet de revenir en arrière avec stepBack.
+        Seuls les depth derniers pas sont conservés.
+
+        :param depth: nombre maximum de pas mémorisés
+        :type depth: int
+        """
+        self._undoLog = deque(maxlen=depth)
+        self._undoWrites = None
+
+    def disableUndo(self) -> None:
+        """Désactive le mode réversible et oublie les pas mémorisés
+        """
+        self._undoLog = None
+        self._undoWrites = None
+
+    def _clearUndo(self) -> None:
+        """Oublie les pas mémorisés, par exemple quand l'état a été modifié
+        sans passer par step. Le mode réversible reste actif.
+        """
+        if self._undoLog is not None:
+            self._undoLog.clear()
+        self._undoWrites = None
+
+    def _recordUndo(self) -> None:
+        """Mémorise l'état interne avant un pas. Les anciennes valeurs des registres,
+        des cases mémoire et du buffer sont ajoutées au fil du pas par _setValue et _getValue.
+        """
+        ual = self.ual
+        frame = (
+            self._currentState, self._instructionOperand, self._instructionRegister_regIndex, self._ualCible,
+            self.currentAsmLine, self.linePointer.intValue, self.instructionRegister.intValue,
+            self.memory.address.intValue, ual.op1.intValue, ual.op2.intValue, ual.read().intValue,
+            ual.operation, ual.isZero, ual.isPos, self.screen.count, len(self.messages)
+        )
+        self._undoWrites = []
+        cast(Deque, self._undoLog).append((frame, self._undoWrites))
+
+    def stepBack(self, count:int = 1) -> int:
+        """Annule les derniers pas élémentaires, dans la limite des pas mémorisés.
+        Chaque pas annulé coûte autant que le pas lui-même, quelle que soit la durée d'exécution passée.
+
+        :param count: nombre de pas à annuler
+        :type count: int
+        :return: état en cours, après annulation
+        :rtype: int
+        :raises: ExecutionError si le mode réversible n'est pas actif
+
+        .. note:: les pas antérieurs à un translatedRun ne peuvent pas être annulés.
+        """
+        if self._undoLog is None:
+            raise ExecutionError("Le retour arrière nécessite le mode réversible (enableUndo)")
+        self._undoWrites = None
+        while count > 0 and len(self._undoLog) > 0:
+            count -= 1
+            frame, writes = self._undoLog.pop()
+            for cible, index, value in reversed(writes):
+                if cible == self._MEMORY:
+                    self.memory.write(index, value)
+                elif cible == self._BUFFER:
+                    self.inputBuffer.unread(value)
+                else:
+                    self.registers.write(index, value)
+            (state, operand, regIndex, ualCible, asmLine, linePointer, instructionRegister,
+                memoryAddress, op1, op2, result, operation, isZero, isPos, screenLength, messagesLength) = frame
+            if self.linePointer.intValue != linePointer:
+                self.linePointer.write(linePointer)
+            if self.instructionRegister.intValue != instructionRegister:
+                self.instructionRegister.write(instructionRegister)
+            if self.memory.address.intValue != memoryAddress:
+                self.memory.setAddress(memoryAddress)
+            ual = self.ual
+            if ual.op1.intValue != op1:
+                ual.writeFirstOperand(op1)
+            if ual.op2.intValue != op2:
+                ual.writeSecondOperand(op2)
+            ual.writeResult(result)
+            if ual.operation != operation:
+                ual.setOperation(operation)
+            if ual.isZero != isZero or ual.isPos != isPos:
+                ual.setFlags(isZero, isPos)
+            if self.screen.count != screenLength:
+                self.screen.truncate(screenLength)
+            del self.messages[messagesLength:]
+            self._currentState = state
+            self._instructionOperand = operand
+            self._instructionRegister_regIndex = regIndex
+            self._ualCible = ualCible
+            self.currentAsmLine = asmLine
+        return self._currentState
+
     def step(self) -> int:
         """Exécution d'un pas.
         Il s'agit d'un pas élémentaire, il en faut plusieurs pour exécuter l'ensemble de l'instruction.
@@ -174,7 +678,13 @@ class Executeur:
           * 0 = début instruction,
           * 1 <= état interne du processeur correspondant au déroulement de l'instruction
         :rtype: int
+
+        .. note:: en mode réversible, le pas est mémorisé pour pouvoir être annulé par stepBack.
         """
+        if self._undoLog is not None:
+            self._recordUndo()
+        if self._profiler is not None:
+            self._profileStep(self._profiler)
 
         if self._currentState == 0:
             # toujours chargement de la ligne dans le registre d'adresse mémoire
@@ -210,90 +720,39 @@ class Executeur:
             #     print charge le registre dans la pile Print puis 0 -> currentState
             #     input charge adresse cible dans registre adresse, ? -> currentState
             #     dans l'état suivant pour input, il faudra lire dans le buffer. Si buffer vide, nécessitera de passer à l'état -2
-            instName, opRegisters, opSpecial, sizeSpecial = self._engine.instructionDecode(self.instructionRegister.intValue)
-            self._instructionRegisterMask = 2**sizeSpecial - 1
-            if instName == "halt":
+            decoded = self._engine.instructionDecode(self.instructionRegister.intValue)
+            operator = decoded["operator"]
+            opRegisters = [value for argType, value in decoded["args"] if argType == ArgsType.REGISTRE]
+            opSpecial = [value for argType, value in decoded["args"] if argType != ArgsType.REGISTRE]
+            self._instructionOperand = opSpecial[0] if len(opSpecial) > 0 else 0
+
+            if operator == Operators.HALT:
                 self._currentState = -1
+                self.screen.flush()
                 self.messages.append("Halt")
 
-            elif instName == "nop":
+            elif operator == Operators.NOP:
                 self._currentState = 0
                 self.messages.append("NOP")
 
-            elif instName == "goto":
+            elif operator == Operators.GOTO:
                 sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
                 if isinstance(sourceValue, DataValue):
                     address = sourceValue.intValue
                     self.messages.append("GOTO : ligne {} chargée dans pointeur de ligne".format(address))
                 self._currentState = 0
 
-            elif instName == "!=":
-                if(not(self.ual.isZero)):
-                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
-                    if isinstance(sourceValue, DataValue):
-                        address = sourceValue.intValue
-                        self.messages.append("GOTO (si ≠0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
-                else:
-                    self.messages.append("GOTO (si ≠0) non effecuté.")
-                    self._currentState = 0
-
-            elif instName == "==":
-                if(self.ual.isZero):
-                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
-                    if isinstance(sourceValue, DataValue):
-                        address = sourceValue.intValue
-                        self.messages.append("GOTO (si =0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
-                else:
-                    self.messages.append("GOTO (si =0) non effecuté.")
-                    self._currentState = 0
-
-            elif instName == "<":
-                if not (self.ual.isPos or self.ual.isZero):
-                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
-                    if isinstance(sourceValue, DataValue):
-                        address = sourceValue.intValue
-                        self.messages.append("GOTO (si <0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
-                else:
-                    self.messages.append("GOTO (si <0) non effecuté.")
-                    self._currentState = 0
-
-            elif instName == ">":
-                if self.ual.isPos and not self.ual.isZero:
-                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
-                    if isinstance(sourceValue, DataValue):
-                        address = sourceValue.intValue
-                        self.messages.append("GOTO (si >0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
-                else:
-                    self.messages.append("GOTO (si >0) non effecuté.")
-                    self._currentState = 0
-
-            elif instName == ">=":
-                if self.ual.isPos:
+            elif operator.isComparaison:
+                if self._conditionSatisfied(operator):
                     sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
                     if isinstance(sourceValue, DataValue):
                         address = sourceValue.intValue
-                        self.messages.append("GOTO (si ≥0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
+                        self.messages.append("GOTO (si {}): ligne {} chargée dans pointeur de ligne".format(operator, address))
                 else:
-                    self.messages.append("GOTO (si ≥0) non effecuté.")
-                    self._currentState = 0
-
-            elif instName == "<=":
-                if((self.ual.isZero)|(not(self.ual.isPos))):
-                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._LINE_POINTER, self._DATA_BUS)
-                    if isinstance(sourceValue, DataValue):
-                        address = sourceValue.intValue
-                        self.messages.append("GOTO (si ≤0): ligne {} chargée dans pointeur de ligne".format(address))
-                    self._currentState = 0
-                else:
-                    self.messages.append("GOTO (si ≤0) non effecuté.")
-                    self._currentState = 0
+                    self.messages.append("GOTO (si {}) non effecuté.".format(operator))
+                self._currentState = 0
 
-            elif instName == "input":
+            elif operator == Operators.INPUT:
                 sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._MEMORY_ADDRESS, self._DATA_BUS)
                 if isinstance(sourceValue, DataValue):
                     address = sourceValue.intValue
@@ -302,13 +761,13 @@ class Executeur:
                 # l'état 8 est important : si on mettait -2 tout de suite, l'état -2 provoquerait un arrêt d'exécution
                 # même dans des cas ou le buffer aurait été préalablement rempli
 
-            elif instName == "print":
+            elif operator == Operators.PRINT:
                 register = opRegisters[0]
                 self._transfert(self._REGISTERS_OFFSET + register, self._PRINT, self._DATA_BUS)
                 self.messages.append("Affichage du contenu du registre {}".format(register))
                 self._currentState = 0
 
-            elif instName == "move":
+            elif operator == Operators.MOVE:
                 if len(opRegisters) == 1:
                     register = opRegisters[0]
                     sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._REGISTERS_OFFSET + register, self._DATA_BUS)
@@ -322,7 +781,7 @@ class Executeur:
                     self.messages.append("Transfert du registre {} au registre {}".format(registerSource, registerCible))
                     self._currentState = 0
 
-            elif instName == "store":
+            elif operator == Operators.STORE:
                 self._instructionRegister_regIndex = opRegisters[0]
                 sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._MEMORY_ADDRESS, self._DATA_BUS)
                 if isinstance(sourceValue, DataValue):
@@ -330,7 +789,7 @@ class Executeur:
                     self.messages.append("STORE : Sélection de l'adresse {}".format(address))
                 self._currentState = 6
 
-            elif instName == "load":
+            elif operator == Operators.LOAD:
                 self._instructionRegister_regIndex = opRegisters[0]
                 sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._MEMORY_ADDRESS, self._DATA_BUS)
                 if isinstance(sourceValue, DataValue):
@@ -338,7 +797,7 @@ class Executeur:
                     self.messages.append("LOAD : Sélection de l'adresse {}".format(address))
                 self._currentState = 7
 
-            elif instName == "cmp":
+            elif operator == Operators.CMP:
                 registerIndexGauche = opRegisters[0]
                 self._transfert(registerIndexGauche+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
                 registerIndexDroite = opRegisters[1]
@@ -347,32 +806,32 @@ class Executeur:
                 self.messages.append("CMP : Comparaison des registres {} et {}".format(registerIndexGauche, registerIndexDroite))
                 self._currentState = 3
 
-            elif instName in ["neg", "~", "+", "-", "*", "/", "%", "&", "|", "^"]:
+            elif operator.isArithmetic:
+                if not self._engine.ualOutputIsFree():
+                    # la sortie de l'UAL est toujours le registre 0, non codé dans l'instruction
+                    opRegisters = [0] + opRegisters
                 self._ualCible = opRegisters[0]
-
-                if opSpecial != -1:
-                    if len(opRegisters) == 1:
-                        sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._UAL, self._DATA_BUS)
-                        if isinstance(sourceValue, DataValue):
-                            self.messages.append("UAL : {} -> opérande 1".format(registerIndex1, sourceValue.intValue))
-                    else:
-                        registerIndex = opRegisters[1]
-                        self._transfert(registerIndex+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
-                        sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._UAL, self._DATA_BUS_2)
-                        if isinstance(sourceValue, DataValue):
-                            self.messages.append("UAL : registre {} -> opérande 1 ; {} -> opérande 2".format(registerIndex, sourceValue.intValue))
+                operands = opRegisters[1:]
+                if len(operands) == 0:
+                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._UAL, self._DATA_BUS)
+                    if isinstance(sourceValue, DataValue):
+                        self.messages.append("UAL : {} -> opérande 1".format(sourceValue.intValue))
+                elif len(operands) == 1 and len(opSpecial) > 0:
+                    registerIndex = operands[0]
+                    self._transfert(registerIndex+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
+                    sourceValue = self._transfert(self._INSTRUCTION_REGISTER, self._UAL, self._DATA_BUS_2)
+                    if isinstance(sourceValue, DataValue):
+                        self.messages.append("UAL : registre {} -> opérande 1 ; {} -> opérande 2".format(registerIndex, sourceValue.intValue))
+                elif len(operands) == 1:
+                    registerIndex = operands[0]
+                    self._transfert(registerIndex+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
+                    self.messages.append("UAL : registre {} -> opérande 1".format(registerIndex))
                 else:
-                    if len(opRegisters) <= 2:
-                        registerIndex = opRegisters[1]
-                        self._transfert(registerIndex+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
-                        self.messages.append("UAL : registre {} -> opérande 1".format(registerIndex))
-                    else:
-                        registerIndex1 = opRegisters[1]
-                        self._transfert(registerIndex1+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
-                        registerIndex2 = opRegisters[2]
-                        self._transfert(registerIndex2+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS_2)
-                        self.messages.append("UAL : registre {} -> opérande 1 ; registre {} -> opérande 2".format(registerIndex1, registerIndex2))
-                self.ual.setOperation(instName)
+                    registerIndex1, registerIndex2 = operands
+                    self._transfert(registerIndex1+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS)
+                    self._transfert(registerIndex2+self._REGISTERS_OFFSET, self._UAL, self._DATA_BUS_2)
+                    self.messages.append("UAL : registre {} -> opérande 1 ; registre {} -> opérande 2".format(registerIndex1, registerIndex2))
+                self.ual.setOperation(self._ualOperationName(operator))
                 self._currentState = 4
 
         # Chaque état est particulier ensuite. Il faut tracer un diagramme avec tous les schémas possibles.
@@ -383,13 +842,13 @@ class Executeur:
         # on sait déjà où on est, ce qui est plus simple.
         elif self._currentState == 3:
             # exécution UAL CMP (sans transfert)
-            self.ual.execCalc()
+            self.ual.calc()
             self.messages.append("UAL : exécution de CMP")
             self._currentState = 0
 
         elif self._currentState == 4:
             # exécution UAL
-            self.ual.execCalc()
+            self.ual.calc()
             self.messages.append("UAL : exécution de {}".format(self.ual.operation))
             self._currentState = 5
 
@@ -420,6 +879,9 @@ class Executeur:
                 self.messages.append("INPUT : transfert buffer -> mémoire")
                 self._currentState = 0
             else:
+                if self._currentState == 8:
+                    # l'affichage en attente est transmis avant de rendre la main pour la saisie
+                    self.screen.flush()
                 self.messages.append("INPUT : attente saisie utilisateur")
                 self._currentState = -2
 
@@ -449,15 +911,429 @@ class Executeur:
           -2 = attente input
         :rtype: int
 
+        .. note:: si des points d'arrêt ou des surveillances sont armés, l'exécution s'arrête
+          au début de l'instruction concernée, état 0, et breakReason décrit l'arrêt.
+          Un point d'arrêt sur l'instruction de départ est respecté, sauf à la reprise après un arrêt à cette adresse.
+          Sinon la boucle ne fait aucun test supplémentaire.
+
         .. warning::
           Si le programme boucle, l'instruction bouclera aussi.
           De plus, ce programme prend la main pour toute une exécution.
           Ne convient donc pas au cas d'une visualisation avec interface graphique devant se remettre à jour en parallèle de l'exécution.
         """
-        while (self.step() >= 0 ):
-            pass
+        self.breakReason = None
+        if not self.hasStops:
+            while (self.step() >= 0 ):
+                pass
+            return self._currentState
+        reason = self._startStopReason()
+        if not reason is None:
+            return self._break(reason)
+        watched = self._watchedValues()
+        while True:
+            state = self.step()
+            if state < 0:
+                return state
+            if state == 0:
+                reason = self._stopReason(watched)
+                if not reason is None:
+                    return self._break(reason)
+
+    def setComponentsMuted(self, muted:bool) -> None:
+        """Suspend ou rétablit les événements de tous les composants,
+        par exemple pour exécuter de nombreux pas avant de rafraîchir l'affichage une seule fois.
+        Le cache des blocs traduits reste invalidé par les écritures en mémoire.
+
+        :param muted: les événements ne sont plus déclenchés
+        :type muted: bool
+        """
+        for component in (self.memory, self.registers, self.linePointer, self.instructionRegister, self.ual, self.inputBuffer, self.screen):
+            component.setMuted(muted)
+
+    def timedRun(self, seconds:float, maxSteps:int = 0) -> int:
+        """Exécution pas à pas pendant une durée limitée, pour une interface graphique
+        qui exécute une tranche de pas à chaque image
+
+        :param seconds: durée de l'exécution, vérifiée tous les TIMED_CHECK pas
+        :type seconds: float
+        :param maxSteps: nombre maximum de pas élémentaires, 0 si illimité
+        :type maxSteps: int
+        :return: état en cours.
+          -1 = halt
+          -2 = attente input
+          0 = arrêt sur un point d'arrêt ou une surveillance, décrit par breakReason
+          sinon état du pas en cours quand la durée ou le nombre de pas est épuisé
+        :rtype: int
+        """
+        self.breakReason = None
+        watched = None
+        if self.hasStops:
+            reason = self._startStopReason()
+            if not reason is None:
+                return self._break(reason)
+            watched = self._watchedValues()
+        deadline = time.perf_counter() + seconds
+        steps = 0
+        while True:
+            state = self.step()
+            steps += 1
+            if state < 0:
+                return state
+            if state == 0 and watched is not None:
+                reason = self._stopReason(watched)
+                if not reason is None:
+                    return self._break(reason)
+            if steps == maxSteps:
+                return state
+            if steps % self.TIMED_CHECK == 0 and time.perf_counter() >= deadline:
+                return state
+
+    def translatedRun(self, budget:int = 0) -> int:
+        """Exécution du programme en continu, par blocs de base traduits en fonctions Python.
+        L'état du processeur est recopié en entrée dans des listes d'entiers, puis les composants
+        sont mis à jour en fin d'exécution, sans passer par les étapes élémentaires.
+
+        :param budget: nombre approximatif d'instructions après lequel l'exécution rend la main, 0 si illimité
+        :type budget: int
+        :return: état en cours.
+          -1 = halt
+          -2 = attente input
+          0 = arrêt sur un point d'arrêt ou une surveillance, décrit par breakReason,
+          ou budget épuisé, breakReason valant alors None
+        :rtype: int
+
+        .. note:: les blocs traduits sont conservés entre deux appels et invalidés
+          quand la mémoire qu'ils couvrent est modifiée. En mode réversible, les pas
+          mémorisés sont oubliés : l'exécution par blocs ne peut pas être annulée.
+
+        .. warning::
+          Comme pour nonStopRun, si le programme boucle, l'instruction bouclera aussi.
+        """
+        if self._profiler is not None:
+            return self._steppedRun(budget)
+        self.breakReason = None
+        reason = self._startStopReason()
+        if not reason is None:
+            return self._break(reason)
+        watched = self._watchedValues()
+        if self._currentState != 0:
+            # on termine l'instruction en cours, une saisie en attente par exemple
+            if self.instructionStep() < 0:
+                return self._currentState
+            reason = self._stopReason(watched)
+            if not reason is None:
+                return self._break(reason)
+
+        self._clearUndo()
+        self._translator.setStops(self._breakpoints, self._watchedMemory, self._watchedRegisters)
+        initialRegisters = [item.intValue for item in self.registers.content]
+        initialMemory = [item.intValue for item in self.memory.content]
+        registers = list(initialRegisters)
+        memory = list(initialMemory)
+        flags = [self.ual.isZero, self.ual.isPos]
+        readCount = self.inputBuffer.readCount
+        outputs:List[int] = []
+
+        address, state, block = self._translator.run(self.linePointer.intValue, registers, memory, flags, self.inputBuffer.pop, outputs, budget)
+
+        for index, value in enumerate(registers):
+            if value != initialRegisters[index]:
+                self.registers.write(index, value)
+        for index, value in enumerate(memory):
+            if index >= len(initialMemory) or value != initialMemory[index]:
+                self.memory.write(index, value)
+        if self.inputBuffer.readCount != readCount:
+            self.inputBuffer.trigger("read", {})
+        for value in outputs:
+            self.screen.write(value)
+        self.ual.setFlags(flags[0], flags[1])
+        self.linePointer.write(address)
+        self.currentAsmLine = address - 1
+        if state == BlockTranslator.WAITING_INPUT:
+            self.memory.setAddress(cast(int, block.inputAddress))
+            self.screen.flush()
+            self.messages.append("INPUT : attente saisie utilisateur")
+        elif state == BlockTranslator.CONTINUE:
+            reason = self._stopReason(watched)
+            if not reason is None:
+                self._currentState = state
+                return self._break(reason)
+        else:
+            self.screen.flush()
+            self.messages.append("Halt")
+        self._currentState = state
+        return state
+
+    def _steppedRun(self, budget:int) -> int:
+        """Version de translatedRun exécutant les instructions une à une,
+        pour que le profilage compte chaque pas élémentaire.
+        Mêmes arrêts que nonStopRun, et même valeur de retour que translatedRun.
+
+        :param budget: nombre d'instructions après lequel l'exécution rend la main, 0 si illimité
+        :type budget: int
+        :return: état en cours
+        :rtype: int
+        """
+        if budget <= 0:
+            return self.nonStopRun()
+        self.breakReason = None
+        watched = None
+        if self.hasStops:
+            reason = self._startStopReason()
+            if not reason is None:
+                return self._break(reason)
+            watched = self._watchedValues()
+        while budget > 0:
+            state = self.instructionStep()
+            if state < 0:
+                return state
+            budget -= 1
+            if watched is not None:
+                reason = self._stopReason(watched)
+                if not reason is None:
+                    return self._break(reason)
         return self._currentState
 
+    @staticmethod
+    def _wordFormat(dataBits:int) -> str:
+        """
+        :param dataBits: taille d'un mot en bits
+        :type dataBits: int
+        :return: format struct le plus compact pour un mot de cette taille
+        :rtype: str
+        """
+        if dataBits <= 8:
+            return "B"
+        if dataBits <= 16:
+            return "H"
+        if dataBits <= 32:
+            return "I"
+        return "Q"
+
+    def snapshot(self) -> bytes:
+        """Sauvegarde l'état complet de la machine : mémoire, registres, pointeur de ligne,
+        registre instruction, UAL, buffer d'entrée et sources de saisies, écran, état du cycle en cours,
+        points d'arrêt, surveillances et pas mémorisés pour le retour arrière.
+
+        :return: état sous une forme binaire compacte et versionnée
+        :rtype: bytes
+        :raises: ExecutionError si une source de saisies ne peut pas être sauvegardée
+
+        .. note:: les messages et le cache des blocs traduits ne sont pas sauvegardés.
+          Les sources de saisies sont sauvegardées avec pickle : un générateur ou un fichier ouvert ne peut pas l'être.
+          Pour l'écran, seules les valeurs conservées par sa destination sont sauvegardées.
+        """
+        dataBits = self._engine.dataBits
+        word = self._wordFormat(dataBits)
+        memory = [item.intValue for item in self.memory.content]
+        inputs = self.inputBuffer.values
+        screen = [item.intValue for item in self.screen.list]
+        flags = int(self.ual.isZero) | int(self.ual.isPos) << 1
+        try:
+            sources = pickle.dumps(self.inputBuffer.sources)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            raise ExecutionError("Source de saisies impossible à sauvegarder : {}".format(error))
+        parts = [
+            struct.pack(self._SNAPSHOT_HEADER,
+                self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, dataBits, self._registerNumber, self._currentState,
+                self._instructionOperand, self._instructionRegister_regIndex, self._ualCible, self.currentAsmLine),
+            struct.pack("<6" + word,
+                self.linePointer.intValue, self.instructionRegister.intValue, self.memory.address.intValue,
+                self.ual.op1.intValue, self.ual.op2.intValue, self.ual.read().intValue),
+            struct.pack("<BB", flags, UalComponent.OPERATIONS.index(self.ual.operation)),
+            struct.pack("<{}{}".format(self._registerNumber, word), *[item.intValue for item in self.registers.content])
+        ]
+        for values in (memory, inputs, screen):
+            parts.append(struct.pack("<I{}{}".format(len(values), word), len(values), *values))
+        parts.append(struct.pack("<II", self.screen.count, self.inputBuffer.readCount))
+        for stops in (self._breakpoints, self._watchedMemory, self._watchedRegisters):
+            parts.append(struct.pack("<I{}I".format(len(stops)), len(stops), *sorted(stops)))
+        parts.append(self._undoSnapshot(word))
+        parts.append(struct.pack("<I", len(sources)))
+        parts.append(sources)
+        return b"".join(parts)
+
+    def _undoSnapshot(self, word:str) -> bytes:
+        """Sauvegarde des pas mémorisés pour le retour arrière
+
+        :param word: format struct d'un mot
+        :type word: str
+        :return: mode réversible actif, profondeur, puis chaque pas et ses écritures
+        :rtype: bytes
+
+        .. note:: la longueur des messages n'est pas sauvegardée, les messages ne l'étant pas.
+        """
+        if self._undoLog is None:
+            return struct.pack(self._UNDO_HEADER, 0, 0, 0)
+        frameFormat = self._UNDO_FRAME.format(word)
+        writeFormat = self._UNDO_WRITE.format(word)
+        parts = [struct.pack(self._UNDO_HEADER, 1, cast(int, self._undoLog.maxlen), len(self._undoLog))]
+        for frame, writes in self._undoLog:
+            (state, operand, regIndex, ualCible, asmLine, linePointer, instructionRegister,
+                memoryAddress, op1, op2, result, operation, isZero, isPos, screenLength, messagesLength) = frame
+            parts.append(struct.pack(frameFormat, state, operand, regIndex, ualCible, asmLine,
+                linePointer, instructionRegister, memoryAddress, op1, op2, result,
+                UalComponent.OPERATIONS.index(operation), int(isZero) | int(isPos) << 1, screenLength, len(writes)))
+            for cible, index, value in writes:
+                parts.append(struct.pack(writeFormat, cible, index, value))
+        return b"".join(parts)
+
+    def restore(self, data:bytes) -> None:
+        """Restaure un état sauvegardé par snapshot.
+        Les valeurs de l'écran sont confiées directement à sa destination, sans être transmises à nouveau.
+
+        :param data: état sauvegardé
+        :type data: bytes
+        :raises: ExecutionError si l'état est illisible ou ne correspond pas au modèle de processeur
+
+        .. warning:: les sources de saisies sont restaurées avec pickle, la sauvegarde doit être de confiance.
+        """
+        dataBits = self._engine.dataBits
+        word = self._wordFormat(dataBits)
+        try:
+            offset = 0
+            header = struct.unpack_from(self._SNAPSHOT_HEADER, data, offset)
+            offset += struct.calcsize(self._SNAPSHOT_HEADER)
+            magic, version, snapshotBits, registerNumber, currentState, instructionOperand, regIndex, ualCible, asmLine = header
+            if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+                raise ExecutionError("Format de sauvegarde inconnu", {"version": version})
+            if snapshotBits != dataBits or registerNumber != self._registerNumber:
+                raise ExecutionError("La sauvegarde ne correspond pas au modèle de processeur", {"dataBits": snapshotBits, "registers": registerNumber})
+            words = struct.unpack_from("<6" + word, data, offset)
+            offset += struct.calcsize("<6" + word)
+            flags, operationIndex = struct.unpack_from("<BB", data, offset)
+            offset += 2
+            registersFormat = "<{}{}".format(registerNumber, word)
+            registers = list(struct.unpack_from(registersFormat, data, offset))
+            offset += struct.calcsize(registersFormat)
+            sequences:List[List[int]] = []
+            for itemFormat in (word, word, word):
+                sequence, offset = self._unpackSequence(data, offset, itemFormat)
+                sequences.append(sequence)
+            screenCount, readCount = struct.unpack_from("<II", data, offset)
+            offset += 8
+            for itemFormat in ("I", "I", "I"):
+                sequence, offset = self._unpackSequence(data, offset, itemFormat)
+                sequences.append(sequence)
+            undoLog, offset = self._undoRestore(data, offset, word)
+            sourcesLength, = struct.unpack_from("<I", data, offset)
+            offset += 4
+            sources = pickle.loads(data[offset:offset + sourcesLength])
+            operation = UalComponent.OPERATIONS[operationIndex]
+        except (struct.error, IndexError, pickle.UnpicklingError, EOFError) as error:
+            raise ExecutionError("Sauvegarde illisible : {}".format(error))
+        memory, inputs, screen, breakpoints, watchedMemory, watchedRegisters = sequences
+        linePointer, instructionRegister, memoryAddress, op1, op2, result = words
+
+        self._translator.clear()
+        self.memory.setContent(memory)
+        self.memory.setAddress(memoryAddress)
+        self.registers.setContent(registers)
+        self.linePointer.write(linePointer)
+        self.instructionRegister.write(instructionRegister)
+        self.ual.writeFirstOperand(op1)
+        self.ual.writeSecondOperand(op2)
+        self.ual.writeResult(result)
+        self.ual.setOperation(operation)
+        self.ual.setFlags(bool(flags & 1), bool(flags & 2))
+        self.inputBuffer.restore(inputs, readCount, sources)
+        self.screen.restore(screen, screenCount)
+        self._breakpoints = set(breakpoints)
+        self._watchedMemory = set(watchedMemory)
+        self._watchedRegisters = set(watchedRegisters)
+        self.breakReason = None
+        self._stopAddress = None
+        self._currentState = currentState
+        self._instructionOperand = instructionOperand
+        self._instructionRegister_regIndex = regIndex
+        self._ualCible = ualCible
+        self.currentAsmLine = asmLine
+        self.messages.append("Restauration d'un état sauvegardé")
+        # le retour arrière ne supprime pas les messages antérieurs à la restauration
+        if undoLog is not None:
+            messagesLength = len(self.messages)
+            for index, (frame, writes) in enumerate(undoLog):
+                undoLog[index] = (frame + (messagesLength,), writes)
+        self._undoLog = undoLog
+        self._undoWrites = None
+
+    @staticmethod
+    def _unpackSequence(data:bytes, offset:int, itemFormat:str) -> Tuple[List[int], int]:
+        """Lecture d'une suite de valeurs précédée de sa longueur
+
+        :param data: état sauvegardé
+        :type data: bytes
+        :param offset: position de la suite dans data
+        :type offset: int
+        :param itemFormat: format struct d'une valeur
+        :type itemFormat: str
+        :return: valeurs lues et position suivante
+        :rtype: Tuple[List[int], int]
+        """
+        count, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        sequenceFormat = "<{}{}".format(count, itemFormat)
+        return list(struct.unpack_from(sequenceFormat, data, offset)), offset + struct.calcsize(sequenceFormat)
+
+    def _undoRestore(self, data:bytes, offset:int, word:str) -> Tuple[Optional[Deque[Tuple[Tuple[Any, ...], List[Tuple[int, int, int]]]]], int]:
+        """Lecture des pas mémorisés sauvegardés par _undoSnapshot
+
+        :param data: état sauvegardé
+        :type data: bytes
+        :param offset: position des pas mémorisés dans data
+        :type offset: int
+        :param word: format struct d'un mot
+        :type word: str
+        :return: pas mémorisés, sans la longueur des messages, None si le mode réversible est inactif, et position suivante
+        :rtype: Tuple[Optional[Deque], int]
+        """
+        enabled, depth, count = struct.unpack_from(self._UNDO_HEADER, data, offset)
+        offset += struct.calcsize(self._UNDO_HEADER)
+        if not enabled:
+            return None, offset
+        frameFormat = self._UNDO_FRAME.format(word)
+        writeFormat = self._UNDO_WRITE.format(word)
+        undoLog:Deque[Tuple[Tuple[Any, ...], List[Tuple[int, int, int]]]] = deque(maxlen=depth)
+        for _ in range(count):
+            (state, operand, regIndex, ualCible, asmLine, linePointer, instructionRegister,
+                memoryAddress, op1, op2, result, operationIndex, flags, screenLength, writesCount) = struct.unpack_from(frameFormat, data, offset)
+            offset += struct.calcsize(frameFormat)
+            writes:List[Tuple[int, int, int]] = []
+            for _ in range(writesCount):
+                writes.append(cast(Tuple[int, int, int], struct.unpack_from(writeFormat, data, offset)))
+                offset += struct.calcsize(writeFormat)
+            frame = (state, operand, regIndex, ualCible, asmLine, linePointer, instructionRegister,
+                memoryAddress, op1, op2, result, UalComponent.OPERATIONS[operationIndex], bool(flags & 1), bool(flags & 2), screenLength)
+            undoLog.append((frame, writes))
+        return undoLog, offset
+
+    @classmethod
+    def fromSnapshot(cls, engine:ProcessorEngine, data:bytes) -> "Executeur":
+        """Crée un exécuteur dans un état sauvegardé
+
+        :param engine: modèle de processeur
+        :type engine: ProcessorEngine
+        :param data: état sauvegardé par snapshot
+        :type data: bytes
+        :return: nouvel exécuteur
+        :rtype: Executeur
+        """
+        executeur = cls(engine, [])
+        executeur.restore(data)
+        return executeur
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Sérialisation pour pickle : modèle de processeur et état sauvegardé.
+        Les événements liés aux composants ne sont pas conservés.
+        """
+        return {"engine": self._engine, "snapshot": self.snapshot()}
+
+    def __setstate__(self, state:Dict[str, Any]) -> None:
+        """Désérialisation pour pickle
+        """
+        self.__init__(state["engine"], [])
+        self.restore(state["snapshot"])
+
     def __str__(self) -> str :
         return f'ligne = {self.linePointer.read()}'
 
@@ -0,0 +1,406 @@
+"""
+.. module:: modules.exec.processexecuteur
+:synopsis: exécution dans un processus séparé. L'exécuteur tourne dans un processus fils
+    qui publie registres, mémoire et compteurs dans un bloc multiprocessing.shared_memory,
+    vu comme un tableau plat d'entiers 64 bits. L'interface graphique lit ce bloc au rythme
+    des images sans ralentir la simulation ; un tube transmet les commandes
+    (pas, exécution, pause, saisies) et renvoie les valeurs affichées.
+
+    Disposition du bloc partagé : en-tête de HEADER_SIZE entiers, puis les registres,
+    puis la mémoire, limitée à memoryCapacity mots.
+
+.. note:: l'en-tête commence par un numéro de séquence, impair pendant une publication :
+    un lecteur recommence sa lecture si le numéro était impair ou a changé entre temps.
+"""
+
+from typing import List, Optional, Iterable, Any
+from multiprocessing import shared_memory
+from array import array
+from multiprocessing.connection import Connection
+import multiprocessing
+import time
+
+from modules.errors import ExecutionError
+from modules.exec.executeur import Executeur
+from modules.exec.components import CallbackSink
+
+class StateView:
+    """Copie cohérente de l'état publié par le processus d'exécution
+    """
+    state:int
+    running:bool
+    linePointer:int
+    currentAsmLine:int
+    isZero:bool
+    isPos:bool
+    steps:int
+    outputsCount:int
+    inputsRead:int
+    registers:List[int]
+    memory:List[int]
+
+    def __init__(self, header:List[int], registers:List[int], memory:List[int]):
+        """Constructeur
+
+        :param header: en-tête du bloc partagé
+        :type header: List[int]
+        :param registers: valeurs des registres
+        :type registers: List[int]
+        :param memory: contenu de la mémoire
+        :type memory: List[int]
+        """
+        (_, self.state, running, self.linePointer, self.currentAsmLine, isZero, isPos,
+            self.steps, self.outputsCount, self.inputsRead, _, _) = header
+        self.running = running != 0
+        self.isZero = isZero != 0
+        self.isPos = isPos != 0
+        self.registers = registers
+        self.memory = memory
+
+class ProcessExecuteur:
+    """Pilotage d'un exécuteur tournant dans un processus séparé.
+
+    L'exécuteur transmis est copié dans le processus fils, à partir de son état sauvegardé.
+    En exécution continue, le fils exécute des tranches de RUN_SLICE instructions par blocs
+    traduits et publie l'état entre deux tranches ; il traite alors les commandes reçues.
+
+    :Example:
+
+    >>> from modules.engine.processor16bits import Processor16Bits
+    >>> # INPUT @4 ; LOAD r0, @4 ; PRINT r0 ; HALT
+    >>> binary = ["0010100000000100", "0011000000000100", "0010000000000000", "0000000000000000", "0000000000000000"]
+    >>> with ProcessExecuteur(Executeur(Processor16Bits(), binary)) as remote:
+    ...     remote.bufferize(42)
+    ...     remote.run()
+    ...     remote.wait()
+    ...     remote.readOutputs()
+    -1
+    [42]
+
+    .. warning:: les points d'arrêt, le profilage et le mode réversible de l'exécuteur
+      ne sont pas transmis au processus fils.
+    """
+    HEADER_SIZE:int = 12
+    RUN_SLICE:int = 20000
+    PUBLISH_INTERVAL:float = 0.005     # durée minimale entre deux publications, en secondes
+    # indices de l'en-tête
+    _SEQUENCE:int = 0
+    _STATE:int = 1
+    _RUNNING:int = 2
+    _LINE_POINTER:int = 3
+    _ASM_LINE:int = 4
+    _IS_ZERO:int = 5
+    _IS_POS:int = 6
+    _STEPS:int = 7
+    _OUTPUTS:int = 8
+    _INPUTS:int = 9
+    _REGISTERS:int = 10
+    _MEMORY_SIZE:int = 11
+
+    _sharedMemory:shared_memory.SharedMemory
+    _view:Any
+    _connection:Connection
+    _process:multiprocessing.Process
+    _registersNumber:int
+    _memoryCapacity:int
+    _outputs:List[int]
+    _lastState:int
+    _busy:bool
+    _snapshot:Optional[bytes]
+
+    def __init__(self, executeur:Executeur, memoryCapacity:int = 0):
+        """Constructeur : démarre le processus fils
+
+        :param executeur: exécuteur dont l'état est repris par le processus fils
+        :type executeur: Executeur
+        :param memoryCapacity: nombre de mots de mémoire publiés, 2**dataBits si 0
+        :type memoryCapacity: int
+        """
+        dataBits = executeur.engine.dataBits
+        self._registersNumber = executeur.engine.registersNumber()
+        self._memoryCapacity = memoryCapacity if memoryCapacity > 0 else 2**dataBits
+        size = 8 * (self.HEADER_SIZE + self._registersNumber + self._memoryCapacity)
+        self._sharedMemory = shared_memory.SharedMemory(create=True, size=size)
+        self._view = self._sharedMemory.buf.cast("q")
+        self._outputs = []
+        self._lastState = executeur.currentState
+        self._busy = False
+        self._snapshot = None
+        self._connection, childConnection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(executeur, self._sharedMemory.name, self._memoryCapacity, childConnection),
+            daemon=True
+        )
+        self._process.start()
+        childConnection.close()
+
+    def __enter__(self) -> "ProcessExecuteur":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _send(self, *command:Any) -> None:
+        """
+        :param command: nom de la commande et paramètres
+        :type command: Tuple[Any, ...]
+        :raises: ExecutionError si le processus fils est arrêté
+        """
+        if not self._process.is_alive():
+            raise ExecutionError("Le processus d'exécution est arrêté")
+        self._connection.send(command)
+
+    def step(self, count:int = 1) -> None:
+        """Demande l'exécution de pas élémentaires
+
+        :param count: nombre de pas
+        :type count: int
+        """
+        self._send("step", count)
+        self._busy = True
+
+    def run(self) -> None:
+        """Demande l'exécution continue, jusqu'à l'arrêt, une attente de saisie ou une pause
+        """
+        self._send("run")
+        self._busy = True
+
+    def pause(self) -> None:
+        """Interrompt l'exécution continue à la fin de la tranche en cours
+        """
+        self._send("pause")
+
+    def bufferize(self, value:int) -> None:
+        """Ajoute un entier au buffer d'entrée du processus fils
+
+        :param value: valeur à bufferiser
+        :type value: int
+        """
+        self._send("bufferize", [value])
+
+    def bufferizeMany(self, values:Iterable[int]) -> None:
+        """Ajoute des entiers au buffer d'entrée du processus fils
+
+        :param values: valeurs à bufferiser
+        :type values: Iterable[int]
+        """
+        self._send("bufferize", list(values))
+
+    def _receive(self) -> None:
+        """Traite les messages reçus du processus fils, sans attendre
+        """
+        while self._connection.poll():
+            message = self._connection.recv()
+            if message[0] == "outputs":
+                self._outputs.extend(message[1])
+            elif message[0] == "stopped":
+                self._lastState = message[1]
+                self._busy = False
+            elif message[0] == "snapshot":
+                self._snapshot = message[1]
+
+    def readOutputs(self) -> List[int]:
+        """
+        :return: valeurs affichées depuis la dernière lecture
+        :rtype: List[int]
+        """
+        self._receive()
+        outputs = self._outputs
+        self._outputs = []
+        return outputs
+
+    def read(self) -> StateView:
+        """Lecture cohérente de l'état publié
+
+        :return: copie de l'état
+        :rtype: StateView
+        """
+        view = self._view
+        size = self.HEADER_SIZE
+        while True:
+            sequence = view[self._SEQUENCE]
+            if sequence % 2 == 1:
+                time.sleep(0)
+                continue
+            header = list(view[0:size])
+            registersNumber = header[self._REGISTERS]
+            registers = list(view[size:size + registersNumber])
+            memoryStart = size + self._registersNumber
+            memory = list(view[memoryStart:memoryStart + header[self._MEMORY_SIZE]])
+            if view[self._SEQUENCE] == sequence:
+                return StateView(header, registers, memory)
+
+    @property
+    def running(self) -> bool:
+        """Accesseur
+
+        :return: une exécution continue ou des pas demandés sont en cours
+        :rtype: bool
+        """
+        self._receive()
+        return self._busy
+
+    @property
+    def lastState(self) -> int:
+        """Accesseur
+
+        :return: état à la fin de la dernière exécution, voir Executeur.step
+        :rtype: int
+        """
+        self._receive()
+        return self._lastState
+
+    def wait(self, timeout:float = 0) -> int:
+        """Attend la fin de l'exécution en cours
+
+        :param timeout: durée maximale d'attente en secondes, 0 si illimitée
+        :type timeout: float
+        :return: état à la fin de l'exécution, voir Executeur.step
+        :rtype: int
+        :raises: ExecutionError si le processus fils est arrêté ou si la durée est dépassée
+        """
+        deadline = time.perf_counter() + timeout
+        self._receive()
+        while self._busy:
+            if not self._connection.poll(0.01) and not self._process.is_alive():
+                raise ExecutionError("Le processus d'exécution est arrêté")
+            self._receive()
+            if timeout > 0 and time.perf_counter() > deadline:
+                raise ExecutionError("Délai d'attente dépassé")
+        return self._lastState
+
+    def snapshot(self) -> bytes:
+        """Met en pause et récupère l'état complet du processus fils,
+        pour le restaurer dans un exécuteur local
+
+        :return: état sauvegardé, voir Executeur.snapshot
+        :rtype: bytes
+        """
+        self.pause()
+        self.wait()
+        self._snapshot = None
+        self._send("snapshot")
+        while self._snapshot is None:
+            if not self._connection.poll(1):
+                if not self._process.is_alive():
+                    raise ExecutionError("Le processus d'exécution est arrêté")
+                continue
+            self._receive()
+        return self._snapshot
+
+    def close(self) -> None:
+        """Arrête le processus fils et libère le bloc partagé
+        """
+        if self._process.is_alive():
+            self._connection.send(("stop",))
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        self._connection.close()
+        self._view.release()
+        self._sharedMemory.close()
+        self._sharedMemory.unlink()
+
+def _publish(executeur:Executeur, view:Any, memoryCapacity:int, running:bool, steps:int) -> None:
+    """Publie l'état de l'exécuteur dans le bloc partagé
+
+    :param executeur: exécuteur du processus fils
+    :type executeur: Executeur
+    :param view: bloc partagé, vu comme un tableau d'entiers 64 bits
+    :type view: memoryview
+    :param memoryCapacity: nombre de mots de mémoire publiés au plus
+    :type memoryCapacity: int
+    :param running: une exécution est en cours
+    :type running: bool
+    :param steps: nombre de pas élémentaires exécutés un par un (commande step)
+    :type steps: int
+    """
+    P = ProcessExecuteur
+    registers = [item.intValue for item in executeur.registers.content]
+    memory = [item.intValue for item in executeur.memory.content[:memoryCapacity]]
+    view[P._SEQUENCE] += 1
+    view[P._STATE] = executeur.currentState
+    view[P._RUNNING] = int(running)
+    view[P._LINE_POINTER] = executeur.linePointer.intValue
+    view[P._ASM_LINE] = executeur.currentAsmLine
+    view[P._IS_ZERO] = int(executeur.ual.isZero)
+    view[P._IS_POS] = int(executeur.ual.isPos)
+    view[P._STEPS] = steps
+    view[P._OUTPUTS] = executeur.screen.count
+    view[P._INPUTS] = executeur.inputBuffer.readCount
+    view[P._REGISTERS] = len(registers)
+    view[P._MEMORY_SIZE] = len(memory)
+    start = P.HEADER_SIZE
+    view[start:start + len(registers)] = array("q", registers)
+    start += len(registers)
+    view[start:start + len(memory)] = array("q", memory)
+    view[P._SEQUENCE] += 1
+
+def _serve(executeur:Executeur, sharedMemoryName:str, memoryCapacity:int, connection:Connection) -> None:
+    """Boucle du processus fils : exécute les commandes et publie l'état
+
+    :param executeur: exécuteur, copié dans le processus fils
+    :type executeur: Executeur
+    :param sharedMemoryName: nom du bloc partagé
+    :type sharedMemoryName: str
+    :param memoryCapacity: nombre de mots de mémoire publiés au plus
+    :type memoryCapacity: int
+    :param connection: extrémité du tube de commandes
+    :type connection: Connection
+    """
+    sharedMemory = shared_memory.SharedMemory(name=sharedMemoryName)
+    view = sharedMemory.buf.cast("q")
+    outputs:List[int] = []
+    executeur.screen.setSink(CallbackSink(lambda value: outputs.append(value.intValue)))
+    steps = 0
+    running = False
+    pendingSteps = 0
+    state = executeur.currentState
+    _publish(executeur, view, memoryCapacity, False, steps)
+    published = time.perf_counter()
+    try:
+        while True:
+            busy = running or pendingSteps > 0
+            if not busy or connection.poll():
+                command = connection.recv()
+                name = command[0]
+                if name == "stop":
+                    break
+                if name == "step":
+                    pendingSteps += command[1]
+                elif name == "run":
+                    running = True
+                elif name == "pause":
+                    running = False
+                    pendingSteps = 0
+                    if busy:
+                        _publish(executeur, view, memoryCapacity, False, steps)
+                        connection.send(("stopped", state))
+                elif name == "bufferize":
+                    executeur.bufferizeMany(command[1])
+                elif name == "snapshot":
+                    connection.send(("snapshot", executeur.snapshot()))
+                continue
+            if running:
+                state = executeur.translatedRun(ProcessExecuteur.RUN_SLICE)
+                running = state >= 0
+            else:
+                state = executeur.step()
+                steps += 1
+                pendingSteps = pendingSteps - 1 if state >= 0 else 0
+            if len(outputs) > 0:
+                connection.send(("outputs", list(outputs)))
+                outputs.clear()
+            stopped = not running and pendingSteps == 0
+            now = time.perf_counter()
+            if stopped or now - published >= ProcessExecuteur.PUBLISH_INTERVAL:
+                _publish(executeur, view, memoryCapacity, not stopped, steps)
+                published = now
+            if stopped:
+                connection.send(("stopped", state))
+    finally:
+        view.release()
+        sharedMemory.close()
+        connection.close()
@@ -0,0 +1,186 @@
+"""
+.. module:: modules.exec.profiler
+:synopsis: comptage des exécutions et des cycles (pas élémentaires) par adresse,
+    regroupés par ligne du programme d'origine grâce à la correspondance
+    produite par ProcessorEngine.getAddressMap.
+    Exports : rapport texte trié, format « collapsed stacks » lu par les outils
+    de flamegraph, listing du source annoté.
+"""
+
+from typing import List, Dict, Tuple, Optional
+
+from modules.engine.addressmap import AddressMap
+
+class Profiler:
+    """Compteurs d'un profilage.
+
+    :Example:
+
+    >>> profiler = Profiler(AddressMap.fromLineNumbers([1, 1, 2, 0]))
+    >>> for address, cycles in ((0, 3), (1, 5), (2, 4), (1, 5), (2, 4), (3, 3)):
+    ...     profiler.countExecution(address)
+    ...     for _ in range(cycles):
+    ...         profiler.countCycle(address)
+    >>> profiler.totalCycles
+    24
+    >>> profiler.byLine()[1]
+    (3, 13)
+    >>> print(profiler.annotate("x = 1\\ny = x"))
+           13  54.2% | x = 1
+            8  33.3% | y = x
+    """
+    _executions:List[int]
+    _cycles:List[int]
+    _addressMap:Optional[AddressMap]
+
+    def __init__(self, addressMap:Optional[AddressMap] = None):
+        """Constructeur
+
+        :param addressMap: correspondance entre adresses et lignes, voir ProcessorEngine.getAddressMap
+        :type addressMap: Optional[AddressMap]
+        """
+        self._executions = []
+        self._cycles = []
+        self._addressMap = addressMap
+
+    def _reserve(self, address:int) -> None:
+        """Complète les compteurs pour que l'adresse soit définie
+
+        :param address: adresse à atteindre
+        :type address: int
+        """
+        missing = address + 1 - len(self._cycles)
+        if missing > 0:
+            self._executions.extend([0] * missing)
+            self._cycles.extend([0] * missing)
+
+    def countExecution(self, address:int) -> None:
+        """Compte le début de l'exécution d'une instruction
+
+        :param address: adresse de l'instruction
+        :type address: int
+        """
+        if address >= len(self._executions):
+            self._reserve(address)
+        self._executions[address] += 1
+
+    def countCycle(self, address:int) -> None:
+        """Compte un pas élémentaire de l'exécution d'une instruction
+
+        :param address: adresse de l'instruction
+        :type address: int
+        """
+        if address >= len(self._cycles):
+            self._reserve(address)
+        self._cycles[address] += 1
+
+    def clear(self) -> None:
+        """Remet les compteurs à zéro
+        """
+        self._executions = []
+        self._cycles = []
+
+    @property
+    def totalCycles(self) -> int:
+        """Accesseur
+
+        :return: nombre total de pas élémentaires comptés
+        :rtype: int
+        """
+        return sum(self._cycles)
+
+    def byAddress(self) -> Dict[int, Tuple[int, int]]:
+        """
+        :return: pour chaque adresse exécutée, nombre d'exécutions et nombre de cycles
+        :rtype: Dict[int, Tuple[int, int]]
+        """
+        return {
+            address: (executions, self._cycles[address])
+            for address, executions in enumerate(self._executions)
+            if executions > 0 or self._cycles[address] > 0
+        }
+
+    def lineOf(self, address:int) -> Optional[int]:
+        """
+        :param address: adresse d'une instruction
+        :type address: int
+        :return: numéro de ligne dans le programme d'origine, None s'il est inconnu
+        :rtype: Optional[int]
+        """
+        if self._addressMap is None:
+            return None
+        return self._addressMap.lineOf(address)
+
+    def byLine(self) -> Dict[Optional[int], Tuple[int, int]]:
+        """
+        :return: pour chaque ligne du programme d'origine, nombre d'instructions exécutées et nombre de cycles.
+          Les adresses dont la ligne est inconnue sont regroupées sous None.
+        :rtype: Dict[Optional[int], Tuple[int, int]]
+        """
+        lines:Dict[Optional[int], Tuple[int, int]] = {}
+        for address, (executions, cycles) in self.byAddress().items():
+            lineNumber = self.lineOf(address)
+            previousExecutions, previousCycles = lines.get(lineNumber, (0, 0))
+            lines[lineNumber] = (previousExecutions + executions, previousCycles + cycles)
+        return lines
+
+    def report(self, top:int = 0) -> str:
+        """Rapport texte, lignes triées par nombre de cycles décroissant
+
+        :param top: nombre de lignes du rapport, 0 pour toutes
+        :type top: int
+        :return: rapport
+        :rtype: str
+        """
+        total = max(self.totalCycles, 1)
+        items = sorted(self.byLine().items(), key=lambda item: (-item[1][1], -1 if item[0] is None else item[0]))
+        if top > 0:
+            items = items[:top]
+        lines = ["{:>6} {:>10} {:>6} {:>12}".format("ligne", "cycles", "%", "instructions")]
+        for lineNumber, (executions, cycles) in items:
+            strLine = "?" if lineNumber is None else str(lineNumber)
+            lines.append("{:>6} {:>10} {:>5.1f}% {:>12}".format(strLine, cycles, 100 * cycles / total, executions))
+        return "\n".join(lines)
+
+    def collapsedStacks(self, source:str = "") -> str:
+        """Export au format « collapsed stacks » : une pile par adresse,
+        programme;ligne;adresse suivi du nombre de cycles
+
+        :param source: programme d'origine, pour nommer les lignes
+        :type source: str
+        :return: contenu du fichier
+        :rtype: str
+        """
+        sourceLines = source.split("\n")
+        stacks:List[str] = []
+        for address, (executions, cycles) in sorted(self.byAddress().items()):
+            if cycles == 0:
+                continue
+            lineNumber = self.lineOf(address)
+            if lineNumber is None:
+                frame = "ligne ?"
+            elif 0 < lineNumber <= len(sourceLines) and sourceLines[lineNumber-1].strip() != "":
+                frame = "ligne {} : {}".format(lineNumber, sourceLines[lineNumber-1].strip().replace(";", ","))
+            else:
+                frame = "ligne {}".format(lineNumber)
+            stacks.append("programme;{};@{} {}".format(frame, address, cycles))
+        return "\n".join(stacks)
+
+    def annotate(self, source:str) -> str:
+        """Listing du programme d'origine, chaque ligne précédée de ses cycles
+
+        :param source: programme d'origine
+        :type source: str
+        :return: listing annoté
+        :rtype: str
+        """
+        total = max(self.totalCycles, 1)
+        lines = self.byLine()
+        annotated:List[str] = []
+        for index, line in enumerate(source.split("\n")):
+            executions, cycles = lines.get(index + 1, (0, 0))
+            if cycles > 0:
+                annotated.append("{:>9} {:>5.1f}% | {}".format(cycles, 100 * cycles / total, line))
+            else:
+                annotated.append("{:>16} | {}".format("", line))
+        return "\n".join(annotated)
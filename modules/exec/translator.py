@@ -0,0 +1,506 @@
+"""
+.. module:: modules.exec.translator
+:synopsis: traduction dynamique du code binaire en fonctions Python.
+    Le programme est découpé en blocs de base : suites d'instructions qui s'achèvent
+    sur un saut, un saut conditionnel, une saisie ou un arrêt. Chaque bloc est traduit
+    en une fonction Python compilée par compile/exec, dans laquelle les registres sont
+    des variables locales et la mémoire une liste d'entiers.
+
+.. note:: les blocs traduits sont conservés en cache. Une écriture en mémoire (STORE, INPUT
+    ou écriture extérieure) dans la plage d'un bloc invalide ce bloc.
+
+.. note:: les points d'arrêt et les surveillances sont pris en compte à la traduction :
+    un bloc s'achève avant une adresse d'arrêt et juste après l'écriture d'une case surveillée.
+    Sans point d'arrêt ni surveillance, la boucle d'exécution ne fait aucun test supplémentaire.
+"""
+
+from typing import List, Dict, Set, Tuple, Callable, Optional, Union
+
+from modules.engine.processorengine import ProcessorEngine
+from modules.engine.decode import ArgsType
+from modules.primitives.operators import Operator, Operators
+
+InputReader = Callable[[], Optional[int]]
+BlockFunction = Callable[[List[int], List[int], List[bool], InputReader, List[int]], Tuple[int, int]]
+BlockExit = Tuple[str, int, int]
+
+class TranslatedBlock:
+    """Bloc de base traduit en fonction Python.
+
+    La fonction reçoit les registres, la mémoire, les indicateurs de l'UAL (nul, positif),
+    la lecture du buffer d'entrée et la liste des affichages. Elle renvoie l'adresse de la prochaine
+    instruction et l'état du processeur.
+    """
+    _start:int
+    _end:int
+    _function:BlockFunction
+    _writes:Tuple[int,...]
+    _inputAddress:Optional[int]
+    _source:str
+    _watch:bool
+
+    def __init__(self, start:int, end:int, function:BlockFunction, writes:Tuple[int,...], inputAddress:Optional[int], source:str, watch:bool = False):
+        """Constructeur
+
+        :param start: adresse de la première instruction
+        :type start: int
+        :param end: adresse suivant la dernière instruction
+        :type end: int
+        :param function: fonction exécutant le bloc
+        :type function: BlockFunction
+        :param writes: adresses mémoire écrites par le bloc
+        :type writes: Tuple[int,...]
+        :param inputAddress: adresse écrite par la saisie terminant le bloc, None si pas de saisie
+        :type inputAddress: Optional[int]
+        :param source: code Python du bloc
+        :type source: str
+        :param watch: le bloc s'achève sur l'écriture d'une case surveillée
+        :type watch: bool
+        """
+        self._start = start
+        self._end = end
+        self._function = function
+        self._writes = writes
+        self._inputAddress = inputAddress
+        self._source = source
+        self._watch = watch
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        return self._end
+
+    @property
+    def size(self) -> int:
+        """Accesseur
+
+        :return: nombre d'instructions du bloc
+        :rtype: int
+        """
+        return self._end - self._start
+
+    @property
+    def function(self) -> BlockFunction:
+        return self._function
+
+    @property
+    def writes(self) -> Tuple[int,...]:
+        return self._writes
+
+    @property
+    def inputAddress(self) -> Optional[int]:
+        return self._inputAddress
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def watch(self) -> bool:
+        return self._watch
+
+    def __str__(self) -> str:
+        return self._source
+
+class BlockTranslator:
+    """Traducteur du code binaire d'un modèle de processeur en blocs Python.
+
+    :Example:
+
+    >>> from modules.engine.processor16bits import Processor16Bits
+    >>> translator = BlockTranslator(Processor16Bits())
+    >>> memory = [int("0100111100000101", 2), int("0010000000000111", 2), 0]
+    >>> outputs:List[int] = []
+    >>> translator.run(0, [0]*8, memory, [True, True], [], outputs)[:2]
+    (3, -1)
+    >>> outputs
+    [5]
+    """
+    CONTINUE:int = 0
+    HALT:int = -1
+    WAITING_INPUT:int = -2
+    MAX_BLOCK_SIZE:int = 256
+
+    _CONDITIONS:Dict[Operator, str] = {
+        Operators.EQ:      "z",
+        Operators.NOTEQ:   "not z",
+        Operators.INF:     "not (p or z)",
+        Operators.SUP:     "p and not z",
+        Operators.SUPOREQ: "p",
+        Operators.INFOREQ: "z or not p"
+    }
+
+    _BINARY:Dict[Operator, str] = {
+        Operators.ADD:   "({a} + {b}) & {M}",
+        Operators.MINUS: "({a} - {b}) & {M}",
+        Operators.MULT:  "({a} * {b}) & {M}",
+        Operators.DIV:   "((({a} ^ {N}) - {N}) // (({b} ^ {N}) - {N})) & {M}",
+        Operators.MOD:   "((({a} ^ {N}) - {N}) % (({b} ^ {N}) - {N})) & {M}",
+        Operators.AND:   "{a} & {b}",
+        Operators.OR:    "{a} | {b}",
+        Operators.XOR:   "{a} ^ {b}"
+    }
+
+    _UNARY:Dict[Operator, str] = {
+        Operators.NEG:     "(-{a}) & {M}",
+        Operators.INVERSE: "(~{a}) & {M}"
+    }
+
+    _engine:ProcessorEngine
+    _mask:int
+    _signBit:int
+    _blocks:Dict[int, TranslatedBlock]
+    _owners:Dict[int, Set[int]]
+    _breakpoints:Set[int]
+    _watchedMemory:Set[int]
+    _watchedRegisters:Set[int]
+
+    def __init__(self, engine:ProcessorEngine):
+        """Constructeur
+
+        :param engine: modèle de processeur
+        :type engine: ProcessorEngine
+        """
+        self._engine = engine
+        self._mask = 2**engine.dataBits - 1
+        self._signBit = 2**(engine.dataBits - 1)
+        self._blocks = {}
+        self._owners = {}
+        self._breakpoints = set()
+        self._watchedMemory = set()
+        self._watchedRegisters = set()
+
+    @property
+    def blocksCount(self) -> int:
+        """Accesseur
+
+        :return: nombre de blocs traduits en cache
+        :rtype: int
+        """
+        return len(self._blocks)
+
+    def getBlock(self, address:int, memory:List[int]) -> TranslatedBlock:
+        """Renvoie le bloc commençant à l'adresse donnée, en le traduisant au besoin
+
+        :param address: adresse de la première instruction du bloc
+        :type address: int
+        :param memory: contenu de la mémoire
+        :type memory: List[int]
+        :return: bloc traduit
+        :rtype: TranslatedBlock
+        """
+        block = self._blocks.get(address)
+        if block is None:
+            block = self._translate(address, memory)
+            self._blocks[address] = block
+            for item in range(block.start, block.end):
+                self._owners.setdefault(item, set()).add(address)
+        return block
+
+    def invalidate(self, address:int) -> None:
+        """Supprime du cache les blocs dont la plage contient l'adresse
+
+        :param address: adresse mémoire modifiée
+        :type address: int
+        """
+        starts = self._owners.pop(address, None)
+        if starts is None:
+            return
+        for start in starts:
+            block = self._blocks.pop(start, None)
+            if block is None:
+                continue
+            for item in range(block.start, block.end):
+                owners = self._owners.get(item)
+                if owners is None:
+                    continue
+                owners.discard(start)
+                if len(owners) == 0:
+                    del self._owners[item]
+
+    def clear(self) -> None:
+        """Vide le cache
+        """
+        self._blocks = {}
+        self._owners = {}
+
+    def setStops(self, breakpoints:Set[int], watchedMemory:Set[int], watchedRegisters:Set[int]) -> None:
+        """Fixe les points d'arrêt et les surveillances. Le cache est vidé s'ils ont changé,
+        les blocs déjà traduits pouvant couvrir un nouveau point d'arrêt.
+
+        :param breakpoints: adresses des instructions avant lesquelles l'exécution s'arrête
+        :type breakpoints: Set[int]
+        :param watchedMemory: adresses mémoire surveillées
+        :type watchedMemory: Set[int]
+        :param watchedRegisters: indices des registres surveillés
+        :type watchedRegisters: Set[int]
+        """
+        if (breakpoints, watchedMemory, watchedRegisters) == (self._breakpoints, self._watchedMemory, self._watchedRegisters):
+            return
+        self._breakpoints = set(breakpoints)
+        self._watchedMemory = set(watchedMemory)
+        self._watchedRegisters = set(watchedRegisters)
+        self.clear()
+
+    def run(self, address:int, registers:List[int], memory:List[int], flags:List[bool], inputs:InputReader, outputs:List[int], budget:int = 0) -> Tuple[int, int, TranslatedBlock]:
+        """Exécute les blocs à la suite jusqu'à un arrêt ou une attente de saisie
+
+        :param address: adresse de départ
+        :type address: int
+        :param registers: valeurs des registres, modifiées sur place
+        :type registers: List[int]
+        :param memory: contenu de la mémoire, modifié sur place
+        :type memory: List[int]
+        :param flags: indicateurs de l'UAL, résultat nul et résultat positif, modifiés sur place
+        :type flags: List[bool]
+        :param inputs: lecture du buffer d'entrée, renvoyant None s'il est vide
+        :type inputs: InputReader
+        :param outputs: liste recevant les valeurs affichées
+        :type outputs: List[int]
+        :param budget: nombre d'instructions au-delà duquel l'exécution rend la main en fin de bloc, 0 si illimité
+        :type budget: int
+        :return: adresse suivante, état (HALT, WAITING_INPUT, ou CONTINUE si arrêt sur un point d'arrêt,
+            une surveillance ou par épuisement du budget), dernier bloc exécuté
+        :rtype: Tuple[int, int, TranslatedBlock]
+
+        .. note:: l'instruction de départ n'est pas testée comme point d'arrêt,
+            ce qui permet de reprendre l'exécution après un arrêt.
+        """
+        if budget > 0 or len(self._breakpoints) > 0 or len(self._watchedMemory) > 0 or len(self._watchedRegisters) > 0:
+            return self._checkedRun(address, registers, memory, flags, inputs, outputs, budget)
+        blocks = self._blocks
+        owners = self._owners
+        while True:
+            block = blocks.get(address)
+            if block is None:
+                block = self.getBlock(address, memory)
+            address, state = block.function(registers, memory, flags, inputs, outputs)
+            for written in block.writes:
+                if written in owners:
+                    self.invalidate(written)
+            if state != self.CONTINUE:
+                return address, state, block
+
+    def _watchedValues(self, registers:List[int], memory:List[int]) -> List[int]:
+        """
+        :param registers: valeurs des registres
+        :type registers: List[int]
+        :param memory: contenu de la mémoire
+        :type memory: List[int]
+        :return: valeurs des registres puis des cases mémoire surveillés
+        :rtype: List[int]
+        """
+        values = [registers[index] for index in sorted(self._watchedRegisters)]
+        values.extend([memory[index] if index < len(memory) else 0 for index in sorted(self._watchedMemory)])
+        return values
+
+    def _checkedRun(self, address:int, registers:List[int], memory:List[int], flags:List[bool], inputs:InputReader, outputs:List[int], budget:int) -> Tuple[int, int, TranslatedBlock]:
+        """Version de run testant le budget et les points d'arrêt entre deux blocs,
+        et les surveillances après les blocs qui écrivent une case surveillée.
+        Mêmes paramètres et même valeur de retour que run.
+        """
+        blocks = self._blocks
+        owners = self._owners
+        breakpoints = self._breakpoints
+        watched = self._watchedValues(registers, memory)
+        while True:
+            block = blocks.get(address)
+            if block is None:
+                block = self.getBlock(address, memory)
+            address, state = block.function(registers, memory, flags, inputs, outputs)
+            for written in block.writes:
+                if written in owners:
+                    self.invalidate(written)
+            if state != self.CONTINUE:
+                return address, state, block
+            if block.watch:
+                values = self._watchedValues(registers, memory)
+                if values != watched:
+                    return address, state, block
+            if address in breakpoints:
+                return address, state, block
+            if budget > 0:
+                budget -= block.size
+                if budget <= 0:
+                    return address, state, block
+
+    def _translate(self, start:int, memory:List[int]) -> TranslatedBlock:
+        """Traduit le bloc commençant à l'adresse donnée
+
+        :param start: adresse de la première instruction
+        :type start: int
+        :param memory: contenu de la mémoire, complété au besoin pour couvrir les adresses utilisées
+        :type memory: List[int]
+        :return: bloc traduit
+        :rtype: TranslatedBlock
+        """
+        body:List[Union[str, BlockExit]] = []
+        usedRegisters:Set[int] = set()
+        writtenRegisters:Set[int] = set()
+        writes:List[int] = []
+        readFlags = False
+        writtenFlags = False
+        inputAddress:Optional[int] = None
+        watch = False
+        limit = start + self.MAX_BLOCK_SIZE
+        M = self._mask
+        N = self._signBit
+        address = start
+        while True:
+            word = memory[address] if address < len(memory) else 0
+            decoded = self._engine.instructionDecode(word)
+            operator = decoded["operator"]
+            opRegisters = [value for argType, value in decoded["args"] if argType == ArgsType.REGISTRE]
+            opSpecial = [value for argType, value in decoded["args"] if argType != ArgsType.REGISTRE]
+            suivant = address + 1
+            end = suivant
+            exitIndex = len(body)
+
+            if operator == Operators.HALT:
+                body.append(("", suivant, self.HALT))
+                break
+
+            if operator == Operators.GOTO:
+                body.append(("", opSpecial[0], self.CONTINUE))
+                break
+
+            if operator.isComparaison:
+                if not writtenFlags:
+                    readFlags = True
+                body.append((self._CONDITIONS[operator], opSpecial[0], self.CONTINUE))
+                body.append(("", suivant, self.CONTINUE))
+                break
+
+            if operator == Operators.INPUT:
+                inputAddress = opSpecial[0]
+                watch = inputAddress in self._watchedMemory
+                self._reserve(memory, inputAddress)
+                writes.append(inputAddress)
+                body.append("v = inp()")
+                body.append(("v is None", suivant, self.WAITING_INPUT))
+                body.append("m[{}] = v".format(inputAddress))
+                body.append(("", suivant, self.CONTINUE))
+                break
+
+            if operator == Operators.PRINT:
+                usedRegisters.add(opRegisters[0])
+                body.append("out.append(r{})".format(opRegisters[0]))
+
+            elif operator == Operators.MOVE:
+                usedRegisters.update(opRegisters)
+                writtenRegisters.add(opRegisters[0])
+                if len(opRegisters) == 1:
+                    body.append("r{} = {}".format(opRegisters[0], opSpecial[0] & M))
+                else:
+                    body.append("r{} = r{}".format(opRegisters[0], opRegisters[1]))
+
+            elif operator == Operators.LOAD:
+                self._reserve(memory, opSpecial[0])
+                usedRegisters.add(opRegisters[0])
+                writtenRegisters.add(opRegisters[0])
+                body.append("r{} = m[{}]".format(opRegisters[0], opSpecial[0]))
+
+            elif operator == Operators.STORE:
+                cible = opSpecial[0]
+                self._reserve(memory, cible)
+                usedRegisters.add(opRegisters[0])
+                writes.append(cible)
+                body.append("m[{}] = r{}".format(cible, opRegisters[0]))
+                if cible > address:
+                    # code automodifiant : l'instruction écrite ne doit pas être traduite dans ce bloc
+                    limit = min(limit, cible)
+                if cible in self._watchedMemory:
+                    watch = True
+
+            elif operator == Operators.CMP:
+                usedRegisters.update(opRegisters)
+                writtenFlags = True
+                body.append("d = (r{} - r{}) & {}".format(opRegisters[0], opRegisters[1], M))
+
+            elif operator.isArithmetic:
+                if not self._engine.ualOutputIsFree():
+                    opRegisters = [0] + opRegisters
+                usedRegisters.update(opRegisters)
+                writtenRegisters.add(opRegisters[0])
+                operands = ["r{}".format(index) for index in opRegisters[1:]] + [str(value & M) for value in opSpecial]
+                if operator in self._UNARY:
+                    expression = self._UNARY[operator].format(a=operands[0], M=M)
+                else:
+                    expression = self._BINARY[operator].format(a=operands[0], b=operands[1], M=M, N=N)
+                writtenFlags = True
+                body.append("d = {}".format(expression))
+                body.append("r{} = d".format(opRegisters[0]))
+
+            if len(writtenRegisters & self._watchedRegisters) > 0:
+                watch = True
+            address = suivant
+            if watch or address >= limit or address in self._blocks or address in self._breakpoints:
+                exitIndex = len(body)
+                body.append(("", address, self.CONTINUE))
+                break
+
+        if writtenFlags:
+            # les indicateurs ne sont calculés qu'une fois, à partir du dernier résultat de l'UAL
+            body[exitIndex:exitIndex] = ["z = d == 0", "p = (d & {}) == 0".format(N)]
+        source = self._blockSource(start, body, sorted(usedRegisters), sorted(writtenRegisters), readFlags, writtenFlags)
+        namespace:Dict[str, BlockFunction] = {}
+        exec(compile(source, "<bloc {}>".format(start), "exec"), namespace)
+        function = namespace["bloc_{}".format(start)]
+        return TranslatedBlock(start, end, function, tuple(writes), inputAddress, source, watch)
+
+    @staticmethod
+    def _reserve(memory:List[int], address:int) -> None:
+        """Complète la mémoire pour que l'adresse soit définie
+
+        :param memory: contenu de la mémoire
+        :type memory: List[int]
+        :param address: adresse à atteindre
+        :type address: int
+        """
+        if address >= len(memory):
+            memory.extend([0] * (address + 1 - len(memory)))
+
+    @staticmethod
+    def _blockSource(start:int, body:List[Union[str, BlockExit]], usedRegisters:List[int], writtenRegisters:List[int], readFlags:bool, writtenFlags:bool) -> str:
+        """Produit le code Python d'un bloc
+
+        :param start: adresse du bloc
+        :type start: int
+        :param body: instructions Python du bloc et sorties du bloc, sous la forme
+            condition (vide si inconditionnelle), adresse suivante, état
+        :type body: List[Union[str, BlockExit]]
+        :param usedRegisters: registres lus ou écrits
+        :type usedRegisters: List[int]
+        :param writtenRegisters: registres écrits, à recopier en sortie
+        :type writtenRegisters: List[int]
+        :param readFlags: les indicateurs sont lus avant d'être écrits
+        :type readFlags: bool
+        :param writtenFlags: les indicateurs sont écrits
+        :type writtenFlags: bool
+        :return: code source
+        :rtype: str
+        """
+        lines = ["def bloc_{}(r, m, f, inp, out):".format(start)]
+        lines.extend(["    r{0} = r[{0}]".format(index) for index in usedRegisters])
+        if readFlags:
+            lines.append("    z, p = f")
+        saves = ["r[{0}] = r{0}".format(index) for index in writtenRegisters]
+        if writtenFlags:
+            saves.append("f[0] = z")
+            saves.append("f[1] = p")
+        for item in body:
+            if isinstance(item, str):
+                lines.append("    " + item)
+                continue
+            condition, address, state = item
+            if condition == "":
+                lines.extend(["    " + line for line in saves])
+                lines.append("    return {}, {}".format(address, state))
+                break
+            lines.append("    if {}:".format(condition))
+            lines.extend(["        " + line for line in saves])
+            lines.append("        return {}, {}".format(address, state))
+        return "\n".join(lines) + "\n"
@@ -5,7 +5,7 @@
 .. note:: Les noeuds ne sont jamais modifiés. toute modification entraîne la création de clones.
 """
 
-from typing import Optional, List, Union, Any, Tuple
+from typing import Optional, List, Union, Any, Tuple, Callable
 from abc import ABC, ABCMeta, abstractmethod
 
 from modules.primitives.operators import Operator, Operators
@@ -104,6 +104,67 @@ class ArithmeticExpressionNode(metaclass=ABCMeta):
         """
         return 1
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de l'expression
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return False
+
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        return []
+
+    def isInvariant(self, assigned:List[str]) -> bool:
+        """Prédicat
+
+        :param assigned: noms des variables modifiées, dans une boucle par exemple
+        :type assigned: List[str]
+        :return: la valeur de l'expression ne dépend d'aucune variable modifiée
+            et son calcul ne peut pas échouer
+        :rtype: bool
+        """
+        return False
+
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Produit un clone dans lequel les sous-expressions invariantes les plus grandes
+        sont remplacées par une variable
+
+        :param assigned: noms des variables modifiées, dans une boucle par exemple
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        if self.isInvariant(assigned):
+            return ValueNode(extract(self.clone()))
+        return self._extractInvariantsInOperandsClone(assigned, extract)
+
+    def _extractInvariantsInOperandsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Clone dont les opérandes sont traités par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        return self.clone()
+
 
 class NegNode(ArithmeticExpressionNode):
     """Noeud pour soustraction unaire
@@ -130,6 +191,22 @@ class NegNode(ArithmeticExpressionNode):
         """
         return self._operand.cost(litteralDomain)
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de l'expression
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand.evaluationCost() + 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand.mayFail()
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -151,6 +228,35 @@ class NegNode(ArithmeticExpressionNode):
         cloneOperand = self._operand.clone()
         return NegNode(cloneOperand)
 
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        return self._operand.getVariablesNames()
+
+    def isInvariant(self, assigned:List[str]) -> bool:
+        """Prédicat
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :return: la valeur de l'expression ne dépend d'aucune variable modifiée
+        :rtype: bool
+        """
+        return self._operand.isInvariant(assigned)
+
+    def _extractInvariantsInOperandsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Clone dont l'opérande est traité par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        return NegNode(self._operand.extractInvariantsClone(assigned, extract))
+
     def getFIFO(self, litteralDomain:Tuple[int,int]) -> ActionsFIFO:
         """Produit une file de type polonaise inversée de façon à donner
         l'ordre de calcul le plus efficace
@@ -185,6 +291,22 @@ class InverseNode(ArithmeticExpressionNode):
         """
         return self._operand.cost(litteralDomain)
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de l'expression
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand.evaluationCost() + 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand.mayFail()
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -207,6 +329,35 @@ class InverseNode(ArithmeticExpressionNode):
         cloneOperand = self._operand.clone()
         return InverseNode(cloneOperand)
 
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        return self._operand.getVariablesNames()
+
+    def isInvariant(self, assigned:List[str]) -> bool:
+        """Prédicat
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :return: la valeur de l'expression ne dépend d'aucune variable modifiée
+        :rtype: bool
+        """
+        return self._operand.isInvariant(assigned)
+
+    def _extractInvariantsInOperandsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Clone dont l'opérande est traité par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        return InverseNode(self._operand.extractInvariantsClone(assigned, extract))
+
     def getFIFO(self, litteralDomain:Tuple[int,int]) -> ActionsFIFO:
         """Produit une file de type polonaise inversée de façon à donner
         l'ordre de calcul le plus efficace
@@ -273,6 +424,22 @@ class BinaryArithmeticNode(ArithmeticExpressionNode):
         costOp2 = self._operand2.cost(litteralDomain)
         return min(max(costOp1, costOp2 + 1), max(costOp1 + 1, costOp2))
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de l'expression
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand1.evaluationCost() + self._operand2.evaluationCost() + 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operator in (Operators.DIV, Operators.MOD) or self._operand1.mayFail() or self._operand2.mayFail()
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -300,6 +467,46 @@ class BinaryArithmeticNode(ArithmeticExpressionNode):
         operator = self._operator
         return BinaryArithmeticNode(operator, cloneOp1, cloneOp2)
 
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        names = self._operand1.getVariablesNames()
+        return names + [name for name in self._operand2.getVariablesNames() if not name in names]
+
+    def isInvariant(self, assigned:List[str]) -> bool:
+        """Prédicat
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :return: la valeur de l'expression ne dépend d'aucune variable modifiée
+            et son calcul ne peut pas échouer
+        :rtype: bool
+
+        .. note:: Une division n'est invariante que si le diviseur est un littéral non nul :
+            le calcul sorti de la boucle serait sinon effectué même quand la boucle ne l'est pas.
+        """
+        if self._operator in (Operators.DIV, Operators.MOD):
+            divisor = ArithmeticExpressionNode._operandAsLitteral(self._operand2)
+            if divisor is None or divisor.value == 0:
+                return False
+        return self._operand1.isInvariant(assigned) and self._operand2.isInvariant(assigned)
+
+    def _extractInvariantsInOperandsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Clone dont les opérandes sont traités par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        cloneOp1 = self._operand1.extractInvariantsClone(assigned, extract)
+        cloneOp2 = self._operand2.extractInvariantsClone(assigned, extract)
+        return BinaryArithmeticNode(self._operator, cloneOp1, cloneOp2)
+
     def getFIFO(self, litteralDomain:Tuple[int,int]) -> ActionsFIFO:
         """Produit une file de type polonaise inversée de façon à donner
         l'ordre de calcul le plus efficace
@@ -346,6 +553,22 @@ class ValueNode(ArithmeticExpressionNode):
             return 0
         return 1
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de l'expression
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return False
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -376,6 +599,37 @@ class ValueNode(ArithmeticExpressionNode):
         """
         return ValueNode(self._value)
 
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        if isinstance(self._value, Variable):
+            return [self._value.name]
+        return []
+
+    def isInvariant(self, assigned:List[str]) -> bool:
+        """Prédicat
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :return: la valeur n'est pas une variable modifiée
+        :rtype: bool
+        """
+        return not (isinstance(self._value, Variable) and self._value.name in assigned)
+
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[['ArithmeticExpressionNode'], Variable]) -> 'ArithmeticExpressionNode':
+        """Une valeur seule n'est jamais extraite : sa lecture coûte autant que celle d'une variable temporaire
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ArithmeticExpressionNode
+        """
+        return self.clone()
+
     def getFIFO(self, litteralDomain:Tuple[int,int]) -> ActionsFIFO:
         """Produit une file de type polonaise inversée de façon à donner
         l'ordre de calcul le plus efficace
@@ -5,12 +5,13 @@
 .. note:: Les noeuds ne sont jamais modifiés. toute modification entraîne la création de clones.
 """
 
-from typing import List, Union, Optional, Any, Tuple
+from typing import List, Union, Optional, Any, Tuple, Callable
 
 from modules.errors import AttributesError
 
 from modules.primitives.operators import Operator, Operators
 from modules.primitives.actionsfifo import ActionsFIFO
+from modules.primitives.variable import Variable
 
 from modules.expressionnodes.arithmetic import ArithmeticExpressionNode
 
@@ -161,7 +162,9 @@ class ComparaisonExpressionNode:
 
         mirroredOperator = ComparaisonExpressionNode.mirroredOperator(self._operator)
         if mirroredOperator in csl:
-            return ComparaisonExpressionNode(mirroredOperator, self._operand2, self._operand1)
+            compNode = ComparaisonExpressionNode(mirroredOperator, self._operand2, self._operand1)
+            compNode._inversed = self._inversed
+            return compNode
 
         negateOperator = ComparaisonExpressionNode.negateOperator(self._operator)
         if negateOperator in csl:
@@ -177,6 +180,58 @@ class ComparaisonExpressionNode:
 
         raise AttributesError("Aucun opérateur pour {} dans le modèle de processeur.".format(self._operator))
 
+    def logicNegateAdjustedClone(self, csl:List[Operator]) -> Optional['ComparaisonExpressionNode']:
+        """Négation logique exprimée directement avec un symbole de comparaison disponible,
+        c'est à dire sans recours à l'inversion
+
+        :param csl: symboles de comparaison disponibles
+        :type csl: list[Operator]
+        :return: clone dont l'expression est la négation, None si la négation nécessite une inversion
+        :rtype: Optional[ComparaisonExpressionNode]
+
+        :Example:
+            >>> from modules.expressionnodes.arithmetic import ValueNode
+            >>> from modules.primitives.variable import Variable
+            >>> from modules.primitives.litteral import Litteral
+            >>> oLitteral = ValueNode(Litteral(4))
+            >>> oVariable = ValueNode(Variable('x'))
+            >>> oComp = ComparaisonExpressionNode(Operators.EQ, oVariable, oLitteral)
+            >>> str(oComp.logicNegateAdjustedClone([Operators.NOTEQ, Operators.EQ]))
+            '(@x != #4)'
+            >>> oComp = ComparaisonExpressionNode(Operators.INF, oVariable, oLitteral)
+            >>> oComp.logicNegateAdjustedClone([Operators.INF, Operators.EQ]) is None
+            True
+        """
+        if self._inversed:
+            operator = self._operator
+        else:
+            operator = ComparaisonExpressionNode.negateOperator(self._operator)
+        oComp = ComparaisonExpressionNode(operator, self._operand1.clone(), self._operand2.clone())
+        try:
+            oComp = oComp.adjustConditionClone(csl)
+        except AttributesError:
+            return None
+        if oComp.inversed:
+            return None
+        return oComp
+
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de la comparaison,
+        branchement non compris
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand1.evaluationCost() + self._operand2.evaluationCost() + 1
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand1.mayFail() or self._operand2.mayFail()
+
     @property
     def inversed(self):
         """Accesseur
@@ -186,6 +241,27 @@ class ComparaisonExpressionNode:
         """
         return self._inversed
 
+    @property
+    def operator(self) -> Operator:
+        """Accesseur
+
+        :return: opérateur de comparaison
+        :rtype: Operator
+        """
+        return self._operator
+
+    def hasSameOperands(self, other:'ComparaisonExpressionNode') -> bool:
+        """Prédicat
+
+        :param other: autre comparaison
+        :type other: ComparaisonExpressionNode
+        :return: les deux comparaisons portent sur les mêmes opérandes, dans le même ordre
+        :rtype: bool
+
+        .. note:: Dans ce cas, le résultat d'une comparaison suffit à effectuer l'autre.
+        """
+        return str(self._operand1) == str(other._operand1) and str(self._operand2) == str(other._operand2)
+
     @property
     def comparaisonSymbol(self) -> str:
         """Accesseur
@@ -243,3 +319,26 @@ class ComparaisonExpressionNode:
         oComp._inversed = self._inversed
         return oComp
 
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> 'ComparaisonExpressionNode':
+        """Produit un clone dont les opérandes sont traités par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: ComparaisonExpressionNode
+        """
+        cloneOp1 = self._operand1.extractInvariantsClone(assigned, extract)
+        cloneOp2 = self._operand2.extractInvariantsClone(assigned, extract)
+        oComp = ComparaisonExpressionNode(self._operator, cloneOp1, cloneOp2)
+        oComp._inversed = self._inversed
+        return oComp
+
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par la comparaison
+        :rtype: List[str]
+        """
+        names = self._operand1.getVariablesNames()
+        return names + [name for name in self._operand2.getVariablesNames() if not name in names]
@@ -5,10 +5,12 @@
 .. note:: Les noeuds ne sont jamais modifiés. toute modification entraîne la création de clones.
 """
 
-from typing import Union, Tuple, Any, Optional
+from typing import Union, Tuple, Any, Optional, List, Callable
 from abc import ABC, ABCMeta, abstractmethod
 
 from modules.primitives.operators import Operator, Operators
+from modules.primitives.variable import Variable
+from modules.expressionnodes.arithmetic import ArithmeticExpressionNode
 from modules.expressionnodes.comparaison import ComparaisonExpressionNode
 
 class LogicExpressionNode(metaclass=ABCMeta):
@@ -46,6 +48,42 @@ class LogicExpressionNode(metaclass=ABCMeta):
         .. note:: L'aborescence enfant est également clonée.
         """
     
+    @abstractmethod
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+
+    @abstractmethod
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> 'LogicExpressionNode':
+        """Produit un clone dont les comparaisons sont traitées par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: LogicExpressionNode
+        """
+
+    @abstractmethod
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation de toutes
+        les comparaisons de l'expression, branchements non compris
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+
+    @abstractmethod
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation d'une des comparaisons peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+
     @staticmethod
     def operandsToNode(operator:Operator, *operands:Any) -> Optional['LogicExpressionNode']:
         """Crée un noeud de type adapté
@@ -143,6 +181,41 @@ class NotNode(LogicExpressionNode):
         cloneOperand = self._operand.clone()
         return NotNode(cloneOperand)
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand.evaluationCost()
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand.mayFail()
+
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> 'LogicExpressionNode':
+        """Produit un clone dont les comparaisons sont traitées par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: LogicExpressionNode
+        """
+        return NotNode(self._operand.extractInvariantsClone(assigned, extract))
+
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        return self._operand.getVariablesNames()
+
     @property
     def operand(self) -> Union['LogicExpressionNode', ComparaisonExpressionNode]:
         """Accesseur
@@ -197,6 +270,42 @@ class AndNode(LogicExpressionNode):
         cloneOp2 = self._operand2.clone()
         return AndNode(cloneOp1, cloneOp2)
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand1.evaluationCost() + self._operand2.evaluationCost()
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand1.mayFail() or self._operand2.mayFail()
+
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> 'LogicExpressionNode':
+        """Produit un clone dont les comparaisons sont traitées par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: LogicExpressionNode
+        """
+        return AndNode(self._operand1.extractInvariantsClone(assigned, extract), self._operand2.extractInvariantsClone(assigned, extract))
+
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        names = self._operand1.getVariablesNames()
+        return names + [name for name in self._operand2.getVariablesNames() if not name in names]
+
     @property
     def operands(self) -> Tuple[Union['LogicExpressionNode', ComparaisonExpressionNode],Union['LogicExpressionNode', ComparaisonExpressionNode]]:
         """Accesseur
@@ -250,6 +359,42 @@ class OrNode(LogicExpressionNode):
         cloneOp2 = self._operand2.clone()
         return OrNode(cloneOp1, cloneOp2)
 
+    def evaluationCost(self) -> int:
+        """Estimation du nombre d'instructions nécessaires à l'évaluation
+
+        :return: nombre d'instructions estimé
+        :rtype: int
+        """
+        return self._operand1.evaluationCost() + self._operand2.evaluationCost()
+
+    def mayFail(self) -> bool:
+        """Prédicat
+
+        :return: l'évaluation peut échouer, par une division ou un modulo par zéro
+        :rtype: bool
+        """
+        return self._operand1.mayFail() or self._operand2.mayFail()
+
+    def extractInvariantsClone(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> 'LogicExpressionNode':
+        """Produit un clone dont les comparaisons sont traitées par extractInvariantsClone
+
+        :param assigned: noms des variables modifiées
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        :return: clone
+        :rtype: LogicExpressionNode
+        """
+        return OrNode(self._operand1.extractInvariantsClone(assigned, extract), self._operand2.extractInvariantsClone(assigned, extract))
+
+    def getVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables lues par l'expression
+        :rtype: List[str]
+        """
+        names = self._operand1.getVariablesNames()
+        return names + [name for name in self._operand2.getVariablesNames() if not name in names]
+
     @property
     def operands(self) -> Tuple[Union['LogicExpressionNode', ComparaisonExpressionNode],Union['LogicExpressionNode', ComparaisonExpressionNode]]:
         """Accesseur
@@ -0,0 +1,237 @@
+"""
+.. module:: passmanager
+:synopsis: gestion des passes appliquées au programme structuré puis à sa version linéaire
+    lors de la compilation. Le niveau d'optimisation détermine les passes exécutées :
+
+    * niveaux 0 et 1 : transformation des if, else, while en sauts, suppression des sauts vers la ligne suivante
+      et des noeuds vides, attribution des labels ; le code produit est celui de la compilation historique
+      (niveau 1 par défaut)
+    * niveau 2 : calculs invariants sortis des boucles, conditions and/or ordonnées selon leur coût et réutilisant
+      registres et drapeaux, réorganisation des sauts, suppression du code mort
+
+    Pour chaque passe exécutée, on conserve la durée et, sur demande, la variation du nombre d'instructions.
+"""
+
+import time
+from typing import List, Callable, Optional, Tuple
+
+from modules.errors import CompilationError
+from modules.primitives.operators import Operator
+from modules.structuresnodes import StructureNodeList
+
+PassAction = Callable[[StructureNodeList, List[Operator]], None]
+
+class PassRecord:
+    _name:str
+    _duration:float
+    _instructionsBefore:Optional[int]
+    _instructionsAfter:Optional[int]
+
+    def __init__(self, name:str, duration:float, instructionsBefore:Optional[int], instructionsAfter:Optional[int]):
+        """Constructeur
+
+        :param name: nom de la passe
+        :type name: str
+        :param duration: durée d'exécution en secondes
+        :type duration: float
+        :param instructionsBefore: nombre d'instructions avant la passe, None si non mesuré
+        :type instructionsBefore: Optional[int]
+        :param instructionsAfter: nombre d'instructions après la passe, None si non mesuré
+        :type instructionsAfter: Optional[int]
+        """
+        self._name = name
+        self._duration = duration
+        self._instructionsBefore = instructionsBefore
+        self._instructionsAfter = instructionsAfter
+
+    @property
+    def name(self) -> str:
+        """Accesseur
+
+        :return: nom de la passe
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def duration(self) -> float:
+        """Accesseur
+
+        :return: durée d'exécution de la passe en secondes
+        :rtype: float
+        """
+        return self._duration
+
+    @property
+    def instructionsAfter(self) -> Optional[int]:
+        """Accesseur
+
+        :return: nombre d'instructions après la passe, None si non mesuré
+        :rtype: Optional[int]
+        """
+        return self._instructionsAfter
+
+    @property
+    def instructionsDelta(self) -> Optional[int]:
+        """
+        :return: variation du nombre d'instructions due à la passe, None si non mesurée
+        :rtype: Optional[int]
+
+        .. note:: Le nombre d'instructions n'est mesurable qu'une fois le programme linéarisé.
+        """
+        if self._instructionsBefore is None or self._instructionsAfter is None:
+            return None
+        return self._instructionsAfter - self._instructionsBefore
+
+    def __str__(self) -> str:
+        """Transtypage -> str
+
+        :return: nom, durée en ms et variation du nombre d'instructions
+        :rtype: str
+
+        :Example:
+            >>> str(PassRecord("deleteJumpNextLine", 0.0012, 20, 17))
+            'deleteJumpNextLine\\t1.200 ms\\t-3'
+            >>> str(PassRecord("linearize", 0.002, None, 20))
+            'linearize\\t2.000 ms\\t-'
+        """
+        delta = self.instructionsDelta
+        if delta is None:
+            strDelta = "-"
+        elif delta == 0:
+            strDelta = "0"
+        else:
+            strDelta = "{:+d}".format(delta)
+        return "{}\t{:.3f} ms\t{}".format(self._name, self._duration * 1000, strDelta)
+
+
+class PassManager:
+    LEVELS = (0, 1, 2)
+    DEFAULT_LEVEL = 1
+    _passes:List[Tuple[str, int, PassAction]]
+    _records:List[PassRecord]
+    _countInstructions:bool
+
+    @staticmethod
+    def levelFromFlag(flag:str) -> int:
+        """Niveau d'optimisation correspondant à une option de la forme -O0, -O1, -O2
+
+        :param flag: option
+        :type flag: str
+        :return: niveau d'optimisation
+        :rtype: int
+        :raises: CompilationError si l'option ne correspond à aucun niveau
+
+        :Example:
+            >>> PassManager.levelFromFlag("-O2")
+            2
+        """
+        if flag.startswith("-O") and flag[2:].isdigit() and int(flag[2:]) in PassManager.LEVELS:
+            return int(flag[2:])
+        raise CompilationError("Option d'optimisation {} inconnue.".format(flag))
+
+    def __init__(self, countInstructions:bool = False):
+        """Constructeur
+
+        :param countInstructions: mesurer la variation du nombre d'instructions due à chaque passe
+        :type countInstructions: bool
+
+        .. note:: la mesure du nombre d'instructions nécessite une compilation complète
+            avant et après chaque passe, elle n'est donc faite que sur demande.
+        """
+        self._countInstructions = countInstructions
+        self._records = []
+        self._passes = [
+            ("hoistLoopInvariants", 2, lambda nodes, csl: nodes.hoistLoopInvariants()),
+            ("optimizeConditions",  2, lambda nodes, csl: nodes.optimizeConditions()),
+            ("linearize",           0, lambda nodes, csl: nodes.linearizeStructures(csl)),
+            ("optimizeBranches",    2, lambda nodes, csl: nodes.optimizeBranches(csl)),
+            ("deleteJumpNextLine",  0, lambda nodes, csl: nodes.deleteJumpNextLine()),
+            ("deleteDummies",       0, lambda nodes, csl: nodes.deleteDummies()),
+            ("deleteDeadCode",      2, lambda nodes, csl: nodes.deleteDeadCode()),
+            ("assignLabels",        0, lambda nodes, csl: nodes.assignLabels())
+        ]
+
+    @property
+    def countInstructions(self) -> bool:
+        """Accesseur
+
+        :return: la variation du nombre d'instructions est-elle mesurée
+        :rtype: bool
+        """
+        return self._countInstructions
+
+    @property
+    def records(self) -> List[PassRecord]:
+        """Accesseur
+
+        :return: mesures des passes exécutées lors du dernier appel à run
+        :rtype: List[PassRecord]
+        """
+        return list(self._records)
+
+    @property
+    def passesNames(self) -> List[str]:
+        """Accesseur
+
+        :return: noms des passes, dans l'ordre d'exécution
+        :rtype: List[str]
+        """
+        return [name for name, minLevel, action in self._passes]
+
+    def register(self, name:str, action:PassAction, minLevel:int = 0, linear:bool = True) -> None:
+        """Ajoute une passe
+
+        :param name: nom de la passe
+        :type name: str
+        :param action: fonction recevant la liste des noeuds et les comparaisons disponibles
+        :type action: PassAction
+        :param minLevel: niveau d'optimisation à partir duquel la passe est exécutée
+        :type minLevel: int
+        :param linear: la passe s'applique à la version linéaire. Sinon elle s'applique au programme structuré
+        :type linear: bool
+
+        .. note:: Une passe sur la version linéaire est exécutée après les passes standards,
+            juste avant l'attribution des labels. Une passe sur le programme structuré est
+            exécutée juste avant la linéarisation.
+        """
+        if name in self.passesNames:
+            raise CompilationError("La passe {} existe déjà.".format(name))
+        anchor = self.passesNames.index("assignLabels" if linear else "linearize")
+        self._passes.insert(anchor, (name, minLevel, action))
+
+    def run(self, level:int, nodes:StructureNodeList, csl:List[Operator], counter:Optional[Callable[[StructureNodeList], Optional[int]]] = None) -> None:
+        """Exécute les passes correspondant au niveau d'optimisation
+
+        :param level: niveau d'optimisation
+        :type level: int
+        :param nodes: programme, structuré puis linéarisé sur place
+        :type nodes: StructureNodeList
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        :param counter: fonction donnant le nombre d'instructions du programme, None si non mesurable
+        :type counter: Optional[Callable[[StructureNodeList], Optional[int]]]
+        :raises: CompilationError si le niveau n'existe pas
+        """
+        if not level in self.LEVELS:
+            raise CompilationError("Niveau d'optimisation {} inconnu.".format(level))
+        if not self._countInstructions:
+            counter = None
+        self._records = []
+        instructions = None if counter is None else counter(nodes)
+        for name, minLevel, action in self._passes:
+            if minLevel > level:
+                continue
+            start = time.perf_counter()
+            action(nodes, csl)
+            duration = time.perf_counter() - start
+            instructionsAfter = None if counter is None else counter(nodes)
+            self._records.append(PassRecord(name, duration, instructions, instructionsAfter))
+            instructions = instructionsAfter
+
+    def report(self) -> str:
+        """
+        :return: mesures des passes, une ligne par passe
+        :rtype: str
+        """
+        return "\n".join([str(record) for record in self._records])
@@ -0,0 +1,65 @@
+"""
+.. module:: modules.program
+:synopsis: compilation d'un programme pour un modèle de processeur désigné par son nom,
+    commune à la ligne de commande et à l'interface graphique.
+    Seul le modèle demandé est importé, voir modules.engine.registry.
+"""
+
+from typing import List
+import time
+
+from modules.engine.processorengine import ProcessorEngine
+from modules.engine.addressmap import AddressMap
+from modules.engine.registry import getEngine
+from modules.parser.code import CodeParser
+from modules.compilemanager import CompilationManager
+from modules.passmanager import PassManager
+from modules.primitives.actionsfifo import ActionsFIFO
+
+class Program:
+    """Programme compilé pour un modèle de processeur, avec les mesures de la compilation
+    """
+    engineName:str
+    engine:ProcessorEngine
+    fifos:List[ActionsFIFO]
+    binary:List[str]
+    addressMap:AddressMap
+    compileSeconds:float
+
+    def __init__(self, code:str, engineName:str, optimizationLevel:int = PassManager.DEFAULT_LEVEL):
+        """Constructeur : compile le code
+
+        :param code: programme d'origine
+        :type code: str
+        :param engineName: modèle de processeur, voir modules.engine.registry
+        :type engineName: str
+        :param optimizationLevel: niveau d'optimisation
+        :type optimizationLevel: int
+        :raises: ParseError, CompilationError, ExpressionError
+        """
+        start = time.perf_counter()
+        self.engineName = engineName
+        self.engine = getEngine(engineName)
+        self.fifos = CompilationManager(self.engine, CodeParser.parse(code=code), optimizationLevel).compile()
+        self.binary = self.engine.getBinary(self.fifos)
+        self.addressMap = self.engine.getAddressMap(self.fifos)
+        self.compileSeconds = time.perf_counter() - start
+
+    @property
+    def asm(self) -> str:
+        """Accesseur
+
+        :return: code assembleur, variables comprises
+        :rtype: str
+        """
+        return self.engine.getAsm(self.fifos, True)
+
+    def lineOf(self, address:int) -> int:
+        """
+        :param address: adresse d'une instruction
+        :type address: int
+        :return: numéro de ligne dans le programme d'origine, 0 si elle est inconnue
+        :rtype: int
+        """
+        lineNumber = self.addressMap.lineOf(address)
+        return 0 if lineNumber is None else lineNumber
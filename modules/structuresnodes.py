@@ -2,7 +2,7 @@
 .. module:: structuresnodes
    :synopsis: définition des noeuds constituant le programme dans sa version structurée : Instructions simples, conditions, boucles. Contribue à la transformation d'une version où les conditions et boucles sont assurés par des sauts inconditionnels / conditionnels. Cette version est qualifiée de version linéaire.
 """
-from typing import List, Optional, Union, cast
+from typing import List, Optional, Union, Dict, Callable, cast
 
 from modules.primitives.linkedlistnode import LinkedList, LinkedListNode
 from modules.primitives.operators import Operator, Operators
@@ -14,20 +14,34 @@ from modules.expressionnodes.comparaison import ComparaisonExpressionNode
 from modules.expressionnodes.logic import LogicExpressionNode, NotNode, AndNode, OrNode
 
 class StructureNodeList(LinkedList):
-    def linearize(self, csl:List[str]) -> None:
+    _conditionsOptimized:bool = False
+    def linearize(self, csl:List[str], optimizeBranches:bool = False) -> None:
         """Crée la vesion linéaire de l'ensemble de la structure
 
         :param csl: liste des comparaisons permises par le processeur utilisé
         :type csl: List[str]
+        :param optimizeBranches: réorganise les sauts pour en exécuter moins (boucles testées en fin, sauts en cascade court-circuités)
+        :type optimizeBranches: bool
+        """
+        self.linearizeStructures(csl)
+        if optimizeBranches:
+            self.optimizeBranches(csl)
+        # une fois ceci fait, on supprime les jump qui pointeraient vers le noeud suivant et les dummies
+        self.deleteJumpNextLine()
+        self.deleteDummies()
+        # enfin il faut assigner tous les labels
+        self.assignLabels()
+
+    def linearizeStructures(self, csl:List[Operator]) -> None:
+        """Ajoute l'instruction halt finale et remplace les if, else et while par des sauts.
+        Première étape de linearize, sans les nettoyages qui suivent
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
         """
         haltNode = SimpleNode(Operators.HALT)
         self.append(haltNode)
         self._linearizeRecursive(csl)
-        # une fois ceci fait, on supprime les jump qui pointeraient vers le noeud suivant et les dummies
-        self._deleteJumpNextLine()
-        self._deleteDummies()
-        # enfin il faut assigner tous les labels
-        self._assignLabels()
 
     def _linearizeRecursive(self, csl:List[Operator]) -> None:
         """Propage le calcul de la version linéaire aux enfants
@@ -41,7 +55,7 @@ class StructureNodeList(LinkedList):
                 nodeLinear = node._getLinearStructureList(csl)
                 self.replace(node, nodeLinear)
 
-    def _deleteJumpNextLine(self):
+    def deleteJumpNextLine(self):
         """Recherche un jump pointant vers la ligne suivante et le supprime
         """
         jumpsToScan:List['JumpNode'] = [node for node in self if isinstance(node, JumpNode)]
@@ -59,16 +73,335 @@ class StructureNodeList(LinkedList):
             jumpsToScan = jumpsLeft
             jumpsLeft:List['JumpNode'] = []
 
-    def _deleteDummies(self):
+    def optimizeBranches(self, csl:List[Operator]) -> None:
+        """Optimisation de la disposition des sauts dans la version linéaire :
+
+        * les boucles sont réécrites avec le test en fin de boucle,
+        * les sauts pointant vers un saut inconditionnel sont redirigés vers la cible finale,
+        * un saut conditionnel suivi d'un saut inconditionnel est inversé quand cela permet de supprimer ce dernier.
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        """
+        self.deleteDummies()
+        self.deleteJumpNextLine()
+        self._rotateLoops()
+        self._threadJumps()
+        self.deleteJumpNextLine()
+        self._chooseFallThrough(csl)
+
+    def _rotateLoops(self) -> None:
+        """Recherche les sauts inconditionnels vers l'arrière, issus des boucles,
+        et place le test de la boucle en fin de boucle
+        """
+        nodes = self._toList()
+        positions = { node:index for index, node in enumerate(nodes) }
+        backJumps:List['JumpNode'] = [
+            node for node in nodes
+            if isinstance(node, JumpNode) and node.getCondition() is None
+            and node.cible in positions and positions[node.cible] < positions[node]
+        ]
+        for sautRetour in backJumps:
+            self._rotateLoop(sautRetour)
+
+    def _rotateLoop(self, sautRetour:'JumpNode') -> bool:
+        """Transforme une boucle de la forme :
+
+        * entête : sauts de test, le dernier étant inconditionnel,
+        * corps,
+        * saut retour vers l'entête
+
+        en une boucle de la forme :
+
+        * saut vers l'entête,
+        * corps,
+        * entête
+
+        À chaque itération, le saut retour est économisé et le saut inconditionnel
+        de sortie de l'entête pointe alors en général vers la ligne suivante.
+
+        :param sautRetour: saut retour de la boucle
+        :type sautRetour: JumpNode
+        :return: transformation effectuée
+        :rtype: bool
+        """
+        entete = sautRetour.cible
+        blocEntete:List['JumpNode'] = []
+        node = entete
+        while isinstance(node, JumpNode) and node != sautRetour:
+            blocEntete.append(node)
+            node = cast(StructureNode, node._next)
+            if node == self._head:
+                return False
+            if blocEntete[-1].getCondition() is None:
+                break
+        if node == sautRetour or len(blocEntete) == 0 or not blocEntete[-1].getCondition() is None:
+            # corps vide ou entête dont on pourrait sortir en continuant en séquence
+            return False
+        corps = node
+        while node != sautRetour:
+            node = cast(StructureNode, node._next)
+            if node == self._head:
+                return False
+
+        enteteEnTete = (entete == self._head)
+        avant = entete._prev
+        for item in blocEntete:
+            super().delete(item)
+        precedent:LinkedListNode = sautRetour
+        for item in blocEntete:
+            precedent.insertRight(item)
+            precedent = item
+
+        sautEntree = JumpNode(sautRetour.lineNumber, entete)
+        if enteteEnTete:
+            corps.insertLeft(sautEntree)
+            self._head = sautEntree
+        else:
+            avant.insertRight(sautEntree)
+        # les sauts vers le saut retour seront redirigés vers l'entête qui le suit désormais
+        self.delete(sautRetour)
+        return True
+
+    def _threadJumps(self) -> None:
+        """Un saut dont la cible est un saut inconditionnel est redirigé
+        directement vers la cible finale
+        """
+        jumpsList:List['JumpNode'] = [node for node in self if isinstance(node, JumpNode)]
+        for j in jumpsList:
+            cible = j.cible
+            visited:List['StructureNode'] = [j]
+            while isinstance(cible, JumpNode) and cible.getCondition() is None and not cible in visited:
+                visited.append(cible)
+                cible = cible.cible
+            if not cible in visited:
+                j.setCible(cible)
+
+    def _chooseFallThrough(self, csl:List[Operator]) -> None:
+        """Recherche les séquences de forme :
+
+        * saut vers A si condition,
+        * saut vers B,
+        * A
+
+        et les remplace par : saut vers B si non condition, quand la négation
+        de la condition est disponible sur le processeur utilisé.
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        """
+        jumpsList:List['JumpNode'] = [node for node in self if isinstance(node, JumpNode)]
+        for j in jumpsList:
+            condition = j.getCondition()
+            suivant = j._next
+            if condition is None or suivant == self._head:
+                continue
+            if not isinstance(suivant, JumpNode) or not suivant.getCondition() is None:
+                continue
+            if j.cible != suivant._next or suivant._next == self._head:
+                continue
+            if len([node for node in jumpsList if node.cible == suivant]) > 0:
+                continue
+            negation = condition.logicNegateAdjustedClone(csl)
+            if negation is None:
+                continue
+            j.setCondition(negation)
+            j.setCible(suivant.cible)
+            self.delete(suivant)
+
+    def assignedVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables modifiées dans la liste, sans doublon
+        :rtype: List[str]
+        """
+        names:List[str] = []
+        for node in self:
+            names.extend([name for name in node.assignedVariablesNames() if not name in names])
+        return names
+
+    def hoistLoopInvariants(self, temps:Optional[Dict[str, Variable]] = None) -> None:
+        """Sort des boucles while les calculs invariants. Doit être appelée avant linearize
+
+        :param temps: variables temporaires déjà créées, indexées par l'expression qu'elles contiennent
+        :type temps: Optional[Dict[str, Variable]]
+
+        :Example:
+            >>> from modules.parser.code import CodeParser
+            >>> structureList = StructureNodeList(CodeParser.parse(code="n=input()\\nwhile i < n*n:\\n    i = i + 1\\n"))
+            >>> structureList.hoistLoopInvariants()
+            >>> [str(node) for node in structureList][:2]
+            ['\\t@n ← Input', '\\t@_inv1 ← (@n * @n)']
+        """
+        if temps is None:
+            temps = {}
+        for node in cast(List[StructureNode], self._toList()):
+            affectations = node.hoistLoopInvariants(temps)
+            if len(affectations) == 0:
+                continue
+            inserted = node.insertLeft(StructureNodeList(cast(List[LinkedListNode], affectations)))
+            if node == self._head:
+                self._head = inserted
+
+    def optimizeConditions(self) -> None:
+        """Demande, pour les if, else et while, une compilation optimisée des conditions :
+        opérandes des and et or ordonnés selon leur coût, forme des sauts choisie
+        pour éviter un saut inconditionnel, comparaisons et registres réutilisés
+        d'un saut conditionnel au suivant. Doit être appelée avant linearize
+        """
+        for node in self:
+            node.optimizeConditions()
+        self._conditionsOptimized = True
+
+    @property
+    def conditionsOptimized(self) -> bool:
+        """Accesseur
+
+        :return: la passe optimizeConditions a été appliquée
+        :rtype: bool
+        """
+        return self._conditionsOptimized
+
+    def deleteDeadCode(self) -> None:
+        """Supprime, dans la version linéaire, les noeuds qui ne peuvent pas être atteints
+        et les affectations dont la valeur n'est jamais lue (analyse de durée de vie des variables).
+        Les variables concernées disparaissent ainsi de la mémoire du programme.
+
+        .. note:: Les saisies sont conservées : elles consomment une entrée même si la valeur n'est pas lue.
+            Le dernier noeud n'est jamais supprimé, des sauts pouvant le viser.
+        """
+        deleted = True
+        while deleted:
+            nodes = cast(List[StructureNode], self._toList())
+            successeurs = self._successeurs(nodes)
+            atteints = self._reachables(successeurs)
+            vivants = self._liveVariables(nodes, successeurs)
+            toDelete:List[StructureNode] = []
+            for index, node in enumerate(nodes[:-1]):
+                if not atteints[index]:
+                    toDelete.append(node)
+                elif isinstance(node, TransfertNode) and not node.cible is None and not node.expression is None and not node.cible.name in vivants[index]:
+                    toDelete.append(node)
+            for node in toDelete:
+                self.delete(node)
+            deleted = len(toDelete) > 0
+        self.assignLabels()
+
+    def _successeurs(self, nodes:List['StructureNode']) -> List[List[int]]:
+        """
+        :param nodes: noeuds de la version linéaire
+        :type nodes: List[StructureNode]
+        :return: pour chaque noeud, les indices des noeuds pouvant être exécutés ensuite
+        :rtype: List[List[int]]
+        """
+        indices = { id(node):index for index, node in enumerate(nodes) }
+        successeurs:List[List[int]] = []
+        for index, node in enumerate(nodes):
+            suivants:List[int] = []
+            if isinstance(node, JumpNode):
+                suivants.append(indices[id(node.cible)])
+                if node.getCondition() is None:
+                    successeurs.append(suivants)
+                    continue
+            elif isinstance(node, SimpleNode) and node.operator == Operators.HALT:
+                successeurs.append(suivants)
+                continue
+            if index + 1 < len(nodes):
+                suivants.append(index + 1)
+            successeurs.append(suivants)
+        return successeurs
+
+    @staticmethod
+    def _reachables(successeurs:List[List[int]]) -> List[bool]:
+        """
+        :param successeurs: indices des successeurs de chaque noeud
+        :type successeurs: List[List[int]]
+        :return: pour chaque noeud, peut-il être atteint depuis le début du programme
+        :rtype: List[bool]
+        """
+        atteints = [False] * len(successeurs)
+        aTraiter = [0] if len(successeurs) > 0 else []
+        while len(aTraiter) > 0:
+            index = aTraiter.pop()
+            if atteints[index]:
+                continue
+            atteints[index] = True
+            aTraiter.extend(successeurs[index])
+        return atteints
+
+    @staticmethod
+    def _liveVariables(nodes:List['StructureNode'], successeurs:List[List[int]]) -> List[List[str]]:
+        """
+        :param nodes: noeuds de la version linéaire
+        :type nodes: List[StructureNode]
+        :param successeurs: indices des successeurs de chaque noeud
+        :type successeurs: List[List[int]]
+        :return: pour chaque noeud, noms des variables dont la valeur peut être lue après ce noeud
+        :rtype: List[List[str]]
+        """
+        lues:List[List[str]] = []
+        ecrites:List[Optional[str]] = []
+        for node in nodes:
+            if isinstance(node, TransfertNode):
+                expression = node.expression
+                lues.append([] if expression is None else expression.getVariablesNames())
+                ecrites.append(None if node.cible is None else node.cible.name)
+            elif isinstance(node, JumpNode):
+                condition = node.getCondition()
+                lues.append([] if condition is None else condition.getVariablesNames())
+                ecrites.append(None)
+            else:
+                lues.append([])
+                ecrites.append(None)
+
+        vivantsEnSortie:List[List[str]] = [[] for node in nodes]
+        vivantsEnEntree:List[List[str]] = [list(item) for item in lues]
+        modification = True
+        while modification:
+            modification = False
+            for index in reversed(range(len(nodes))):
+                sortie = vivantsEnSortie[index]
+                for suivant in successeurs[index]:
+                    sortie.extend([name for name in vivantsEnEntree[suivant] if not name in sortie])
+                entree = vivantsEnEntree[index]
+                nouveaux = [name for name in sortie if name != ecrites[index] and not name in entree]
+                if len(nouveaux) > 0:
+                    entree.extend(nouveaux)
+                    modification = True
+        return vivantsEnSortie
+
+    def jumpsCount(self, suivant:Optional['StructureNode'] = None) -> int:
+        """Compte les sauts qui subsisteront, c'est à dire sans les sauts inconditionnels
+        vers la ligne suivante
+
+        :param suivant: noeud placé après la liste
+        :type suivant: Optional[StructureNode]
+        :return: nombre de sauts
+        :rtype: int
+        """
+        nodes = cast(List['StructureNode'], self._toList())
+        count = 0
+        for index, node in enumerate(nodes):
+            if not isinstance(node, JumpNode):
+                continue
+            nextNode = nodes[index + 1] if index + 1 < len(nodes) else suivant
+            if node.getCondition() is None and node.cible is nextNode:
+                continue
+            count += 1
+        return count
+
+    def deleteDummies(self):
         """Recherche les dummy
         """
         dummiesList:List['StructureNode'] = [node for node in self if isinstance(node, SimpleNode) and (node.operator is None)]
         for node in dummiesList:
             self.delete(node)
 
-    def _assignLabels(self):
-        """Recherche les jump et assigne un label à leur cible
+    def assignLabels(self):
+        """Recherche les jump et assigne un label à leur cible.
+        Les labels des noeuds qui ne sont plus la cible d'aucun saut sont retirés.
         """
+        for node in self:
+            node.removeLabel()
         jumpsList:List['JumpNode'] = [node for node in self if isinstance(node, JumpNode)]
         for j in jumpsList:
             j.cible.assignLabel()
@@ -140,6 +473,11 @@ class StructureNode(LinkedListNode):
             self._label = Label()
         return self._label
 
+    def removeLabel(self) -> None:
+        """Retire le label du noeud
+        """
+        self._label = None
+
     def labelToStr(self) -> str:
         """
         :return: label en str, "" si pas de label
@@ -158,6 +496,37 @@ class StructureNode(LinkedListNode):
         """
         return self._lineNumber
 
+    def assignedVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables modifiées par ce noeud et ses enfants
+        :rtype: List[str]
+        """
+        return []
+
+    def extractInvariants(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> None:
+        """Remplace dans les expressions du noeud et de ses enfants les sous-expressions
+        invariantes par des variables temporaires
+
+        :param assigned: noms des variables modifiées dans la boucle
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        """
+
+    def hoistLoopInvariants(self, temps:Dict[str, Variable]) -> List['StructureNode']:
+        """Sort des boucles les calculs invariants
+
+        :param temps: variables temporaires déjà créées, indexées par l'expression qu'elles contiennent
+        :type temps: Dict[str, Variable]
+        :return: noeuds à placer avant ce noeud
+        :rtype: List[StructureNode]
+        """
+        return []
+
+    def optimizeConditions(self) -> None:
+        """Demande une compilation optimisée des conditions du noeud et de ses enfants
+        """
+
 class SimpleNode(StructureNode):
     _operator:Optional[Operator] = None
     def __init__(self, operator:Optional[Operator]):
@@ -187,6 +556,7 @@ class SimpleNode(StructureNode):
 class IfNode(StructureNode):
     _children: "StructureNodeList"
     _condition: Union[LogicExpressionNode, ComparaisonExpressionNode]
+    _optimizeCondition:bool = False
     def __init__(self, lineNumber:int, condition:Union[LogicExpressionNode, ComparaisonExpressionNode], children:List[StructureNode]):
         """Constructeur d'un noeud If
 
@@ -211,6 +581,43 @@ class IfNode(StructureNode):
         childrenStr = self._children.tabulatedStr()
         return "{}\tif {} {{\n{}\n\t}}".format(self.labelToStr(), self._condition, childrenStr)
 
+    def assignedVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables modifiées dans le bloc enfant
+        :rtype: List[str]
+        """
+        return self._children.assignedVariablesNames()
+
+    def extractInvariants(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> None:
+        """Remplace dans la condition et dans le bloc enfant les sous-expressions
+        invariantes par des variables temporaires
+
+        :param assigned: noms des variables modifiées dans la boucle
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        """
+        self._condition = self._condition.extractInvariantsClone(assigned, extract)
+        for node in self._children:
+            node.extractInvariants(assigned, extract)
+
+    def hoistLoopInvariants(self, temps:Dict[str, Variable]) -> List['StructureNode']:
+        """Traite les boucles du bloc enfant
+
+        :param temps: variables temporaires déjà créées, indexées par l'expression qu'elles contiennent
+        :type temps: Dict[str, Variable]
+        :return: noeuds à placer avant ce noeud, aucun pour un if
+        :rtype: List[StructureNode]
+        """
+        self._children.hoistLoopInvariants(temps)
+        return []
+
+    def optimizeConditions(self) -> None:
+        """Demande une compilation optimisée de la condition et des conditions du bloc enfant
+        """
+        self._optimizeCondition = True
+        self._children.optimizeConditions()
+
     def _decomposeCondition(self, csl:List[Operator], cibleOUI:'StructureNode', cibleNON:'StructureNode') -> 'StructureNodeList':
         """Décompose un condition complexe, contenant des and, not, or,
         en un ensemble de branchement conditionnels, les opérations logiques
@@ -228,6 +635,8 @@ class IfNode(StructureNode):
 
         # La condition va entraîner un branchement conditionnel. C'est le cas NON qui provoque le branchement.
         conditionInverse = self._condition.logicNegateClone()
+        if self._optimizeCondition:
+            return self._optimizedDecomposeCondition(csl, conditionInverse, cibleOUI, cibleNON)
         return self._recursiveDecomposeComplexeCondition(csl, conditionInverse, cibleOUI, cibleNON)
 
     def _recursiveDecomposeComplexeCondition(self, csl:List[Operator], conditionSaut:Union[LogicExpressionNode, ComparaisonExpressionNode], cibleDirecte:'StructureNode', cibleSautCond:'StructureNode') -> 'StructureNodeList':
@@ -280,6 +689,120 @@ class IfNode(StructureNode):
             return enfant1
         raise AttributeError("Noeud de condition {} pas pris en charge.".format(conditionSaut), {"lineNumber": self._lineNumber})
 
+    def _optimizedDecomposeCondition(self, csl:List[Operator], conditionSaut:Union[LogicExpressionNode, ComparaisonExpressionNode], cibleDirecte:'StructureNode', cibleSautCond:'StructureNode', suivant:Optional['StructureNode'] = None) -> 'StructureNodeList':
+        """Version de _recursiveDecomposeComplexeCondition utilisée quand la passe optimizeConditions
+        a été appliquée : ordre des opérandes selon leur coût, forme des sauts choisie selon le noeud suivant
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        :param conditionSaut: condition du saut conditionnel
+        :type conditionSaut: Union[LogicExpressionNode, ComparaisonExpressionNode]
+        :param cibleDirecte: cible en déroulement normal, càd condition fausse => pas de saut
+        :type cibleDirecte: StructureNode
+        :param cibleSautCond: cible du saut conditionnel, si la condition est vraie
+        :type cibleSautCond: StructureNode
+        :param suivant: noeud placé immédiatement après les branchements produits, cibleDirecte par défaut
+        :type suivant: Optional[StructureNode]
+        :return: version linéaire de la condition, faite de branchements
+        :rtype: StructureNodeList
+
+        .. note:: Pour and et or, les deux ordres d'évaluation des opérandes sont essayés
+            et on retient celui dont le coût estimé est le plus faible. Si l'un des opérandes
+            peut échouer, une division par zéro par exemple, l'ordre du programme est conservé :
+            l'autre opérande peut justement servir de garde.
+        """
+        if suivant is None:
+            suivant = cibleDirecte
+        if isinstance(conditionSaut, ComparaisonExpressionNode):
+            # c'est un test élémentaire
+            return self._elementaryJumps(csl, conditionSaut, cibleDirecte, cibleSautCond, suivant)
+        # sinon il faut décomposer la condition en conditions élémentaires
+        if isinstance(conditionSaut, NotNode):
+            conditionEnfant = conditionSaut.operand
+            return self._optimizedDecomposeCondition(csl, conditionEnfant, cibleSautCond, cibleDirecte, suivant)
+
+        if isinstance(conditionSaut, (AndNode, OrNode)):
+            conditionEnfant1, conditionEnfant2 = conditionSaut.operands
+            meilleurScore:Optional[float] = None
+            meilleureListe = StructureNodeList([])
+            ordres = [(conditionEnfant1, conditionEnfant2)]
+            if not (conditionEnfant1.mayFail() or conditionEnfant2.mayFail()):
+                ordres.append((conditionEnfant2, conditionEnfant1))
+            for premier, second in ordres:
+                liste = self._decomposeBinaryCondition(csl, isinstance(conditionSaut, AndNode), premier, second, cibleDirecte, cibleSautCond, suivant)
+                # le second opérande n'est évalué qu'une fois sur deux en moyenne
+                score = premier.evaluationCost() + second.evaluationCost() / 2 + liste.jumpsCount(suivant)
+                if meilleurScore is None or score < meilleurScore:
+                    meilleurScore = score
+                    meilleureListe = liste
+            return meilleureListe
+        raise AttributeError("Noeud de condition {} pas pris en charge.".format(conditionSaut), {"lineNumber": self._lineNumber})
+
+    def _decomposeBinaryCondition(self, csl:List[Operator], isAnd:bool, conditionEnfant1:Union[LogicExpressionNode, ComparaisonExpressionNode], conditionEnfant2:Union[LogicExpressionNode, ComparaisonExpressionNode], cibleDirecte:'StructureNode', cibleSautCond:'StructureNode', suivant:'StructureNode') -> 'StructureNodeList':
+        """Décomposition d'un and ou d'un or, conditionEnfant1 étant évaluée en premier
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        :param isAnd: vrai pour un and, faux pour un or
+        :type isAnd: bool
+        :param conditionEnfant1: condition évaluée en premier
+        :type conditionEnfant1: Union[LogicExpressionNode, ComparaisonExpressionNode]
+        :param conditionEnfant2: condition évaluée en second
+        :type conditionEnfant2: Union[LogicExpressionNode, ComparaisonExpressionNode]
+        :param cibleDirecte: cible en déroulement normal, càd condition fausse => pas de saut
+        :type cibleDirecte: StructureNode
+        :param cibleSautCond: cible du saut conditionnel, si la condition est vraie
+        :type cibleSautCond: StructureNode
+        :param suivant: noeud placé immédiatement après les branchements produits
+        :type suivant: StructureNode
+        :return: version linéaire de la condition, faite de branchements
+        :rtype: StructureNodeList
+        """
+        enfant2 = self._optimizedDecomposeCondition(csl, conditionEnfant2, cibleDirecte, cibleSautCond, suivant)
+        if enfant2.head is None:
+            return self._optimizedDecomposeCondition(csl, conditionEnfant1, cibleDirecte, cibleSautCond, suivant)
+        teteEnfant2 = cast(StructureNode, enfant2.head)
+        if isAnd:
+            enfant1 = self._optimizedDecomposeCondition(csl, conditionEnfant1, cibleDirecte, teteEnfant2, teteEnfant2)
+        else:
+            enfant1 = self._optimizedDecomposeCondition(csl, conditionEnfant1, teteEnfant2, cibleSautCond, teteEnfant2)
+        enfant1.append(enfant2)
+        return enfant1
+
+    def _elementaryJumps(self, csl:List[Operator], conditionSaut:ComparaisonExpressionNode, cibleDirecte:'StructureNode', cibleSautCond:'StructureNode', suivant:'StructureNode') -> 'StructureNodeList':
+        """Branchements pour une comparaison élémentaire : un saut conditionnel suivi d'un saut inconditionnel.
+        Parmi les formes permises par csl, on choisit celle dont le saut inconditionnel
+        vise le noeud suivant, ce saut pouvant alors être supprimé.
+
+        :param csl: liste des comparaisons permises par le processeur utilisé
+        :type csl: List[Operator]
+        :param conditionSaut: condition du saut conditionnel
+        :type conditionSaut: ComparaisonExpressionNode
+        :param cibleDirecte: cible si la condition est fausse
+        :type cibleDirecte: StructureNode
+        :param cibleSautCond: cible si la condition est vraie
+        :type cibleSautCond: StructureNode
+        :param suivant: noeud placé immédiatement après les branchements produits
+        :type suivant: StructureNode
+        :return: saut conditionnel et saut inconditionnel
+        :rtype: StructureNodeList
+        """
+        conditionAjustee = conditionSaut.adjustConditionClone(csl)
+        if conditionAjustee.inversed:
+            formes = [(cibleDirecte, conditionAjustee.logicNegateClone(), cibleSautCond)]
+        else:
+            formes = [(cibleSautCond, conditionAjustee, cibleDirecte)]
+        directe = conditionSaut.logicNegateClone().logicNegateAdjustedClone(csl)
+        if not directe is None:
+            formes.append((cibleSautCond, directe, cibleDirecte))
+        negation = conditionSaut.logicNegateAdjustedClone(csl)
+        if not negation is None:
+            formes.append((cibleDirecte, negation, cibleSautCond))
+        cible, condition, autreCible = next((forme for forme in formes if forme[2] is suivant), formes[0])
+        sautConditionnel = JumpNode(self._lineNumber, cible, condition)
+        sautOui = JumpNode(self._lineNumber, autreCible)
+        return StructureNodeList([sautConditionnel, sautOui])
+
     def _getLinearStructureList(self, csl:List[Operator]) -> 'StructureNodeList':
         """Production de la version linéaire pour l'ensemble du noeud If.
         Cela comprend :
@@ -345,6 +868,44 @@ class IfElseNode(IfNode):
         elseChildrenStr = self._elseChildren.tabulatedStr()
         return "{}\tif {} {{\n{}\n\t}} else {{\n{}\n\t}}".format(self.labelToStr(), self._condition, childrenStr, elseChildrenStr)
 
+    def assignedVariablesNames(self) -> List[str]:
+        """
+        :return: noms des variables modifiées dans les blocs if et else
+        :rtype: List[str]
+        """
+        names = super().assignedVariablesNames()
+        return names + [name for name in self._elseChildren.assignedVariablesNames() if not name in names]
+
+    def extractInvariants(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> None:
+        """Remplace dans la condition et dans les blocs if et else les sous-expressions
+        invariantes par des variables temporaires
+
+        :param assigned: noms des variables modifiées dans la boucle
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        """
+        super().extractInvariants(assigned, extract)
+        for node in self._elseChildren:
+            node.extractInvariants(assigned, extract)
+
+    def hoistLoopInvariants(self, temps:Dict[str, Variable]) -> List['StructureNode']:
+        """Traite les boucles des blocs if et else
+
+        :param temps: variables temporaires déjà créées, indexées par l'expression qu'elles contiennent
+        :type temps: Dict[str, Variable]
+        :return: noeuds à placer avant ce noeud, aucun pour un if
+        :rtype: List[StructureNode]
+        """
+        self._elseChildren.hoistLoopInvariants(temps)
+        return super().hoistLoopInvariants(temps)
+
+    def optimizeConditions(self) -> None:
+        """Demande une compilation optimisée des conditions, blocs if et else compris
+        """
+        self._elseChildren.optimizeConditions()
+        super().optimizeConditions()
+
     def _getLinearStructureList(self, csl:List[Operator]) -> 'StructureNodeList':
         """Production de la version linéaire pour l'ensemble du noeud If Else.
         Cela comprend :
@@ -403,6 +964,35 @@ class WhileNode(IfNode):
         childrenStr = self._children.tabulatedStr()
         return "{}\twhile {} {{\n{}\n\t}}".format(self.labelToStr(), self._condition, childrenStr)
 
+    def hoistLoopInvariants(self, temps:Dict[str, Variable]) -> List['StructureNode']:
+        """Les sous-expressions de la condition et du bloc enfant qui ne dépendent
+        d'aucune variable modifiée dans la boucle sont calculées une seule fois,
+        avant la boucle, et stockées dans des variables temporaires.
+        Les boucles internes sont ensuite traitées.
+
+        :param temps: variables temporaires déjà créées, indexées par l'expression qu'elles contiennent
+        :type temps: Dict[str, Variable]
+        :return: affectations des variables temporaires, à placer avant la boucle
+        :rtype: List[StructureNode]
+
+        .. note:: Les noms des temporaires commencent par _ et ne peuvent donc pas
+            entrer en conflit avec une variable du programme.
+        """
+        assigned = self.assignedVariablesNames()
+        affectations:Dict[str, TransfertNode] = {}
+
+        def extract(expression:ArithmeticExpressionNode) -> Variable:
+            key = str(expression)
+            if not key in temps:
+                temps[key] = Variable.add("_inv{}".format(len(temps) + 1))
+            if not key in affectations:
+                affectations[key] = TransfertNode(self._lineNumber, temps[key], expression)
+            return temps[key]
+
+        self.extractInvariants(assigned, extract)
+        self._children.hoistLoopInvariants(temps)
+        return list(affectations.values())
+
     def _getLinearStructureList(self, csl:List[str]) -> 'StructureNodeList':
         """Production de la version linéaire pour l'ensemble du noeud While.
         Cela comprend :
@@ -497,6 +1087,26 @@ class TransfertNode(StructureNode):
         """
         return self._cible
 
+    def assignedVariablesNames(self) -> List[str]:
+        """
+        :return: nom de la variable cible, affectation ou saisie
+        :rtype: List[str]
+        """
+        if self._cible is None:
+            return []
+        return [self._cible.name]
+
+    def extractInvariants(self, assigned:List[str], extract:Callable[[ArithmeticExpressionNode], Variable]) -> None:
+        """Remplace dans l'expression les sous-expressions invariantes par des variables temporaires
+
+        :param assigned: noms des variables modifiées dans la boucle
+        :type assigned: List[str]
+        :param extract: fonction recevant une sous-expression invariante et renvoyant la variable qui la remplace
+        :type extract: Callable[[ArithmeticExpressionNode], Variable]
+        """
+        if not self._expression is None:
+            self._expression = self._expression.extractInvariantsClone(assigned, extract)
+
     def __str__(self) -> str:
         """Transtypage -> str
 
@@ -561,6 +1171,14 @@ class JumpNode(StructureNode):
         """
         self._cible = cible
 
+    def setCondition(self, condition:Optional[ComparaisonExpressionNode]) -> None:
+        """Assigne une nouvelle condition
+
+        :param condition: nouvelle condition, None pour un saut inconditionnel
+        :type condition: Optional[ComparaisonExpressionNode]
+        """
+        self._condition = condition
+
     def getCondition(self) -> Optional[ComparaisonExpressionNode]:
         """Accesseur
 
@@ -27,15 +27,18 @@ class LineTest(unittest.TestCase):
         good = "\n".join([
             "	@x r3 load",
             "	@#2 r2 load",
-            "	r3 r2 r3 *",
+            "	r3 r2 r0 *",
+            "	r0 r3 move",
             "	@#4 r2 load",
-            "	r3 r2 r3 +",
+            "	r3 r2 r0 +",
+            "	r0 r3 move",
             "	@#5 r2 load",
-            "	r3 r2 r3 *",
+            "	r3 r2 r0 *",
+            "	r0 r3 move",
             "	@x r2 load",
             "	@y r1 load",
-            "	r2 r1 r2 *",
-            "	r3 r2 r3 -"
+            "	r2 r1 r0 *",
+            "	r3 r0 r0 -"
         ])
         
         self.assertEqual(str(actions), good)
@@ -77,38 +80,41 @@ class LineTest(unittest.TestCase):
         good = "\n".join([
             "	@#4 r3 load",
             "	@#2 r2 load",
-            "	r3 r2 r3 +",
+            "	r3 r2 r0 +",
+            "	r0 r3 move",
             "	@#4 r2 load",
             "	@#1 r1 load",
-            "	r2 r1 r2 +",
-            "	r3 r2 r3 *",
-            "	@#4 r2 load",
+            "	r2 r1 r0 +",
+            "	r3 r0 r0 *",
+            "	r0 r3 move",
             "	@#2 r1 load",
-            "	r2 r1 r2 +",
+            "	r2 r1 r0 +",
+            "	r0 r2 move",
             "	@#4 r1 load",
             "	@#1 r0 load",
-            "	r1 r0 r1 +",
-            "	r2 r1 r2 *",
-            "	r3 r2 r3 -",
-            "	@#4 r2 load",
-            "	@#2 r1 load",
-            "	r2 r1 r2 +",
-            "	@#4 r1 load",
+            "	r1 r0 r0 +",
+            "	r2 r0 r0 *",
+            "	r3 r0 r0 -",
+            "	r0 r3 move",
+            "	@#2 r2 load",
+            "	r1 r2 r0 +",
+            "	r0 r2 move",
             "	@#1 r0 load",
-            "	r1 r0 r1 +",
-            "	r2 r1 r2 *",
-            "	@#4 r1 load",
+            "	r1 r0 r0 +",
+            "	r2 r0 r0 *",
+            "	r0 r2 move",
             "	@#2 r0 load",
-            "	r1 r0 r1 +",
+            "	r1 r0 r0 +",
+            "	r0 r1 move",
             "	@#4 r0 load",
             "	r3 _m0 store",
             "	r0 r3 move",
             "	@#1 r0 load",
-            "	r3 r0 r3 +",
-            "	r1 r3 r3 *",
-            "	r2 r3 r3 -",
-            "	_m0 r2 load",
-            "	r2 r3 r3 *"
+            "	r3 r0 r0 +",
+            "	r1 r0 r0 *",
+            "	r2 r0 r0 -",
+            "	_m0 r3 load",
+            "	r3 r0 r0 *"
         ])
         
         self.assertEqual(str(actions), good)
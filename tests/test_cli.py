@@ -0,0 +1,103 @@
+"""
+.. module:: tests.test_cli
+:synopsis: Test de l'interface en ligne de commande
+"""
+
+import unittest
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+
+from modules.cli import main
+
+CODE = "\n".join([
+    "n = input()",
+    "s = 0",
+    "while n > 0:",
+    "    s = s + n",
+    "    n = n - 1",
+    "print(s)",
+    ""
+])
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix=".code")
+        with os.fdopen(handle, "w") as codeFile:
+            codeFile.write(CODE)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def call(self, *args):
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            code = main(list(args))
+        return code, out.getvalue()
+
+    def test1(self):
+        for engine in ("12", "16"):
+            for mode in ("translated", "step"):
+                code, out = self.call("run", self.filename, "--engine", engine, "--input", "10", "--mode", mode, "--json")
+                self.assertEqual(code, 0)
+                result = json.loads(out)
+                self.assertEqual(result["state"], "halt")
+                self.assertEqual(result["output"], [55])
+                self.assertEqual(result["variables"], {"n": 0, "s": 55})
+        self.assertEqual(result["counters"]["instructions"] * 3 < result["counters"]["cycles"], True)
+
+    def test2(self):
+        code, out = self.call("run", self.filename, "--json")
+        self.assertEqual(json.loads(out)["state"], "waiting_input")
+        code, out = self.call("run", self.filename, "--input", "1000", "--mode", "step", "--max-cycles", "50", "--json")
+        result = json.loads(out)
+        self.assertEqual((result["state"], result["counters"]["cycles"]), ("limit", 50))
+        code, out = self.call("run", self.filename, "--input", "4")
+        self.assertEqual((code, out), (0, "10\n"))
+
+    def test3(self):
+        code, out = self.call("compile", self.filename, "--json")
+        result = json.loads(out)
+        self.assertEqual(len(result["binary"]), result["instructions"] + len(result["variables"]))
+        code, out = self.call("compile", self.filename + ".absent")
+        self.assertEqual(code, 1)
+        code, out = self.call("bench", self.filename, "--input", "5", "--repeat", "1", "--json")
+        result = json.loads(out)
+        self.assertEqual(sorted(result["runSeconds"]), ["step", "translated"])
+        self.assertEqual(sorted(result["startupSeconds"]), sorted(["interpreter", "modules.cli", "modules.exec.executeur", "modules.program"]))
+
+    def test4(self):
+        # l'import de la ligne de commande ne charge ni l'interface graphique, ni l'exécuteur,
+        # ni les modèles de processeur ; la compilation ne charge que le modèle demandé
+        script = "; ".join([
+            "import sys",
+            "import modules.cli",
+            "loaded = lambda: sorted(name for name in ('tkinter', 'multiprocessing', 'modules.exec.executeur', 'modules.engine.processor12bits', 'modules.engine.processor16bits') if name in sys.modules)",
+            "print(loaded())",
+            "modules.cli.Program('x = 1', '12')",
+            "print(loaded())"
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out, "[]\n['modules.engine.processor12bits']\n")
+
+    def test5(self):
+        # une première saisie négative n'est pas prise pour une option
+        with open(self.filename, "w") as codeFile:
+            codeFile.write("a = input()\nb = input()\nprint(a - b)\n")
+        for args, good in ((("--input", "-7,2"), "-9\n"), (("--input=-7,2",), "-9\n"), (("--input", "-7,-2", "--engine", "12"), "-5\n")):
+            code, out = self.call("run", self.filename, *args)
+            self.assertEqual((code, out), (0, good))
+
+    def test6(self):
+        # lecteur fermé avant la fin de la sortie, comme upsim compile ... | head
+        class ClosedPipe(io.StringIO):
+            def write(self, text):
+                raise BrokenPipeError()
+        with redirect_stdout(ClosedPipe()), redirect_stderr(io.StringIO()):
+            code = main(["compile", self.filename])
+        self.assertEqual(code, 1)
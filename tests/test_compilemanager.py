@@ -161,4 +161,41 @@ class MyTest(unittest.TestCase):
             "	r7 print",
             "	halt"
         ])
-        self.assertEqual(strGlobal, good)
\ No newline at end of file
+        self.assertEqual(strGlobal, good)
+
+    def test4(self):
+        engine = Processor16Bits()
+        cm = CM(engine, CP.parse(code="x=input()\nif x < 10 or x == 20:\n    print(x)\n"), 2)
+        asm = engine.getAsm(cm.compile())
+        good = "\n".join([
+            "	INPUT @x",
+            "	LOAD r7, @x",
+            "	MOVE r6, #10",
+            "	CMP r7, r6",
+            "	BLT Lab1",
+            "	MOVE r6, #20",
+            "	CMP r7, r6",
+            "	BNE Lab2",
+            "Lab1	LOAD r7, @x",
+            "	PRINT r7",
+            "Lab2	HALT"
+        ])
+        self.assertEqual(asm, good)
+
+    def test5(self):
+        engine = Processor12Bits()
+        cm = CM(engine, CP.parse(code="x=input()\nif x < 10 or x == 10:\n    print(x)\n"), 2)
+        asm = engine.getAsm(cm.compile())
+        good = "\n".join([
+            "	INPUT @x",
+            "	LOAD r3, @x",
+            "	LOAD r2, @#10",
+            "	CMP r3, r2",
+            "	BLT Lab1",
+            "	BEQ Lab1",
+            "	JMP Lab2",
+            "Lab1	LOAD r3, @x",
+            "	PRINT r3",
+            "Lab2	HALT"
+        ])
+        self.assertEqual(asm, good)
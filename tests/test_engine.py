@@ -4,7 +4,11 @@
 """
 
 import unittest
+import json
+import os
+import tempfile
 
+from modules.errors import CompilationError
 from modules.primitives.variable import Variable
 from modules.primitives.register import Register
 from modules.primitives.litteral import Litteral
@@ -13,6 +17,10 @@ from modules.primitives.operators import Operators
 
 from modules.engine.processor16bits import Processor16Bits
 from modules.engine.processor12bits import Processor12Bits
+from modules.engine import registry
+from modules.engine.isa import IsaDescription, Instruction
+from modules.engine import processor12bits, processor16bits
+from modules.exec.executeur import Executeur
 
 
 from modules.compilemanager import CompilationManager as CM
@@ -332,11 +340,11 @@ class BinaryCompleteTest(unittest.TestCase):
             "100110010111",
             "100100011001",
             "111110001110",
-            "101001011111",
+            "101001011100",
             "100110010110",
             "100100010111",
             "111110001110",
-            "101001011011",
+            "101001011000",
             "000100000100",
             "100110010110",
             "010000000011",
@@ -348,3 +356,89 @@ class BinaryCompleteTest(unittest.TestCase):
             "000000000001"
         ])
         self.assertEqual(binaryCode, good)
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.engines = dict(registry.ENGINES)
+
+    def tearDown(self):
+        registry.ENGINES.clear()
+        registry.ENGINES.update(self.engines)
+        registry._instances.clear()
+
+    def test1(self):
+        engine = registry.getEngine("16")
+        self.assertIs(registry.getEngine("16"), engine)
+        self.assertIsInstance(engine, Processor16Bits)
+        self.assertEqual(registry.engineLabel("12"), "12 bits")
+        with self.assertRaises(CompilationError):
+            registry.getEngine("absent")
+
+    def test2(self):
+        handle, filename = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as configFile:
+            json.dump({"petit": {"class": "modules.engine.processor12bits:Processor12Bits", "label": "petit modèle"}, "faux": "modules.absent:Absent"}, configFile)
+        try:
+            registry.loadConfig(filename)
+        finally:
+            os.remove(filename)
+        self.assertIsInstance(registry.getEngine("petit"), Processor12Bits)
+        self.assertEqual(registry.engineLabel("petit"), "petit modèle")
+        with self.assertRaises(CompilationError):
+            registry.getEngine("faux")
+
+    def test3(self):
+        # les instructions décodées sont partagées par toutes les instances d'un modèle
+        word = int("0110000001010011", 2)
+        decoded = Processor16Bits().instructionDecode(word)
+        self.assertIs(Processor16Bits().instructionDecode(word), decoded)
+        self.assertEqual(decoded, Processor16Bits().instructionDecode("0110000001010011"))
+        self.assertEqual(decoded["operator"], Operators.ADD)
+        self.assertIsNot(Processor12Bits().instructionDecode(0), Processor16Bits().instructionDecode(0))
+
+def widen(instruction:Instruction, extra:int) -> Instruction:
+    # adresses élargies de extra bits, ou bits inutilisés ajoutés après l'opcode
+    hasAddress = any([letter in "va" for letter, width in instruction.fields])
+    fields = ["{}{}".format(letter, width + extra if letter in "va" else width) for letter, width in instruction.fields]
+    padding = instruction.padding + (0 if hasAddress else extra)
+    text = " ".join((["x{}".format(padding)] if padding > 0 else []) + fields)
+    if instruction.comparator is None:
+        return Instruction(instruction.operator, instruction.mnemonic, instruction.opcode, text)
+    branch = "{} a{}".format(instruction.branchOpcode, instruction.branchField[1] + extra)
+    return Instruction(instruction.operator, instruction.mnemonic, instruction.opcode, text, comparator=instruction.comparator, branch=branch)
+
+class IsaTest(unittest.TestCase):
+    def test1(self):
+        self.assertEqual(processor16bits.ISA.check(), [])
+        self.assertEqual(processor12bits.ISA.check(), [])
+        # la comparaison est décodée après les sauts conditionnels, comme dans les tables d'origine
+        self.assertEqual([item.pattern for item in processor16bits.ISA.decodeurs()[-5:]], ["0001000#########", "0001001#########", "0001010#########", "0001011#########", "00011XXXXX######"])
+        self.assertEqual([item.pattern for item in processor12bits.ISA.decodeurs()[-3:]], ["0010########", "0011########", "11110101####"])
+
+    def test2(self):
+        # HALT codé sur 4 bits avant JMP : les sauts se décodent en HALT
+        isa = IsaDescription("faux", 16, 3, True, (0, 0), [], [
+            Instruction(Operators.HALT, "HALT", "0000", "x12"),
+            Instruction(Operators.GOTO, "JMP", "00001", "a11")
+        ])
+        self.assertEqual(len(isa.check()), 3)
+        with self.assertRaises(CompilationError):
+            IsaDescription("faux", 16, 3, True, (0, 0), [], [Instruction(Operators.HALT, "HALT", "0000", "x8")])
+
+    def test3(self):
+        isa = processor16bits.ISA
+        isa24 = IsaDescription("Processeur 24 bits", 24, isa.registerBits, isa.freeUalOutput, isa.litteralDomain, isa.comparators, [widen(item, 8) for item in isa.instructions])
+        self.assertEqual(isa24.check(), [])
+        engine = isa24.engineClass("Processor24Bits", __name__)()
+        binary = engine.getBinary(CM(engine, CP.parse(code="n = input()\ns = 0\nwhile n > 0:\n    s = s + n\n    n = n - 1\nprint(s)\n")).compile())
+        self.assertEqual(len(binary[0]), 24)
+        executeur = Executeur(engine, binary)
+        executeur.bufferize(1000)
+        self.assertEqual(executeur.translatedRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['500500'])
+
+    def test4(self):
+        table = processor12bits.ISA.opcodeTable().split("\n")
+        self.assertEqual(len(table), 20)
+        self.assertEqual(table[-5:], ["HALT    : 0000XXXXXXXX", "JMP     : 0001########", "CMP     : 11110101####", "BEQ     : 0010########", "BLT     : 0011########"])
+        self.assertIn("STORE   : 0111############", processor16bits.ISA.opcodeTable().split("\n"))
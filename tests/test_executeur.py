@@ -0,0 +1,678 @@
+"""
+.. module:: tests.test_executeur
+:synopsis: Test de l'exécution du code binaire, pas à pas et par blocs traduits
+"""
+
+import unittest
+from typing import List, Tuple
+import pickle
+import asyncio
+import io
+
+from modules.engine.processor16bits import Processor16Bits
+from modules.engine.processor12bits import Processor12Bits
+from modules.engine.processorengine import ProcessorEngine
+from modules.compilemanager import CompilationManager as CM
+from modules.passmanager import PassManager
+from modules.parser.code import CodeParser as CP
+from modules.exec.executeur import Executeur
+from modules.engine.addressmap import AddressMap
+from modules.exec.translator import BlockTranslator
+from modules.exec.asyncexecuteur import AsyncExecuteur
+from modules.exec.processexecuteur import ProcessExecuteur
+from modules.exec.components import RingSink, StreamSink, CallbackSink, StreamSource, QueueSource, DataValue, UalComponent, wordSpec
+from modules.exec.batchexecuteur import BatchExecuteur, np
+from modules.exec.eventbus import EventBus
+from modules.errors import ExecutionError
+
+CODE = "\n".join([
+    "n = input()",
+    "i = 0",
+    "s = 0",
+    "while i < n:",
+    "    i = i + 1",
+    "    if i % 3 == 0 or i > 7:",
+    "        s = s + i * 2",
+    "    else:",
+    "        s = s - 1",
+    "print(s)",
+    "m = input()",
+    "print(m*(~s))",
+    ""
+])
+
+def compileCode(engine:ProcessorEngine, code:str = CODE, level:int = PassManager.DEFAULT_LEVEL) -> Tuple[List[str], AddressMap]:
+    fifos = CM(engine, CP.parse(code=code), level).compile()
+    return engine.getBinary(fifos), engine.getAddressMap(fifos)
+
+def state(executeur:Executeur):
+    return (
+        executeur.screen.getStringList('dec'),
+        [item.intValue for item in executeur.registers.content],
+        [item.intValue for item in executeur.memory.content],
+        executeur.linePointer.intValue,
+        executeur.ual.isZero,
+        executeur.ual.isPos
+    )
+
+class ExecuteurTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine)
+        executeur = Executeur(engine, binary)
+        executeur.bufferize(10)
+        self.assertEqual(executeur.nonStopRun(), -2)
+        executeur.bufferize(3)
+        self.assertEqual(executeur.nonStopRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['67', '-204'])
+
+    def test2(self):
+        for engine in (Processor16Bits(), Processor12Bits()):
+            binary, _ = compileCode(engine)
+            stepByStep = Executeur(engine, binary)
+            translated = Executeur(engine, binary)
+            for executeur in (stepByStep, translated):
+                executeur.bufferize(40)
+            self.assertEqual(stepByStep.nonStopRun(), -2)
+            self.assertEqual(translated.translatedRun(), -2)
+            self.assertEqual(state(stepByStep), state(translated))
+            for executeur in (stepByStep, translated):
+                executeur.bufferize(5)
+            self.assertEqual(stepByStep.nonStopRun(), -1)
+            self.assertEqual(translated.translatedRun(), -1)
+            self.assertEqual(state(stepByStep), state(translated))
+
+    def test3(self):
+        # la division n'est évaluée que si le diviseur est non nul, à tous les niveaux
+        code = "a = input()\nb = input()\nif ((b*3+a*2) != 0) and (a / b > 0):\n    print(2)\n"
+        for engine in (Processor16Bits(), Processor12Bits()):
+            for level in PassManager.LEVELS:
+                binary, _ = compileCode(engine, code, level)
+                for inputs, good in (([0, 0], []), ([3, 1], ['2']), ([-3, 2], [])):
+                    executeur = Executeur(engine, binary)
+                    executeur.bufferizeMany(inputs)
+                    self.assertEqual(executeur.nonStopRun(), -1)
+                    self.assertEqual(executeur.screen.getStringList('dec'), good)
+
+class TimedRunTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine)
+        reference = Executeur(engine, binary)
+        reference.bufferize(40)
+        reference.bufferize(5)
+        reference.nonStopRun()
+        executeur = Executeur(engine, binary)
+        writes = []
+        executeur.memory.bind("onwrite", writes.append)
+        executeur.bufferize(40)
+        executeur.bufferize(5)
+        stepped = Executeur(engine, binary)
+        stepped.bufferize(40)
+        for _ in range(100):
+            steppedState = stepped.step()
+        executeur.setComponentsMuted(True)
+        self.assertEqual(executeur.timedRun(10, maxSteps=100), steppedState)
+        self.assertEqual(state(executeur), state(stepped))
+        self.assertEqual(writes, [])
+        executeur.setComponentsMuted(False)
+        while executeur.timedRun(0.001) >= 0:
+            pass
+        self.assertEqual(state(executeur), state(reference))
+        self.assertNotEqual(writes, [])
+
+class TranslatorTest(unittest.TestCase):
+    # 16 bits : r1 ← 8193, codage de PRINT r1, écrit à l'adresse 6 avant d'y être exécuté
+    BINARY = [
+        "0100100100100000", # MOVE r1, #32
+        "1010001001010000", # MULT r1, r1, #16
+        "1010001001010000", # MULT r1, r1, #16
+        "1000001001000001", # ADD r1, r1, #1
+        "0111000000110001", # STORE @6, r1
+        "0010000000000001", # PRINT r1
+        "0000000000000000", # HALT, remplacé par PRINT r1
+        "0000000000000000"  # HALT
+    ]
+
+    def test1(self):
+        engine = Processor16Bits()
+        stepByStep = Executeur(engine, self.BINARY)
+        translated = Executeur(engine, self.BINARY)
+        self.assertEqual(stepByStep.nonStopRun(), -1)
+        self.assertEqual(translated.translatedRun(), -1)
+        self.assertEqual(translated.screen.getStringList('dec'), ['8193', '8193'])
+        self.assertEqual(state(stepByStep), state(translated))
+
+    def test2(self):
+        translator = BlockTranslator(Processor16Bits())
+        memory = [int(item, 2) for item in self.BINARY]
+        outputs = []
+        translator.run(0, [0]*8, memory, [True, True], [], outputs)
+        self.assertEqual(translator.blocksCount, 2)
+        self.assertEqual(translator.getBlock(0, memory).size, 6)
+        translator.invalidate(7)
+        self.assertEqual(translator.blocksCount, 1)
+        translator.invalidate(3)
+        self.assertEqual(translator.blocksCount, 0)
+
+    def test3(self):
+        # les écritures faites composants muets invalident aussi les blocs traduits
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, "i = 0\nwhile i < 1000:\n    i = i + 1\nprint(i)\n")
+        halted = [int(item, 2) for item in binary]
+        halted[8] = 0 # ADD r7, r7, #1 remplacé par HALT
+        for write in (lambda executeur: executeur.memory.write(8, 0), lambda executeur: executeur.memory.setContent(halted)):
+            executeur = Executeur(engine, binary)
+            self.assertEqual(executeur.translatedRun(50), 0)
+            executeur.setComponentsMuted(True)
+            write(executeur)
+            executeur.setComponentsMuted(False)
+            self.assertEqual(executeur.translatedRun(), -1)
+            self.assertEqual(executeur.screen.getStringList('dec'), [])
+
+class SnapshotTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor12Bits()
+        binary, _ = compileCode(engine)
+        reference = Executeur(engine, binary)
+        executeur = Executeur(engine, binary)
+        for item in (reference, executeur):
+            item.bufferize(12)
+            for _ in range(301):
+                item.step()
+        snapshot = executeur.snapshot()
+        copies = [Executeur.fromSnapshot(engine, snapshot), pickle.loads(pickle.dumps(executeur))]
+        self.assertEqual(reference.nonStopRun(), -2)
+        reference.bufferize(2)
+        reference.nonStopRun()
+        for item in copies:
+            self.assertEqual(item.snapshot(), snapshot)
+            self.assertEqual(item.nonStopRun(), -2)
+            item.bufferize(2)
+            item.nonStopRun()
+            self.assertEqual(state(item), state(reference))
+
+    def test2(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine)
+        executeur = Executeur(engine, binary)
+        executeur.bufferize(4)
+        self.assertEqual(executeur.translatedRun(), -2)
+        snapshot = executeur.snapshot()
+        executeur.bufferize(1)
+        executeur.translatedRun()
+        executeur.restore(snapshot)
+        executeur.bufferize(2)
+        self.assertEqual(executeur.translatedRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['3', '-8'])
+        with self.assertRaises(ExecutionError):
+            Executeur.fromSnapshot(Processor12Bits(), snapshot)
+        with self.assertRaises(ExecutionError):
+            executeur.restore(snapshot[:20])
+
+    def test3(self):
+        engine = Processor16Bits()
+        binary, addressMap = compileCode(engine)
+        executeur = Executeur(engine, binary)
+        executeur.setAddressMap(addressMap)
+        executeur.addLineBreakpoint(11)
+        executeur.addVariableWatchpoint("m")
+        executeur.enableUndo(50)
+        executeur.addInputSource([4, 7, 9])
+        self.assertEqual(executeur.nonStopRun(), 0)
+        self.assertIsNotNone(executeur.breakReason)
+        snapshot = executeur.snapshot()
+        copy = Executeur.fromSnapshot(engine, snapshot)
+        self.assertEqual(copy.snapshot(), snapshot)
+        self.assertIsNone(copy.breakReason)
+        self.assertEqual(copy.breakpoints, executeur.breakpoints)
+        self.assertEqual(copy.undoCount, 50)
+        self.assertEqual(copy.inputBuffer.readCount, 1)
+        self.assertEqual((copy.screen.count, copy.screen.getStringList('dec')), (1, ['3']))
+        # l'arrêt précédent est oublié : le point d'arrêt de départ arrête à nouveau l'exécution
+        self.assertEqual(copy.nonStopRun(), 0)
+        for item in (executeur, copy):
+            self.assertEqual(item.nonStopRun(), 0)
+            self.assertTrue(item.breakReason.startswith("Surveillance"))
+        self.assertEqual(copy.snapshot(), executeur.snapshot())
+        for item in (executeur, copy):
+            item.stepBack(60)
+            self.assertEqual(item.undoCount, 0)
+        self.assertEqual(copy.snapshot(), executeur.snapshot())
+        for item in (executeur, copy):
+            item.clearStops()
+            self.assertEqual(item.nonStopRun(), -1)
+            self.assertEqual(item.inputBuffer.pop(), 9)
+        self.assertEqual(state(copy), state(executeur))
+        # l'écran est restauré dans la destination sans être transmis à nouveau
+        stream = io.StringIO()
+        streamed = Executeur(engine, binary)
+        streamed.screen.setSink(StreamSink(stream, bufferSize=1))
+        streamed.restore(snapshot)
+        streamed.screen.flush()
+        self.assertEqual((streamed.screen.count, stream.getvalue()), (1, ""))
+        ring = Executeur(engine, binary)
+        ring.screen.setSink(RingSink(4))
+        ring.restore(snapshot)
+        self.assertEqual(ring.screen.getStringList('dec'), ['3'])
+        executeur.addInputSource(value for value in (1, 2))
+        with self.assertRaises(ExecutionError):
+            executeur.snapshot()
+
+class StepBackTest(unittest.TestCase):
+    def test1(self):
+        for engine in (Processor16Bits(), Processor12Bits()):
+            binary, _ = compileCode(engine)
+            executeur = Executeur(engine, binary)
+            executeur.enableUndo()
+            executeur.bufferize(12)
+            executeur.bufferize(3)
+            snapshots = []
+            state = 0
+            while state != -1:
+                snapshots.append(executeur.snapshot())
+                state = executeur.step()
+            final = executeur.snapshot()
+            self.assertEqual(executeur.undoCount, len(snapshots))
+            for expected in reversed(snapshots):
+                executeur.stepBack()
+                self.assertEqual(executeur.snapshot(), expected)
+            self.assertEqual(executeur.undoCount, 0)
+            self.assertEqual(executeur.messages, ["Initialisation"])
+            self.assertEqual(executeur.nonStopRun(), -1)
+            self.assertEqual(executeur.snapshot(), final)
+
+    def test2(self):
+        engine = Processor16Bits()
+        executeur = Executeur(engine, TranslatorTest.BINARY)
+        with self.assertRaises(ExecutionError):
+            executeur.stepBack()
+        executeur.enableUndo(5)
+        self.assertEqual(executeur.nonStopRun(), -1)
+        self.assertEqual(executeur.undoCount, 5)
+        executeur.stepBack(4)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['8193'])
+        executeur.stepBack(10)
+        self.assertEqual(executeur.undoCount, 0)
+        self.assertEqual(executeur.nonStopRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['8193', '8193'])
+
+class BreakpointTest(unittest.TestCase):
+    def stops(self, executeur:Executeur, run):
+        stops = []
+        while run() == 0:
+            stops.append((executeur.breakReason, state(executeur)))
+        return stops
+
+    def test1(self):
+        for engine in (Processor16Bits(), Processor12Bits()):
+            binary, addressMap = compileCode(engine)
+            results = []
+            for mode in ("nonStopRun", "translatedRun"):
+                executeur = Executeur(engine, binary)
+                executeur.setAddressMap(addressMap)
+                executeur.bufferize(10)
+                executeur.bufferize(3)
+                addresses = executeur.addLineBreakpoint(7)
+                self.assertEqual(executeur.breakpoints, addresses)
+                results.append(self.stops(executeur, getattr(executeur, mode)))
+                self.assertEqual(executeur.screen.getStringList('dec'), ['67', '-204'])
+            self.assertEqual(len(results[0]), 5)
+            self.assertEqual(results[0], results[1])
+            with self.assertRaises(ExecutionError):
+                executeur.addLineBreakpoint(8)
+
+    def test2(self):
+        engine = Processor16Bits()
+        results = []
+        for mode in ("nonStopRun", "translatedRun"):
+            executeur = Executeur(engine, TranslatorTest.BINARY)
+            executeur.addWatchpoint(6)
+            executeur.addRegisterWatchpoint(1)
+            stops = self.stops(executeur, getattr(executeur, mode))
+            self.assertEqual([item[1][3] for item in stops], [1, 2, 3, 4, 5])
+            self.assertEqual(stops[-1][0], "Surveillance : mémoire 6 : 0 -> 8193")
+            results.append(stops)
+        self.assertEqual(results[0], results[1])
+
+    def test3(self):
+        engine = Processor16Bits()
+        binary, addressMap = compileCode(engine, "x = 5\nprint(x)\n")
+        for mode in ("nonStopRun", "translatedRun", "timedRun"):
+            executeur = Executeur(engine, binary)
+            executeur.setAddressMap(addressMap)
+            self.assertEqual(executeur.addLineBreakpoint(1), [0])
+            run = getattr(executeur, mode)
+            args = (1.0,) if mode == "timedRun" else ()
+            self.assertEqual(run(*args), 0)
+            self.assertEqual(executeur.breakReason, "Point d'arrêt : adresse 0, ligne 1")
+            self.assertEqual(executeur.linePointer.intValue, 0)
+            self.assertEqual(executeur.screen.getStringList('dec'), [])
+            self.assertEqual(run(*args), -1)
+            self.assertIsNone(executeur.breakReason)
+            self.assertEqual(executeur.screen.getStringList('dec'), ['5'])
+
+class AsyncExecuteurTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor12Bits()
+        binary, _ = compileCode(engine)
+        switches:List[int] = []
+
+        async def session(index:int):
+            executeur = AsyncExecuteur(engine, binary, yieldEvery=20)
+            original = executeur.translatedRun
+            def translatedRun(budget:int = 0) -> int:
+                switches.append(index)
+                return original(budget)
+            executeur.translatedRun = translatedRun
+            running = asyncio.ensure_future(executeur.run())
+            await executeur.inputs.put(10)
+            printed = await executeur.outputs.get()
+            await executeur.inputs.put(3)
+            self.assertEqual(await running, -1)
+            return [printed.toStr('dec')] + [value.toStr('dec') for value in executeur.drainOutputs()]
+
+        async def sessions():
+            return await asyncio.gather(*[session(index) for index in range(3)])
+
+        self.assertEqual(asyncio.run(sessions()), [['67', '-204']]*3)
+        # les sessions s'exécutent en alternance
+        self.assertNotEqual(switches, sorted(switches))
+
+class ProcessExecuteurTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine)
+        reference = Executeur(engine, binary)
+        reference.bufferizeMany([10, 3])
+        reference.nonStopRun()
+        with ProcessExecuteur(Executeur(engine, binary)) as remote:
+            remote.bufferize(10)
+            remote.run()
+            self.assertEqual(remote.wait(10), -2)
+            self.assertEqual(remote.readOutputs(), [67])
+            remote.bufferize(3)
+            remote.run()
+            self.assertEqual(remote.wait(10), -1)
+            self.assertEqual(remote.readOutputs(), [-204 & 0xffff])
+            view = remote.read()
+        self.assertEqual(view.state, -1)
+        self.assertFalse(view.running)
+        self.assertEqual(view.outputsCount, 2)
+        self.assertEqual(view.inputsRead, 2)
+        self.assertEqual(view.registers, [item.intValue for item in reference.registers.content])
+        self.assertEqual(view.memory, [item.intValue for item in reference.memory.content])
+        self.assertEqual(view.linePointer, reference.linePointer.intValue)
+
+    def test2(self):
+        engine = Processor12Bits()
+        binary, _ = compileCode(engine)
+        stepped = Executeur(engine, binary)
+        stepped.bufferize(40)
+        for _ in range(100):
+            stepped.step()
+        with ProcessExecuteur(Executeur(engine, binary)) as remote:
+            remote.bufferize(40)
+            remote.step(100)
+            remote.wait(10)
+            self.assertEqual(remote.read().steps, 100)
+            restored = Executeur.fromSnapshot(engine, remote.snapshot())
+        self.assertEqual(state(restored)[1:], state(stepped)[1:])
+
+class InputSourceTest(unittest.TestCase):
+    SUM = "\n".join([
+        "n = input()",
+        "s = 0",
+        "while n > 0:",
+        "    x = input()",
+        "    s = s + x",
+        "    n = n - 1",
+        "print(s)",
+        ""
+    ])
+
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, self.SUM)
+        pulled:List[int] = []
+        def values():
+            for value in range(20001):
+                pulled.append(value)
+                yield 1
+        translated = Executeur(engine, binary)
+        translated.bufferizeMany([20000])
+        translated.addInputSource(values())
+        self.assertEqual(translated.translatedRun(), -1)
+        self.assertEqual(translated.screen.getStringList('dec'), ['20000'])
+        # la dernière valeur de la source n'a jamais été demandée
+        self.assertEqual(len(pulled), 20000)
+        stepByStep = Executeur(engine, binary)
+        stepByStep.addInputSource(StreamSource(io.StringIO("3\n1 2\n")))
+        self.assertEqual(stepByStep.nonStopRun(), -2)
+        stepByStep.bufferize(4)
+        self.assertEqual(stepByStep.nonStopRun(), -1)
+        self.assertEqual(stepByStep.screen.getStringList('dec'), ['7'])
+
+    def test2(self):
+        engine = Processor12Bits()
+        binary, _ = compileCode(engine, self.SUM)
+        queue = asyncio.Queue()
+        executeur = Executeur(engine, binary)
+        executeur.addInputSource(QueueSource(queue))
+        queue.put_nowait(2)
+        self.assertEqual(executeur.translatedRun(), -2)
+        self.assertEqual(executeur.inputBuffer.readCount, 1)
+        for value in (5, 6):
+            queue.put_nowait(value)
+        self.assertEqual(executeur.translatedRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['11'])
+
+class WordSpecTest(unittest.TestCase):
+    def test1(self):
+        spec = wordSpec(6)
+        self.assertIs(spec, DataValue(6, 1).spec)
+        self.assertIs(pickle.loads(pickle.dumps(spec)), spec)
+        for a in range(64):
+            signedA = a - 64 if a >= 32 else a
+            self.assertEqual(spec.toSignInt(a), signedA)
+            self.assertEqual(DataValue(6, a).toStr('dec'), str(signedA))
+            for b in range(1, 64):
+                signedB = b - 64 if b >= 32 else b
+                self.assertEqual(spec.sub(a, b), (signedA - signedB) % 64)
+                self.assertEqual(spec.mul(a, b), (signedA * signedB) % 64)
+                self.assertEqual(spec.div(a, b), (signedA // signedB) % 64)
+                self.assertEqual(spec.mod(a, b), (signedA % signedB) % 64)
+
+    def test2(self):
+        ual = UalComponent(12)
+        for operation, expected in (("-", 4093), ("cmp", 4093), ("neg", 4094), ("~", 4093), ("*", 10), ("/", 0)):
+            ual.setOperation(operation)
+            ual.writeFirstOperand(2)
+            ual.writeSecondOperand(5)
+            result = ual.execCalc()
+            self.assertEqual(result.intValue, expected)
+            self.assertEqual((ual.isZero, ual.isPos), (expected == 0, expected < 2048))
+
+    def test3(self):
+        ual = UalComponent(16)
+        events = []
+        ual.bind("oncalc", events.append)
+        ual.setOperation("*")
+        ual.writeFirstOperand(DataValue(16, 7))
+        ual.writeSecondOperand(-3)
+        self.assertEqual(ual.calc(), 65515)
+        ual.setOperation("cmp")
+        ual.writeSecondOperand(7)
+        self.assertEqual(ual.calc(), 0)
+        # la comparaison ne modifie que les indicateurs
+        self.assertEqual((ual.read().toSignInt(), ual.isZero, ual.isPos), (-21, True, True))
+        self.assertEqual([event["result"].intValue for event in events], [65515, 0])
+
+class ScreenSinkTest(unittest.TestCase):
+    LOOP = "\n".join([
+        "i = 0",
+        "while i < 10:",
+        "    i = i + 1",
+        "    print(i)",
+        ""
+    ])
+
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, self.LOOP)
+        stream = io.StringIO()
+        received = []
+        for sink in (RingSink(3), StreamSink(stream, bufferSize=4), CallbackSink(received.append)):
+            executeur = Executeur(engine, binary)
+            executeur.screen.setSink(sink)
+            self.assertEqual(executeur.translatedRun(), -1)
+            self.assertEqual(executeur.screen.count, 10)
+            executeur.screen.flush()
+        self.assertEqual(executeur.screen.getStringList('dec'), [])
+        self.assertEqual(stream.getvalue().split(), [str(i) for i in range(1, 11)])
+        self.assertEqual([item.intValue for item in received], list(range(1, 11)))
+
+    def test2(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, self.LOOP)
+        executeur = Executeur(engine, binary)
+        executeur.screen.setSink(RingSink(3))
+        executeur.enableUndo()
+        self.assertEqual(executeur.nonStopRun(), -1)
+        self.assertEqual(executeur.screen.getStringList('dec'), ['8', '9', '10'])
+        while executeur.screen.count > 8:
+            executeur.stepBack()
+        self.assertEqual(executeur.screen.getStringList('dec'), ['8'])
+
+    def test3(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, "print(3)\nprint(4)\nx = input()\nprint(x)\n")
+        for mode in ("nonStopRun", "translatedRun"):
+            stream = io.StringIO()
+            executeur = Executeur(engine, binary)
+            executeur.screen.setSink(StreamSink(stream))
+            self.assertEqual(getattr(executeur, mode)(), -2)
+            self.assertEqual(stream.getvalue().split(), ['3', '4'])
+            executeur.bufferize(5)
+            self.assertEqual(getattr(executeur, mode)(), -1)
+            self.assertEqual(stream.getvalue().split(), ['3', '4', '5'])
+
+class EventBusTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, ScreenSinkTest.LOOP)
+        executeur = Executeur(engine, binary)
+        scheduled = []
+        bus = EventBus(scheduled.append)
+        registers = []
+        screen = []
+        ual = []
+        bus.bind(executeur.registers, ("write",), registers.append)
+        bus.bind(executeur.screen, ("write", "clear"), screen.append, keepAll=True)
+        bus.bind(executeur.ual, ("calc", "writeop1", "writeop2", "setoperation"), ual.append)
+        self.assertEqual(executeur.nonStopRun(), -1)
+        self.assertEqual(len(scheduled), 1)
+        scheduled[0]()
+        self.assertFalse(bus.pending)
+        self.assertEqual(len(registers), 1)
+        # une seule entrée par registre écrit, malgré les nombreuses écritures
+        self.assertEqual(len(registers[0]), len(set(params["index"] for name, params in registers[0])))
+        self.assertEqual(len(registers[0]), 2)
+        self.assertEqual([params["writed"].intValue for name, params in screen[0]], list(range(1, 11)))
+        self.assertEqual(len(ual[0]), 4)
+        self.assertEqual(ual[0][-1][0], "calc")
+        executeur.screen.clear()
+        self.assertEqual(len(scheduled), 2)
+        scheduled[1]()
+        self.assertEqual((len(registers), [name for name, params in screen[1]]), (1, ["clear"]))
+
+@unittest.skipIf(np is None, "NumPy non disponible")
+class BatchExecuteurTest(unittest.TestCase):
+    def test1(self):
+        inputs = [[n, m] for n in range(-2, 14) for m in (-3, 5)] + [[4], []]
+        for engine in (Processor16Bits(), Processor12Bits()):
+            binary, _ = compileCode(engine)
+            batch = BatchExecuteur(engine, binary, inputs)
+            batch.run()
+            for lane, values in enumerate(inputs):
+                executeur = Executeur(engine, binary)
+                for value in values:
+                    executeur.bufferize(value)
+                self.assertEqual(batch.states[lane], executeur.nonStopRun())
+                self.assertEqual(batch.getStringList(lane), executeur.screen.getStringList('dec'))
+                self.assertEqual(batch.registers[lane].tolist(), [item.intValue for item in executeur.registers.content])
+                memory = [item.intValue for item in executeur.memory.content]
+                self.assertEqual(batch.memory[lane, :len(memory)].tolist(), memory)
+                self.assertEqual(batch.linePointers[lane], executeur.linePointer.intValue)
+
+    def test2(self):
+        engine = Processor16Bits()
+        code = "\n".join(["n = input()", "print(100 / n)", ""])
+        binary, _ = compileCode(engine, code)
+        batch = BatchExecuteur(engine, binary, [[7], [0], [-9]])
+        batch.run()
+        self.assertEqual(batch.divisionErrors.tolist(), [False, True, False])
+        self.assertEqual([batch.getStringList(lane) for lane in range(3)], [['14'], [], ['-12']])
+
+class ProfilerTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        binary, addressMap = compileCode(engine)
+        executeur = Executeur(engine, binary)
+        profiler = executeur.enableProfiling(addressMap)
+        executeur.bufferize(10)
+        self.assertEqual(executeur.translatedRun(), -2)
+        executeur.bufferize(3)
+        self.assertEqual(executeur.translatedRun(), -1)
+        self.assertEqual(profiler.totalCycles, len(executeur.messages) - 1)
+        lines = profiler.byLine()
+        self.assertEqual(lines[5][0], 10 * 3)
+        self.assertEqual(sum([cycles for executions, cycles in lines.values()]), profiler.totalCycles)
+        report = profiler.report(top=3).split("\n")
+        self.assertEqual(len(report), 4)
+        self.assertEqual(report[1].split()[0], "6")
+        stacks = profiler.collapsedStacks(CODE).split("\n")
+        self.assertTrue(stacks[0].startswith("programme;ligne 1 : n = input();@0 "))
+        self.assertEqual(sum([int(item.rsplit(" ", 1)[1]) for item in stacks]), profiler.totalCycles)
+        annotated = profiler.annotate(CODE).split("\n")
+        self.assertEqual(annotated[4].split("|")[1], "     i = i + 1")
+
+    def test2(self):
+        engine = Processor16Bits()
+        binary, _ = compileCode(engine, "x = 0\nwhile x < 5:\n    x = x + 0\n")
+        executeur = Executeur(engine, binary)
+        profiler = executeur.enableProfiling()
+        self.assertEqual(executeur.translatedRun(100), 0)
+        self.assertIsNone(executeur.breakReason)
+        self.assertEqual(sum([executions for executions, cycles in profiler.byAddress().values()]), 100)
+        self.assertEqual(executeur.translatedRun(100), 0)
+        self.assertEqual(sum([executions for executions, cycles in profiler.byAddress().values()]), 200)
+
+class AddressMapTest(unittest.TestCase):
+    def test1(self):
+        for engine in (Processor16Bits(), Processor12Bits()):
+            fifos = CM(engine, CP.parse(code=CODE)).compile()
+            binary = engine.getBinary(fifos)
+            addressMap = engine.getAddressMap(fifos)
+            self.assertEqual(addressMap.codeSize + len(addressMap.variables), len(binary))
+            # le modèle 12 bits range aussi des constantes en mémoire
+            self.assertTrue({"i", "m", "n", "s"} <= set(addressMap.variables))
+            self.assertEqual([addressMap.lineOf(address) for address in range(addressMap.codeSize)], engine.getLineNumbers(fifos))
+            self.assertIsNone(addressMap.lineOf(addressMap.codeSize))
+            loadedBinary, loaded = AddressMap.loads(addressMap.dumps(binary))
+            self.assertEqual(loadedBinary, binary)
+            self.assertEqual((loaded.ranges, loaded.labels, loaded.variables), (addressMap.ranges, addressMap.labels, addressMap.variables))
+        with self.assertRaises(ExecutionError):
+            AddressMap.loads("{}")
+
+    def test2(self):
+        engine = Processor16Bits()
+        binary, addressMap = compileCode(engine)
+        executeur = Executeur(engine, binary)
+        executeur.setAddressMap(addressMap)
+        executeur.bufferize(4)
+        address = executeur.addVariableWatchpoint("s")
+        self.assertEqual(executeur.nonStopRun(), 0)
+        self.assertEqual(executeur.breakReason, "Surveillance : mémoire {} (s) : 0 -> 65535".format(address))
+        with self.assertRaises(ExecutionError):
+            executeur.addVariableWatchpoint("x")
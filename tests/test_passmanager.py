@@ -0,0 +1,69 @@
+"""
+.. module:: tests.test_passmanager
+:synopsis: Test du module passmanager
+"""
+
+import unittest
+
+from modules.errors import CompilationError
+from modules.engine.processor16bits import Processor16Bits
+from modules.compilemanager import CompilationManager as CM
+from modules.passmanager import PassManager
+from modules.parser.code import CodeParser as CP
+
+CODE = "\n".join([
+    "n = input()",
+    "i = 0",
+    "t = 0",
+    "while i < n*n:",
+    "    if i < 3:",
+    "        t = i",
+    "    else:",
+    "        t = 2",
+    "    i = i + 1",
+    "print(i)",
+    ""
+])
+
+class PassManagerTest(unittest.TestCase):
+    def test1(self):
+        engine = Processor16Bits()
+        names = []
+        for level in PassManager.LEVELS:
+            cm = CM(engine, CP.parse(code=CODE), level)
+            names.append([record.name for record in cm.passRecords])
+        self.assertEqual(names[0], ["linearize", "deleteJumpNextLine", "deleteDummies", "assignLabels"])
+        self.assertEqual(names[1], ["linearize", "deleteJumpNextLine", "deleteDummies", "assignLabels"])
+        self.assertEqual(names[2], ["hoistLoopInvariants", "optimizeConditions", "linearize", "optimizeBranches", "deleteJumpNextLine", "deleteDummies", "deleteDeadCode", "assignLabels"])
+
+    def test2(self):
+        engine = Processor16Bits()
+        counts = []
+        for level in PassManager.LEVELS:
+            passManager = PassManager(countInstructions=True)
+            cm = CM(engine, CP.parse(code=CODE), level, passManager)
+            fifos = cm.compile()
+            records = cm.passRecords
+            self.assertIsNone(records[0].instructionsDelta)
+            self.assertEqual(records[-1].instructionsAfter, engine.instructionsCount(fifos))
+            counts.append(engine.instructionsCount(fifos))
+        self.assertTrue(counts[0] >= counts[1] > counts[2])
+
+    def test3(self):
+        calls = []
+        passManager = PassManager()
+        passManager.register("trace", lambda nodes, csl: calls.append(len(csl)), minLevel=1)
+        self.assertEqual(passManager.passesNames[-2:], ["trace", "assignLabels"])
+        CM(Processor16Bits(), CP.parse(code=CODE), 0, passManager)
+        self.assertEqual(calls, [])
+        CM(Processor16Bits(), CP.parse(code=CODE), 1, passManager)
+        self.assertEqual(calls, [4])
+        with self.assertRaises(CompilationError):
+            passManager.register("trace", lambda nodes, csl: None)
+
+    def test4(self):
+        with self.assertRaises(CompilationError):
+            CM(Processor16Bits(), CP.parse(code=CODE), 3)
+        self.assertEqual(PassManager.levelFromFlag("-O0"), 0)
+        with self.assertRaises(CompilationError):
+            PassManager.levelFromFlag("-O5")
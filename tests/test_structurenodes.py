@@ -3,10 +3,11 @@
 :synopsis: Test de modules.structuresnodes
 """
 
-from modules.structuresnodes import StructureNode, TransfertNode, WhileNode, StructureNodeList
+from modules.structuresnodes import StructureNode, TransfertNode, WhileNode, IfNode, StructureNodeList
 from modules.parser.expression import ExpressionParser as EP
 from modules.primitives.variable import Variable
 from modules.primitives.operators import Operators
+from modules.primitives.label import Label
 
 import unittest
 
@@ -177,3 +178,179 @@ class LinearizationTest(unittest.TestCase):
 
         self.assertEqual(str(structureList), good)
 
+    def test3(self):
+        Label.initFreeIndex()
+        varX = Variable('x')
+        varY = Variable('y')
+        initialisationX = TransfertNode(
+            1,
+            varX,
+            EP.buildExpression('0')
+        )
+        initialisationY = TransfertNode(
+            2,
+            varY,
+            EP.buildExpression('0')
+        )
+        affectationX = TransfertNode(
+            4,
+            varX,
+            EP.buildExpression('x+1')
+        )
+        affectationY = TransfertNode(
+            5,
+            varY,
+            EP.buildExpression('y+x')
+        )
+        whileItem = WhileNode(
+            3,
+            EP.buildExpression('x < 10 or y < 100'),
+            [affectationX, affectationY]
+        )
+        affichageFinal = TransfertNode(
+            6,
+            None,
+            EP.buildExpression('y')
+        )
+        structureList = StructureNodeList([initialisationX, initialisationY, whileItem, affichageFinal])
+        structureList.linearize([Operators.INF, Operators.EQ], True)
+        good = "\n".join([
+            "	@x ← #0",
+            "	@y ← #0",
+            "	Saut Lab1",
+            "Lab2	@x ← (@x + #1)",
+            "	@y ← (@y + @x)",
+            "Lab1	Saut Lab2 si (@x < #10)",
+            "	Saut Lab2 si (@y < #100)",
+            "	@y → Affichage",
+            "	halt"
+        ])
+
+        self.assertEqual(str(structureList), good)
+
+    def test4(self):
+        Label.initFreeIndex()
+        varX = Variable('x')
+        affectationX = TransfertNode(
+            3,
+            varX,
+            EP.buildExpression('x+1')
+        )
+        whileItem = WhileNode(
+            1,
+            EP.buildExpression('x < 10'),
+            [IfNode(2, EP.buildExpression('x == 2'), [affectationX])]
+        )
+        structureList = StructureNodeList([whileItem])
+        structureList.linearize([Operators.NOTEQ, Operators.EQ, Operators.INF, Operators.SUP], True)
+        good = "\n".join([
+            "	Saut Lab1",
+            "Lab2	Saut Lab1 si (@x != #2)",
+            "	@x ← (@x + #1)",
+            "Lab1	Saut Lab2 si (@x < #10)",
+            "	halt"
+        ])
+
+        self.assertEqual(str(structureList), good)
+
+    def test5(self):
+        Label.initFreeIndex()
+        varX = Variable('x')
+        affichage = TransfertNode(2, None, EP.buildExpression('x'))
+        ifItem = IfNode(
+            1,
+            EP.buildExpression('(x+1)*(x-1) < 3 and x == 2'),
+            [affichage]
+        )
+        structureList = StructureNodeList([ifItem])
+        structureList.optimizeConditions()
+        structureList.linearize([Operators.NOTEQ, Operators.EQ, Operators.INF, Operators.SUP])
+        good = "\n".join([
+            "	Saut Lab1 si (@x != #2)",
+            "	Saut Lab2 si (((@x + #1) * (@x - #1)) < #3)",
+            "	Saut Lab1",
+            "Lab2	@x → Affichage",
+            "Lab1	halt"
+        ])
+
+        self.assertEqual(str(structureList), good)
+
+class HoistLoopInvariantsTest(unittest.TestCase):
+    def test1(self):
+        varN = Variable('n')
+        varI = Variable('i')
+        affichage = TransfertNode(3, None, EP.buildExpression('i*(n+1) + n/2 + i/n'))
+        incrementI = TransfertNode(4, varI, EP.buildExpression('i+1'))
+        whileItem = WhileNode(2, EP.buildExpression('i < n*n'), [affichage, incrementI])
+        structureList = StructureNodeList([TransfertNode(1, varN, None), whileItem])
+        structureList.hoistLoopInvariants()
+        good = "\n".join([
+            "	@n ← Input",
+            "	@_inv1 ← (@n * @n)",
+            "	@_inv2 ← (@n + #1)",
+            "	@_inv3 ← (@n / #2)",
+            "	while (@i < @_inv1) {",
+            "		(((@i * @_inv2) + @_inv3) + (@i / @n)) → Affichage",
+            "		@i ← (@i + #1)",
+            "	}"
+        ])
+        self.assertEqual(str(structureList), good)
+
+    def test2(self):
+        # n est modifié dans la boucle : seul k*3 est invariant
+        Label.initFreeIndex()
+        varX = Variable('x')
+        varN = Variable('n')
+        varK = Variable('k')
+        saisieK = TransfertNode(1, varK, None)
+        affectationX = TransfertNode(3, varX, EP.buildExpression('x+n*2+k*3'))
+        saisieN = TransfertNode(4, varN, None)
+        whileItem = WhileNode(2, EP.buildExpression('x < n*n'), [affectationX, saisieN])
+        structureList = StructureNodeList([saisieK, whileItem])
+        structureList.hoistLoopInvariants()
+        structureList.linearize([Operators.INF, Operators.EQ])
+        good = "\n".join([
+            "	@k ← Input",
+            "	@_inv1 ← (@k * #3)",
+            "Lab1	Saut Lab2 si (@x < (@n * @n))",
+            "	Saut Lab3",
+            "Lab2	@x ← ((@x + (@n * #2)) + @_inv1)",
+            "	@n ← Input",
+            "	Saut Lab1",
+            "Lab3	halt"
+        ])
+        self.assertEqual(str(structureList), good)
+
+class DeadCodeTest(unittest.TestCase):
+    def test1(self):
+        Label.initFreeIndex()
+        varN = Variable('n')
+        varA = Variable('a')
+        varI = Variable('i')
+        varT = Variable('t')
+        whileItem = WhileNode(4, EP.buildExpression('i < n'), [
+            TransfertNode(5, varT, EP.buildExpression('i*2')),
+            TransfertNode(6, varI, EP.buildExpression('i+1'))
+        ])
+        structureList = StructureNodeList([
+            TransfertNode(1, varN, None),
+            TransfertNode(2, varA, EP.buildExpression('n+5')),
+            TransfertNode(3, varI, EP.buildExpression('0')),
+            whileItem,
+            TransfertNode(7, varA, EP.buildExpression('3')),
+            TransfertNode(8, None, EP.buildExpression('i+a'))
+        ])
+        structureList.linearize([Operators.INF, Operators.EQ])
+        structureList.deleteDeadCode()
+        good = "\n".join([
+            "	@n ← Input",
+            "	@i ← #0",
+            "Lab1	Saut Lab2 si (@i < @n)",
+            "	Saut Lab3",
+            "Lab2	@i ← (@i + #1)",
+            "	Saut Lab1",
+            "Lab3	@a ← #3",
+            "	(@i + @a) → Affichage",
+            "	halt"
+        ])
+        self.assertEqual(str(structureList), good)
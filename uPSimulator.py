@@ -1,3 +1,15 @@
-from graphic import *
+"""
+.. module:: uPSimulator
+   :synopsis: lanceur. Sans argument, ouvre l'interface graphique ; avec des arguments,
+     les transmet à la ligne de commande, voir modules.cli. tkinter et les widgets
+     ne sont importés que pour l'interface graphique.
+"""
 
-exec(open('graphic.py').read())
+import sys
+
+if len(sys.argv) > 1:
+    from modules.cli import main
+    sys.exit(main())
+
+from graphic import InputCodeWindow
+InputCodeWindow().show()
@@ -0,0 +1,10 @@
+"""
+.. module:: upsim
+   :synopsis: lanceur de l'interface en ligne de commande, voir modules.cli
+"""
+
+import sys
+
+from modules.cli import main
+
+sys.exit(main())
@@ -2,10 +2,11 @@
 .. module:: widgets
    :synopsis: objets constitant l'interface graphique
 """
-from typing import List, Dict, Any, cast
+from typing import List, Dict, Set, Optional, Any, cast
 
 from tkinter import *
-from executeurcomponents import BufferComponent, ScreenComponent, RegisterGroup, MemoryComponent, RegisterComponent, UalComponent, DataValue
+from modules.exec.components import BufferComponent, ScreenComponent, RegisterGroup, MemoryComponent, RegisterComponent, UalComponent, DataValue, formatValue
+from modules.exec.eventbus import EventBus
 
 class TextWidget(Frame):
     """Panneau affichant un texte avec possibilité de mettre
@@ -170,18 +171,28 @@ class TextWidget(Frame):
         return self._textZone.get('1.0', 'end')
 
 class MemoryWidget(LabelFrame):
-    """Panneau affichant le contenu d'une mémoire
+    """Panneau affichant le contenu d'une mémoire.
+
+    Seules les lignes visibles sont écrites dans la zone de texte, la barre de défilement
+    choisissant la première adresse affichée. Les modifications reçues pendant un même
+    tour de la boucle d'événements sont regroupées en un seul rafraîchissement.
     """
     BACKGROUND:str = 'white'
     HL_BACKGROUND:str = 'orange3'
     HL_COLOR:str = 'white'
     MODES = ("bin", "hex", "dec")
+    WHEEL_STEP:int = 3
     cols:int = 30
     lineNumberFormat:str = '{:03d}:   '
     lines:int = 25
     _name:str = "mémoire"
     _mode:str = "bin"
     _isMemory:bool = False
+    _first:int = 0
+    _highlighted:int = -1
+    _redrawAll:bool = True
+    _dirty:Set[int]
+    _pending:Optional[str] = None
     def __init__(self, parent, memory, **kwargs):
 
         for key, value in kwargs.items():
@@ -197,12 +208,13 @@ class MemoryWidget(LabelFrame):
                 self._mode = value
 
         LabelFrame.__init__(self, parent, class_='MemoryWidget', text=self._name)
+        self._dirty = set()
         self._textZone = Text(self, width=self.cols, height=self.lines, bg=self.BACKGROUND)
-        # attach scrollbar
-        #self._scrollbar = Scrollbar(self,width=12)
-        #self._scrollbar.grid(row = 0, column = 0, sticky="ns")
-        #self._textZone.config(yscrollcommand=self._scrollbar.set)
-        #self._scrollbar.config(command=self._textZone.yview)
+        self._scrollbar = Scrollbar(self, width=12, command=self.onscroll)
+        self._scrollbar.grid(row = 0, column = 1, sticky="ns")
+        self._textZone.bind("<MouseWheel>", self.onwheel)
+        self._textZone.bind("<Button-4>", self.onwheel)
+        self._textZone.bind("<Button-5>", self.onwheel)
         self.__memory = memory
         self.__memory.bind("onwrite", self.onwrite)
         self.__memory.bind("onread", self.onread)
@@ -232,15 +244,75 @@ class MemoryWidget(LabelFrame):
             self._mode = mode
             self.refresh()
 
+    def _schedule(self) -> None:
+        """Programme un rafraîchissement pour la fin du tour de la boucle d'événements,
+        s'il n'y en a pas déjà un en attente
+        """
+        if self._pending is None:
+            self._pending = self.after_idle(self._redraw)
+
+    def _lineText(self, index:int) -> str:
+        """
+        :param index: adresse
+        :type index: int
+        :return: texte de la ligne de cette adresse
+        :rtype: str
+        """
+        return self.lineNumberFormat.format(index) + formatValue(self.__memory.size, self.__memory.peek(index), self._mode)
+
+    def _redraw(self) -> None:
+        """Écrit les lignes visibles modifiées depuis le dernier rafraîchissement,
+        toutes les lignes visibles après un défilement ou un changement de taille
+        """
+        self._pending = None
+        count = self.__memory.count
+        self._first = max(0, min(self._first, count - self.lines))
+        last = min(self._first + self.lines, count)
+        zone = self._textZone
+        zone.config(state=NORMAL)
+        if self._redrawAll:
+            zone.delete('1.0', 'end')
+            zone.insert(END, "\n".join([self._lineText(index) for index in range(self._first, last)]))
+        else:
+            for index in sorted(self._dirty):
+                if self._first <= index < last:
+                    lineTag = index - self._first + 1
+                    zone.delete('{}.0'.format(lineTag), '{}.end'.format(lineTag))
+                    zone.insert('{}.0'.format(lineTag), self._lineText(index))
+        zone.config(state=DISABLED)
+        self._dirty.clear()
+        self._redrawAll = False
+        zone.tag_remove("HIGHLIGHTED",  "1.0", 'end')
+        if self._first <= self._highlighted < last:
+            lineTag = self._highlighted - self._first + 1
+            zone.tag_add("HIGHLIGHTED", "{}.0".format(lineTag), "{}.end".format(lineTag))
+        if count > 0:
+            self._scrollbar.set(self._first / count, last / count)
+        else:
+            self._scrollbar.set(0, 1)
+
+    def scrollTo(self, first:int) -> None:
+        """Fait défiler l'affichage
+
+        :param first: première adresse affichée
+        :type first: int
+        """
+        first = max(0, min(first, self.__memory.count - self.lines))
+        if first != self._first:
+            self._first = first
+            self._redrawAll = True
+            self._schedule()
+
     def highlightLine(self, index:int) -> None:
-        """Mise en surbrillance d'une ligne
+        """Mise en surbrillance d'une ligne, l'affichage défile si elle n'est pas visible
 
         :param index: numéro de ligne, à partir de 0
         :type index: int
         """
-        self._textZone.tag_remove("HIGHLIGHTED",  "1.0", 'end')
-        lineTag = index + 1
-        self._textZone.tag_add("HIGHLIGHTED", "{}.0".format(lineTag), "{}.end".format(lineTag))
+        self._highlighted = index
+        if not self._first <= index < self._first + self.lines:
+            self.scrollTo(index - self.lines // 2)
+        self._schedule()
 
     def writeValueInLine(self, value:DataValue, index:int) -> None:
         """Écrire une valeur à une certaine ligne
@@ -249,13 +321,11 @@ class MemoryWidget(LabelFrame):
         :type value: DataValue
         :param index: numéro de ligne
         :type index: int
+
+        .. note:: la ligne est réécrite au prochain rafraîchissement, d'après le contenu
+          du composant d'exécution associé
         """
-        line = (self.lineNumberFormat + value.toStr(self._mode)).format(index)
-        lineTag = index + 1
-        self._textZone.config(state=NORMAL)
-        self._textZone.delete('{}.0'.format(lineTag), '{}.end'.format(lineTag))
-        self._textZone.insert('{}.0'.format(lineTag), line)
-        self._textZone.config(state=DISABLED)
+        self._dirty.add(index)
         self.highlightLine(index)
 
     def writeAddress(self, address:DataValue) -> None:
@@ -275,18 +345,15 @@ class MemoryWidget(LabelFrame):
         self.highlightLine(intAddress)
 
     def refresh(self) -> None:
-        """Rafraichissement de l'affichage, après lecture du contenu
+        """Rafraichissement immédiat de l'affichage, après lecture du contenu
         du composant d'exécution associé
         """
-        values = self.__memory.content
-        lines = [(self.lineNumberFormat+item.toStr(self._mode)).format(index) for index, item in enumerate(values)]
-        text = "\n".join(lines)
-        self._textZone.config(state=NORMAL)
-        self._textZone.delete('1.0', 'end')
-        self._textZone.insert(END, text)
-        self._textZone.config(state=DISABLED)
+        self._redrawAll = True
         if self._isMemory:
             self.writeAddress(self.__memory.address)
+        if not self._pending is None:
+            self.after_cancel(self._pending)
+        self._redraw()
 
     def onfill(self, params: Any) -> None:
         """Rafraichissement de l'affichage quand le composant mémoire
@@ -295,7 +362,34 @@ class MemoryWidget(LabelFrame):
         :param params: paramètres liés à l'événement. Inutiles ici.
         :type params: Any
         """
-        self.refresh()
+        self._redrawAll = True
+        self._schedule()
+
+    def onscroll(self, *args) -> None:
+        """Callback de la barre de défilement
+
+        :param args: ("moveto", fraction) ou ("scroll", nombre, "units" ou "pages")
+        :type args: Tuple[str, ...]
+        """
+        if args[0] == "moveto":
+            self.scrollTo(int(float(args[1]) * self.__memory.count))
+        elif args[0] == "scroll":
+            step = self.lines if args[2] == "pages" else 1
+            self.scrollTo(self._first + int(args[1]) * step)
+
+    def onwheel(self, evt) -> str:
+        """Callback de la molette de la souris
+
+        :param evt: événement
+        :type evt: Event
+        :return: "break" pour que la zone de texte ne défile pas elle-même
+        :rtype: str
+        """
+        if evt.num == 4 or evt.delta > 0:
+            self.scrollTo(self._first - self.WHEEL_STEP)
+        else:
+            self.scrollTo(self._first + self.WHEEL_STEP)
+        return "break"
 
     def onread(self, params:Dict[str, Any]) -> None:
         """Callback pour la réaction une lecture mémoire
@@ -356,8 +450,11 @@ class BufferWidget(LabelFrame):
             self._mode = options["mode"]
         LabelFrame.__init__(self, parent, class_='BufferWidget', text="Saisie")
         self.__buffer = bufferComp
-        bufferComp.bind("onread", self.onreadwrite)
-        bufferComp.bind("onwrite", self.onreadwrite)
+        if isinstance(options.get("bus"), EventBus):
+            options["bus"].bind(bufferComp, ("read", "write", "readempty"), self.onchanges)
+        else:
+            bufferComp.bind("onread", self.onreadwrite)
+            bufferComp.bind("onwrite", self.onreadwrite)
         # message en entête
         self.__messageStringVar = StringVar()
         self.__messageStringVar.set("")
@@ -409,6 +506,14 @@ class BufferWidget(LabelFrame):
         self.__messageStringVar.set("")
         self.refreshStrBuffer()
 
+    def onchanges(self, changes):
+        eventName, params = changes[-1]
+        if eventName == "readempty":
+            self.refreshStrBuffer()
+            self.onreadempty(params)
+        else:
+            self.onreadwrite(params)
+
     def onreadempty(self, params):
         self.__waitingInput = True
         self.__messageStringVar.set("Saisie en attente")
@@ -432,8 +537,12 @@ class ScreenWidget(LabelFrame):
         if "mode" in options and options["mode"] in self.MODES:
             self._mode = options["mode"]
         self.__screen = screen
-        screen.bind("onclear", self.onclear)
-        screen.bind("onwrite", self.onwrite)
+        if isinstance(options.get("bus"), EventBus):
+            options["bus"].bind(screen, ("write", "clear", "truncate"), self.onchanges, keepAll=True)
+        else:
+            screen.bind("onclear", self.onclear)
+            screen.bind("onwrite", self.onwrite)
+            screen.bind("ontruncate", self.ontruncate)
         LabelFrame.__init__(self, parent, class_='PrintWidget', text="Écran")
 
         # bouton d'effacement
@@ -464,6 +573,17 @@ class ScreenWidget(LabelFrame):
             strValue = params["writed"].toStr(self._mode)
             self.addLine(strValue)
 
+    def ontruncate(self, params):
+        self.refresh()
+
+    def onchanges(self, changes):
+        if any(eventName != "write" for eventName, params in changes):
+            # effacement ou troncature : relecture complète
+            self.refresh()
+            return
+        lines = [params["writed"].toStr(self._mode) for eventName, params in changes if "writed" in params]
+        self.addLine("\n".join(lines))
+
     def addLine(self, line):
         self._textZone.config(state=NORMAL)
         self._textZone.insert('end', line+"\n")
@@ -484,14 +604,20 @@ class RegisterWidget(LabelFrame):
     _mode = 'bin'
 
     def __init__(self, parent, register, **kwargs):
+        bus = None
         for key, value in kwargs.items():
             if key == 'mode' and value in self.MODES:
                 self._mode = value
             elif key == 'unsigned':
                 self.__unsigned = (value == True)
+            elif key == 'bus' and isinstance(value, EventBus):
+                bus = value
         self.__register = register
-        register.bind("onwrite", self.onwrite)
-        register.bind("oninc", self.onwrite)
+        if bus is None:
+            register.bind("onwrite", self.onwrite)
+            register.bind("oninc", self.onwrite)
+        else:
+            bus.bind(register, ("write", "inc"), self.onchanges)
         LabelFrame.__init__(self, parent, class_='RegisterWidget', text=register.name)
         self.__valueStringVar = StringVar()
         labelValue = Label(self, textvariable = self.__valueStringVar, bg = self.BACKGROUND)
@@ -517,15 +643,21 @@ class RegisterWidget(LabelFrame):
         if "writed" in params:
             self.writeValue(params["writed"])
 
+    def onchanges(self, changes):
+        self.onwrite(changes[-1][1])
+
 class UalWidget(LabelFrame):
     BACKGROUND = 'white'
     MODES = ("bin", "hex", "dec")
     _mode = 'bin'
 
     def __init__(self, parent, ual, **kwargs):
+        bus = None
         for key, value in kwargs.items():
             if key == 'mode' and value in self.MODES:
                 self._mode = value
+            elif key == 'bus' and isinstance(value, EventBus):
+                bus = value
         self.__ual = ual
         LabelFrame.__init__(self, parent, class_='RegisterWidget', text="UAL")
 
@@ -558,10 +690,13 @@ class UalWidget(LabelFrame):
         canvas.grid(row=1, column=0, columnspan=2)
         resultLabel.grid(row=2, column=0, columnspan=2)
 
-        ual.bind("oncalc", self.oncalc)
-        ual.bind("onwriteop1", self.onwriteop1)
-        ual.bind("onwriteop2", self.onwriteop2)
-        ual.bind("onsetoperation", self.onsetoperation)
+        if bus is None:
+            ual.bind("oncalc", self.oncalc)
+            ual.bind("onwriteop1", self.onwriteop1)
+            ual.bind("onwriteop2", self.onwriteop2)
+            ual.bind("onsetoperation", self.onsetoperation)
+        else:
+            bus.bind(ual, ("calc", "writeop1", "writeop2", "setoperation"), self.onchanges)
 
     def selectMode(self, mode):
         if mode in self.MODES:
@@ -574,6 +709,16 @@ class UalWidget(LabelFrame):
         self.oncalc({"result": self.__ual.read(), "iszero":self.__ual.isZero, "ispos":self.__ual.isPos})
         self.onsetoperation({"operation":self.__ual.operation})
 
+    def onchanges(self, changes):
+        callbacks = {
+            "calc": self.oncalc,
+            "writeop1": self.onwriteop1,
+            "writeop2": self.onwriteop2,
+            "setoperation": self.onsetoperation
+        }
+        for eventName, params in changes:
+            callbacks[eventName](params)
+
     def onwriteop1(self, params):
         if "writed" in params:
             self.__op1StringVar.set(params["writed"].toStr(self._mode))
@@ -635,9 +780,9 @@ class InputCodeWidget(LabelFrame):
 
 
 class SimulationWidget(Frame):
-    def __init__(self, parent, parentWidget, executeur, textCode, asm, mode):
+    def __init__(self, parent, parentWidget, executeur, textCode, program, mode):
         Frame.__init__(self, parent, class_='SimulationWidget')
-        self.asm = asm
+        self.program = program
         self._parent = parentWidget
         # grille
         for r in range(24):
@@ -651,17 +796,21 @@ class SimulationWidget(Frame):
         self._program.grid(row=0, column=0, rowspan=24, sticky="nsew")
 
         # partie asm
-        self._asmFrame = TextWidget(self, str(asm), cols=0, lines=24, fill=True, offset=0, name='Assembleur')
+        self._asmFrame = TextWidget(self, program.asm, cols=0, lines=24, fill=True, offset=0, name='Assembleur')
         self._asmFrame.grid(row=0, column=1, rowspan=24, sticky="nsew")
 
         self.executeur = executeur
-        self._ualW = UalWidget(self, self.executeur.ual, mode=mode)
-        self._inputBufferW = BufferWidget(self, self.executeur.inputBuffer, mode=mode)
-        self._instrRegW = RegisterWidget(self, self.executeur.instructionRegister, unsigned = True, mode=mode)
-        self._linePointerW = RegisterWidget(self, self.executeur.linePointer, unsigned = True, mode=mode)
+        self.executeur.enableUndo()
+        self._remote = None
+        # les événements des composants sont remis aux widgets une fois par tour de la boucle tkinter
+        self._bus = EventBus(self.after_idle)
+        self._ualW = UalWidget(self, self.executeur.ual, mode=mode, bus=self._bus)
+        self._inputBufferW = BufferWidget(self, self.executeur.inputBuffer, mode=mode, bus=self._bus)
+        self._instrRegW = RegisterWidget(self, self.executeur.instructionRegister, unsigned = True, mode=mode, bus=self._bus)
+        self._linePointerW = RegisterWidget(self, self.executeur.linePointer, unsigned = True, mode=mode, bus=self._bus)
         self._memoryW = MemoryWidget(self, self.executeur.memory, name="Mémoire", lines=20, mode=mode)
         self._registersW = MemoryWidget(self, self.executeur.registers, name="Registres", lines=12, mode=mode)
-        self._screenW = ScreenWidget(self, self.executeur.screen, mode=mode)
+        self._screenW = ScreenWidget(self, self.executeur.screen, mode=mode, bus=self._bus)
 
         self._inputBufferW.grid(row=0, column=2, rowspan=6, stick="nsew")
         self._screenW.grid(row=6, column=2, rowspan=6, stick="nsew")
@@ -682,7 +831,7 @@ class SimulationWidget(Frame):
         de la ligne correspondante dans le programme d'origine et
         le met en surbrillance
         """
-        indexCodeLine = self.asm.getLineNumber(currentAsmLine)
+        indexCodeLine = self.program.lineOf(currentAsmLine)
         self._asmFrame.highlightLine(currentAsmLine)
         self._program.highlightLine(indexCodeLine)
 
@@ -695,6 +844,109 @@ class SimulationWidget(Frame):
         self.addMessage(self.executeur.messages[-1])
         return currentState
 
+    def frameRun(self, seconds:float) -> int:
+        """Exécute autant de pas que possible pendant la durée d'une image,
+        les composants ne déclenchant pas d'événements, puis rafraîchit l'affichage une seule fois
+
+        :param seconds: durée de l'exécution
+        :type seconds: float
+        :return: état en cours, voir Executeur.timedRun
+        :rtype: int
+        """
+        self.executeur.setComponentsMuted(True)
+        try:
+            currentState = self.executeur.timedRun(seconds)
+        finally:
+            self.executeur.setComponentsMuted(False)
+        self.refresh()
+        self.highlightCodeLine(self.executeur.currentAsmLine)
+        self.addMessage(self.executeur.messages[-1])
+        return currentState
+
+    def startProcess(self) -> None:
+        """Lance l'exécution continue dans un processus séparé,
+        à partir de l'état courant de l'exécuteur
+        """
+        # multiprocessing n'est importé qu'à la première exécution dans un processus
+        from modules.exec.processexecuteur import ProcessExecuteur
+        self._remote = ProcessExecuteur(self.executeur)
+        self._remote.run()
+        self.addMessage("Exécution dans un processus séparé")
+
+    @property
+    def processRunning(self) -> bool:
+        return not self._remote is None
+
+    def processFrame(self) -> int:
+        """Recopie l'état publié par le processus d'exécution dans les composants,
+        sans déclencher d'événements, puis rafraîchit l'affichage une seule fois
+
+        :return: état de l'exécution distante, 0 si elle est en cours, voir Executeur.step
+        :rtype: int
+        """
+        remote = self._remote
+        running = remote.running
+        view = remote.read()
+        outputs = remote.readOutputs()
+        self.executeur.setComponentsMuted(True)
+        try:
+            self.executeur.registers.setContent(view.registers)
+            self.executeur.memory.setContent(view.memory)
+            self.executeur.linePointer.write(view.linePointer)
+            for value in outputs:
+                self.executeur.screen.write(value)
+        finally:
+            self.executeur.setComponentsMuted(False)
+        self.refresh()
+        self.highlightCodeLine(view.currentAsmLine)
+        return max(view.state, 0) if running else remote.lastState
+
+    def stopProcess(self) -> int:
+        """Arrête le processus d'exécution et reprend son état dans l'exécuteur local.
+        L'écran du processus ne conservant rien, les valeurs déjà affichées sont réécrites.
+
+        :return: état courant, voir Executeur.step
+        :rtype: int
+        """
+        remote = self._remote
+        self._remote = None
+        try:
+            data = remote.snapshot()
+            displayed = self.executeur.screen.list + [DataValue(self.executeur.engine.dataBits, value) for value in remote.readOutputs()]
+        finally:
+            remote.close()
+        self.executeur.restore(data)
+        for value in displayed:
+            self.executeur.screen.write(value)
+        self.highlightCodeLine(self.executeur.currentAsmLine)
+        self.addMessage(self.executeur.messages[-1])
+        return self.executeur.currentState
+
+    def destroy(self):
+        if not self._remote is None:
+            self._remote.close()
+            self._remote = None
+        Frame.destroy(self)
+
+    def refresh(self):
+        self._ualW.refresh()
+        self._inputBufferW.refreshStrBuffer()
+        self._instrRegW.refresh()
+        self._linePointerW.refresh()
+        self._registersW.refresh()
+        self._memoryW.refresh()
+        self._screenW.refresh()
+
+    def stepBackRun(self):
+        currentState = self.executeur.stepBack()
+        self.highlightCodeLine(self.executeur.currentAsmLine)
+        self.addMessage("Retour arrière : " + self.executeur.messages[-1])
+        return currentState
+
+    @property
+    def canStepBack(self):
+        return self.executeur.undoCount > 0
+
     def addMessage(self, message):
         self._parent.addMessage(message)
 